@@ -0,0 +1,83 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+
+# Cumulative import time budgets in milliseconds (bytecode is already compiled).
+BUDGETS = {
+    'thpoker': 5,
+    'thpoker.hardcore': 15,
+    'thpoker.lookup': 15,
+    'thpoker.backends': 20,
+    'thpoker.preflop': 20,
+    'thpoker.core': 40,
+}
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(module, environment):
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=environment, cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].rstrip() == f' {module}':
+            return int(parts[1]) / 1e3
+    raise ValueError(f"There is no '{module}' import time.")
+
+
+def measure(module, runs=5):
+    """The lowest cumulative import time of module in milliseconds (fresh interpreter every run)."""
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        environment = dict(os.environ, PYTHONPYCACHEPREFIX=cache_dir)
+        environment.pop('PYTHONDONTWRITEBYTECODE', None)
+        # the first run compiles bytecode
+        _run(module, environment)
+        return min(_run(module, environment) for _ in range(runs))
+
+
+def check(budgets=None, runs=5):
+    """Import times and modules which are over budget."""
+
+    budgets = budgets or BUDGETS
+    times = {module: measure(module, runs) for module in budgets}
+    over = [module for module, milliseconds in times.items() if milliseconds > budgets[module]]
+    return times, over
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check THPoker import time budgets.')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    times, over = check(runs=args.runs)
+    print(json.dumps({'import_ms': times, 'budgets_ms': BUDGETS}, indent=2))
+    for module in over:
+        print(f'Over budget: {module} imports in {times[module]:.1f} ms, budget is {BUDGETS[module]} ms',
+              file=sys.stderr)
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
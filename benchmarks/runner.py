@@ -0,0 +1,153 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from importlib import metadata
+
+from benchmarks.workloads import SEED, WORKLOADS, WORKLOADS_BY_NAMES
+
+
+MEMORY_CALLS = 100
+
+
+def percentile(values, rate):
+    """Nearest rank percentile of sorted values."""
+    return values[min(len(values) - 1, max(0, round(rate * len(values)) - 1))]
+
+
+def _get_version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def get_environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'packages': {package: _get_version(package) for package in ('THPoker', 'CTHPoker', 'AGStuff')},
+    }
+
+
+def run_workload(workload, size=None):
+    """Throughput, latencies and peak memory of workload."""
+
+    calls = workload.get_args(size)
+    function = workload.function
+    if workload.warmup:
+        # the first call could load caches (like lookup table)
+        function(*calls[0])
+
+    latencies = []
+    counter = time.perf_counter_ns
+    for args in calls:
+        started = counter()
+        function(*args)
+        latencies.append(counter() - started)
+    total = sum(latencies)
+    latencies.sort()
+
+    # tracemalloc slows calls down, so memory is measured by separate calls
+    tracemalloc.start()
+    try:
+        for args in calls[:MEMORY_CALLS]:
+            function(*args)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'unit': workload.unit,
+        'calls': len(calls),
+        'per_second': len(calls) / total * 1e9 if total else float('inf'),
+        'p50_us': percentile(latencies, 0.5) / 1e3,
+        'p99_us': percentile(latencies, 0.99) / 1e3,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def get_workloads(names=None, all_workloads=False):
+    """Chosen workloads (default ones or all of them if no workloads are chosen)."""
+
+    if names:
+        return [WORKLOADS_BY_NAMES[name] for name in names]
+    return [workload for workload in WORKLOADS if all_workloads or workload.default]
+
+
+def run(names=None, size=None, all_workloads=False):
+    workloads = get_workloads(names, all_workloads)
+    return {
+        'seed': SEED,
+        'environment': get_environment(),
+        'results': {workload.name: run_workload(workload, size) for workload in workloads},
+    }
+
+
+def compare(report, baseline, tolerance=0.2):
+    """
+    Regressions of report against baseline report.
+    Throughput lower or peak memory higher than baseline by more than tolerance rate is regression.
+    """
+
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        if result['per_second'] < base['per_second'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['per_second']:.1f} {result['unit']}/sec, "
+                f"baseline is {base['per_second']:.1f} {base['unit']}/sec")
+        if result['peak_memory_bytes'] > base['peak_memory_bytes'] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {result['peak_memory_bytes']} bytes peak memory, "
+                f"baseline is {base['peak_memory_bytes']} bytes")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run THPoker benchmarks.')
+    parser.add_argument('-w', '--workloads', nargs='*', choices=sorted(WORKLOADS_BY_NAMES), default=None)
+    parser.add_argument('--all', action='store_true', help='run not default workloads too (like get-result)')
+    parser.add_argument('--size', type=int, default=None, help='calls count of every workload')
+    parser.add_argument('--output', default=None, help='path of JSON report (stdout by default)')
+    parser.add_argument('--baseline', default=None, help='path of JSON report to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = run(args.workloads, args.size, args.all)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
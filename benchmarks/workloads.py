@@ -0,0 +1,167 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import contextlib
+import io
+import random
+
+from agstuff.cards.core import Deck
+
+from thpoker.core import Cards, Hand, Table, Combo
+from thpoker.hardcore import hcards, chcombo, rhcombo
+from thpoker.pyhardcore import find_combo, find_ratio_combo
+from thpoker.showdown import showdown
+
+
+SEED = 2018
+SIGNS = [w + s for w in '23456789TJQKA' for s in 'cdhs']
+
+
+class Workload:
+    """
+    Fixed seed calls of one function, every call is timed separately.
+    Workload which is not default one (like minutes long one) is run only if it is chosen or all workloads are run.
+    """
+
+    def __init__(self, name, function, make_args, size, unit='hands', warmup=True, default=True):
+        self.name = name
+        self.function = function
+        self.make_args = make_args
+        self.size = size
+        self.unit = unit
+        self.warmup = warmup
+        self.default = default
+
+    def get_args(self, size=None):
+        rnd = random.Random(f'{SEED}-{self.name}')
+        return [self.make_args(rnd) for _ in range(size or self.size)]
+
+
+def _cards_string(count):
+    return lambda rnd: ('/'.join(rnd.sample(SIGNS, count)),)
+
+
+def _hcards(count):
+    return lambda rnd: (hcards('/'.join(rnd.sample(SIGNS, count))),)
+
+
+def _table_and_hand(rnd):
+    signs = rnd.sample(SIGNS, 7)
+    return Table('/'.join(signs[:5])), Hand('/'.join(signs[5:]))
+
+
+def _htable_and_hand(rnd):
+    signs = rnd.sample(SIGNS, 7)
+    return hcards('/'.join(signs[:5])), hcards('/'.join(signs[5:]), in_hand=True)
+
+
+def _hcards_with_hand(rnd):
+    table, hand = _htable_and_hand(rnd)
+    return (table + hand,)
+
+
+def _combo(cards_string):
+    return Combo(cards_string=cards_string)
+
+
+def _ratio_combo(table, hand):
+    return Combo(table=table, hand=hand, ratio_check=True)
+
+
+class _SeededDeck(Deck):
+    """agstuff Deck which draws cards by its own random generator instead of global one."""
+
+    def __init__(self, rnd):
+        self.random = rnd
+        super().__init__()
+
+    def push_cards(self, count):
+        for _ in range(count):
+            yield self.cards.pop(self.random.randrange(len(self.cards)))
+
+
+def _deck_random(rnd):
+    return (random.Random(rnd.getrandbits(32)),)
+
+
+def _core_deal(rnd):
+    deck = _SeededDeck(rnd)
+    hand1, hand2, table = Hand(), Hand(), Table()
+    hand1.pull(deck)
+    hand2.pull(deck)
+    table.pull(deck, 5)
+    return Combo(table=table, hand=hand1) > Combo(table=table, hand=hand2)
+
+
+def _dealer(rnd):
+    # deals need NumPy, so they are imported only by deals workload
+    from thpoker.deals import Dealer
+
+    return (Dealer(players=2, seed=rnd.getrandbits(32)),)
+
+
+def _deals(dealer):
+    return dealer.deal(1000).winners()
+
+
+def _showdown_9(rnd):
+    cards = rnd.sample(range(52), 23)
+    return cards[:5], [cards[5 + 2 * i:7 + 2 * i] for i in range(9)], [rnd.randint(1, 200) for _ in range(9)]
+
+
+def _showdowns_9(rnd):
+    # batch showdown needs NumPy, so it is imported only by batch showdown workload
+    from thpoker.deals import Dealer
+
+    dealer = Dealer(players=9, seed=rnd.getrandbits(32))
+    cards = dealer.deal_indexes(1000)
+    contributions = dealer.rng.integers(1, 200, (1000, 9))
+    return cards[:, 18:], cards[:, :18].reshape(1000, 9, 2), contributions
+
+
+def _showdown_batch(tables, hands, contributions):
+    from thpoker.showdown import showdown_batch
+
+    return showdown_batch(tables, hands, contributions)
+
+
+def _matchup(hand_type1, hand_type2):
+    from examples.hand_win_rate import get_result
+
+    # get_result prints points
+    with contextlib.redirect_stdout(io.StringIO()):
+        return get_result(hand_type1, hand_type2)
+
+
+WORKLOADS = [
+    Workload('combo-5', _combo, _cards_string(5), 2000),
+    Workload('combo-6', _combo, _cards_string(6), 2000),
+    Workload('combo-7', _combo, _cards_string(7), 2000),
+    Workload('combo-ratio', _ratio_combo, _table_and_hand, 2000),
+    Workload('chcombo-5', chcombo, _hcards(5), 20000),
+    Workload('chcombo-6', chcombo, _hcards(6), 20000),
+    Workload('chcombo-7', chcombo, _hcards(7), 20000),
+    Workload('rhcombo-ratio', rhcombo, _htable_and_hand, 20000),
+    Workload('pyhardcore-7', find_combo, _hcards(7), 20000),
+    Workload('pyhardcore-ratio', find_ratio_combo, _hcards_with_hand, 20000),
+    Workload('hand', Hand, _cards_string(2), 5000),
+    Workload('cards-parsing', Cards, _cards_string(7), 5000),
+    Workload('core-deal', _core_deal, _deck_random, 2000, unit='deals'),
+    Workload('deals-1000', _deals, _dealer, 200, unit='batches of 1000 deals'),
+    Workload('showdown-9', showdown, _showdown_9, 2000, unit='showdowns'),
+    Workload('showdown-batch-1000', _showdown_batch, _showdowns_9, 50, unit='batches of 1000 showdowns'),
+    Workload('get-result', _matchup, lambda rnd: ('AA', '89s'), 1, unit='matchups', warmup=False, default=False),
+]
+WORKLOADS_BY_NAMES = {workload.name: workload for workload in WORKLOADS}
@@ -41,7 +41,8 @@ setup(
         "Programming Language :: Python :: 3 :: Only",
     ],
     keywords='poker cards',
-    packages=find_packages(exclude=['tests*', 'examples*']),
+    packages=find_packages(exclude=['tests*', 'examples*', 'benchmarks*']),
     python_requires='>=3.8',
     install_requires=['CTHPoker', 'AGStuff'],
+    extras_require={'numpy': ['numpy']},
 )
@@ -0,0 +1,134 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import random
+
+import pytest
+
+from thpoker import backends
+from thpoker.backends import (
+    Backend, LookupBackend, BACKENDS, ENVIRONMENT_VARIABLE,
+    get_backend, set_backend, available_backends, backend_info, register_backend,
+)
+from thpoker.core import Table, Hand, Combo
+from thpoker.exceptions import UnknownBackendError, BackendUnavailableError
+from thpoker.lookup import cards_indexes, unpack_key
+
+import test_hardcore
+
+
+SIGNS = [w + s for w in '23456789TJQKA' for s in 'cdhs']
+RATIO_CODES = {'real': 2, 'half': 1, 'miss': 0}
+
+
+@pytest.fixture(autouse=True)
+def default_backend(monkeypatch):
+    monkeypatch.delenv(ENVIRONMENT_VARIABLE, raising=False)
+    set_backend()
+    yield
+    monkeypatch.undo()
+    set_backend()
+
+
+class MissingBackend(Backend):
+    name = 'missing'
+
+    def __init__(self):
+        raise ImportError('No module named missing')
+
+
+def is_wheel(key):
+    combo_type, kickers = unpack_key(key)
+    return combo_type in (Combo.STRAIGHT, Combo.STRAIGHT_FLUSH) and kickers[0] == 5
+
+
+class TestSelection:
+    def test_default(self):
+        assert get_backend().name == 'lookup'
+        assert backend_info()['source'] == 'default'
+
+    def test_api(self):
+        assert set_backend('core').name == 'core'
+        assert get_backend() is get_backend()
+        assert backend_info() == {'name': 'core', 'source': 'api', 'available': available_backends()}
+
+    def test_environment(self, monkeypatch):
+        monkeypatch.setenv(ENVIRONMENT_VARIABLE, 'core')
+        set_backend()
+        assert get_backend().name == 'core'
+        assert backend_info()['source'] == 'environment'
+
+    def test_unknown(self):
+        with pytest.raises(UnknownBackendError):
+            set_backend('unknown')
+
+    def test_unavailable(self, monkeypatch):
+        monkeypatch.setitem(BACKENDS, 'missing', MissingBackend)
+        with pytest.raises(BackendUnavailableError):
+            set_backend('missing')
+        assert 'missing' not in available_backends()
+        assert {'lookup', 'core'} <= set(available_backends())
+
+    def test_register(self, monkeypatch):
+        monkeypatch.setattr(backends, 'BACKENDS', {})
+        register_backend(LookupBackend, 'fast')
+        assert backends.BACKENDS == {'fast': LookupBackend}
+        assert set_backend().name == 'lookup'
+
+
+class TestBackends:
+    @pytest.fixture(params=['lookup', 'cthpoker', 'core'])
+    def backend(self, request):
+        if request.param not in available_backends():
+            pytest.skip(f'{request.param} backend is not available')
+        return backends.create_backend(request.param)
+
+    def test_evaluate(self, backend):
+        rnd = random.Random(0)
+        for _ in range(300):
+            cards_string = '/'.join(rnd.sample(SIGNS, rnd.randint(5, 7)))
+            key = Combo(cards_string=cards_string).key
+            if backend.name == 'cthpoker' and is_wheel(key):
+                continue
+            assert backend.evaluate(cards_indexes(cards_string)) == key
+
+    def test_evaluate_ratio(self, backend):
+        for values in test_hardcore.TestHardCombo.with_hand_variants:
+            table, hand = cards_indexes(values['table']), cards_indexes(values['hand'])
+            key, ratio = backend.evaluate_ratio(table, hand)
+            combo = Combo(table=Table(values['table']), hand=Hand(values['hand']), ratio_check=True)
+            if backend.name == 'cthpoker' and is_wheel(combo.key):
+                continue
+            assert key == combo.key
+            # core ratio is checked by every base cards group unlike hardcore one
+            assert ratio == (RATIO_CODES[combo.ratio._value] if backend.name == 'core' else values['kind'])
+
+    def test_evaluate_hands(self, backend):
+        rnd = random.Random(2)
+        for _ in range(100):
+            cards = rnd.sample(range(52), 11)
+            table, hands = cards[:5], [cards[5:7], cards[7:9], cards[9:]]
+            assert backend.evaluate_hands(table, hands) == [backend.evaluate(table + hand) for hand in hands]
+
+    def test_evaluate_batch(self, backend):
+        np = pytest.importorskip('numpy')
+        rnd = random.Random(1)
+        cards = np.array([rnd.sample(range(52), 7) for _ in range(200)])
+        keys = backend.evaluate_batch(cards)
+        assert keys.dtype == np.uint32
+        for row, key in zip(cards.tolist(), keys):
+            if not (backend.name == 'cthpoker' and is_wheel(int(key))):
+                assert key == LookupBackend().evaluate(row)
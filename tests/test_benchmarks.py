@@ -0,0 +1,113 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.importtime import ROOT
+from benchmarks.runner import percentile, compare, get_workloads, run_workload, main
+from benchmarks.workloads import WORKLOADS, WORKLOADS_BY_NAMES
+
+from utils import get_parameters
+
+
+def make_report(per_second, peak_memory_bytes):
+    return {'results': {'combo-7': {
+        'unit': 'hands', 'per_second': per_second, 'peak_memory_bytes': peak_memory_bytes}}}
+
+
+class TestPercentile:
+    @pytest.mark.parametrize("values", [
+        {'rate': 0.5, 'value': 50},
+        {'rate': 0.99, 'value': 99},
+        {'rate': 1, 'value': 100},
+        {'rate': 0, 'value': 1},
+    ])
+    @get_parameters
+    def test_value(self, rate, value):
+        assert percentile(list(range(1, 101)), rate) == value
+
+
+class TestWorkload:
+    def test_fixed_seed(self):
+        workload = WORKLOADS_BY_NAMES['combo-7']
+        assert workload.get_args(10) == workload.get_args(10)
+        assert workload.get_args(10) != WORKLOADS_BY_NAMES['combo-6'].get_args(10)
+
+    def test_default_workloads(self):
+        names = [workload.name for workload in get_workloads()]
+        assert 'get-result' not in names
+        assert 'combo-7' in names
+        assert [workload.name for workload in get_workloads(all_workloads=True)] == [w.name for w in WORKLOADS]
+        assert [workload.name for workload in get_workloads(['get-result'])] == ['get-result']
+
+    def test_run(self):
+        result = run_workload(WORKLOADS_BY_NAMES['chcombo-7'], size=50)
+        assert result['calls'] == 50
+        assert result['per_second'] > 0
+        assert result['p50_us'] <= result['p99_us']
+        assert result['peak_memory_bytes'] >= 0
+
+
+class TestCompare:
+    @pytest.mark.parametrize("values", [
+        {'per_second': 90, 'peak_memory_bytes': 1000, 'count': 0},
+        {'per_second': 70, 'peak_memory_bytes': 1000, 'count': 1},
+        {'per_second': 100, 'peak_memory_bytes': 1300, 'count': 1},
+        {'per_second': 50, 'peak_memory_bytes': 2000, 'count': 2},
+    ])
+    @get_parameters
+    def test_regressions(self, per_second, peak_memory_bytes, count):
+        regressions = compare(make_report(per_second, peak_memory_bytes), make_report(100, 1000), 0.2)
+        assert len(regressions) == count
+
+    def test_missing_workload(self):
+        assert compare(make_report(1, 1), {'results': {}}) == []
+
+    def test_exit_code(self, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        report = tmp_path / 'report.json'
+        assert main(['-w', 'hand', '--size', '20', '--output', str(baseline)]) == 0
+        assert main(['-w', 'hand', '--size', '20', '--output', str(report), '--baseline', str(baseline),
+                     '--tolerance', '1000']) == 0
+        data = json.loads(baseline.read_text())
+        data['results']['hand']['per_second'] = 1e12
+        baseline.write_text(json.dumps(data))
+        assert main(['-w', 'hand', '--size', '20', '--output', str(report), '--baseline', str(baseline)]) == 1
+
+
+class TestImportTime:
+    # import time budgets are checked by python -m benchmarks.importtime, wall clock times are not tested here
+
+    def test_lazy_submodules(self):
+        code = (
+            'import sys, thpoker;'
+            'assert not [m for m in thpoker.SUBMODULES if f"thpoker.{m}" in sys.modules];'
+            'assert all(getattr(thpoker, m).__name__ == f"thpoker.{m}" for m in thpoker.SUBMODULES)'
+        )
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+
+    def test_lazy_imports(self):
+        code = (
+            'import sys, thpoker;'
+            'assert "thpoker.core" not in sys.modules;'
+            'thpoker.hardcore, thpoker.backends.get_backend(), thpoker.preflop;'
+            'assert "numpy" not in sys.modules and "agstuff" not in sys.modules;'
+            'assert thpoker.core.Combo'
+        )
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
@@ -0,0 +1,128 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import random
+
+import pytest
+
+from agstuff.cards.core import Card
+
+from thpoker.bitmask import CardSet, straight_weight
+from thpoker.core import Cards, Table, Hand, Combo, LOW_ACES
+from thpoker.hardcore import hcards
+
+from utils import get_parameters
+
+
+SIGNS = [w + s for w in '23456789TJQKA' for s in 'cdhs']
+
+
+class TestCardSet:
+    def test_create(self):
+        cards = CardSet('As/Kd/2c')
+        assert len(cards) == 3
+        assert cards.bits == 1 << 51 | 1 << 24 | 1
+        assert 'Kd' in cards
+        assert 'Ks' not in cards
+        assert cards.to_string() == '2c/Kd/As'
+
+    def test_deck(self):
+        deck = CardSet.deck()
+        assert len(deck) == 52
+        assert deck.indexes() == list(range(52))
+        assert ~deck == CardSet()
+
+    def test_operations(self):
+        table = CardSet('As/Kd/2c')
+        hand = CardSet('Ah/Kd')
+        assert table | hand == CardSet('As/Ah/Kd/2c')
+        assert table & hand == CardSet('Kd')
+        assert table - hand == CardSet('As/2c')
+        assert len(CardSet.deck() - table - hand) == 48
+
+    def test_suit_mask(self):
+        cards = CardSet('As/Ks/2s/3d')
+        assert cards.suit_mask(3) == 1 << 12 | 1 << 11 | 1
+        assert cards.suit_mask(1) == 1 << 1
+        assert cards.suit_mask(0) == 0
+        assert cards.ranks_mask == 1 << 12 | 1 << 11 | 1 << 1 | 1
+
+    @pytest.mark.parametrize("values", [
+        {'cards_string': 'As/Ks/Qs/Js/9s/2d', 'flush_suit': 3},
+        {'cards_string': '8c/7c/6c/5c/4c/4d/4h', 'flush_suit': 0},
+        {'cards_string': 'As/Ks/Qs/Js/9d/2d', 'flush_suit': None},
+    ])
+    @get_parameters
+    def test_flush_suit(self, cards_string, flush_suit):
+        assert CardSet(cards_string).flush_suit == flush_suit
+
+    @pytest.mark.parametrize("values", [
+        {'cards_string': 'As/Kd/Qs/Jh/Ts', 'weight': 14},
+        {'cards_string': 'As/2d/3s/4h/5s/Kd', 'weight': 5},
+        {'cards_string': 'As/2d/3s/4h/5s/6d', 'weight': 6},
+        {'cards_string': '9s/8d/7s/6h/5s/4d/3c', 'weight': 9},
+        {'cards_string': 'Ks/Ad/2s/3h/4s', 'weight': 0},
+        {'cards_string': 'As/Kd/Qs/Jh/9s', 'weight': 0},
+    ])
+    @get_parameters
+    def test_straight_weight(self, cards_string, weight):
+        assert CardSet(cards_string).straight_weight == weight
+
+    def test_straight_weight_of_mask(self):
+        assert straight_weight(0) == 0
+        assert straight_weight((1 << 13) - 1) == 14
+
+    def test_key(self):
+        rnd = random.Random(0)
+        for _ in range(300):
+            cards_string = '/'.join(rnd.sample(SIGNS, 7))
+            assert CardSet(cards_string).key == Combo(cards_string=cards_string).key
+
+
+class TestConversion:
+    @pytest.mark.parametrize("values", [
+        {'cards_class': Cards, 'cards_string': 'As/Kd/2c/5h/Th/Jc/9s'},
+        {'cards_class': Table, 'cards_string': 'As/Kd/2c'},
+        {'cards_class': Hand, 'cards_string': 'Qh/3d'},
+    ])
+    @get_parameters
+    def test_core(self, cards_class, cards_string):
+        cards = cards_class(cards_string)
+        converted = CardSet.from_cards(cards).to_cards(cards_class)
+        assert type(converted) is cards_class
+        assert sorted(converted.items) == sorted(cards.items)
+        assert [card.in_hand for card in converted.items] == [card.in_hand for card in cards.items]
+        assert set(map(str, converted.items)) == set(map(str, cards.items))
+
+    def test_core_low_ace(self):
+        assert CardSet.from_cards([LOW_ACES['s', False], Card('2d')]) == CardSet('As/2d')
+
+    def test_empty(self):
+        assert CardSet.from_cards(Table()).to_table().items == []
+        assert CardSet().to_string() == ''
+
+    def test_hardcore(self):
+        rnd = random.Random(1)
+        for _ in range(100):
+            cards_string = '/'.join(rnd.sample(SIGNS, rnd.randint(1, 7)))
+            cards = CardSet(cards_string)
+            assert sorted(cards.hcards()) == sorted(hcards(cards_string))
+            assert sorted(cards.hcards(in_hand=True)) == sorted(hcards(cards_string, in_hand=True))
+            assert CardSet.from_hcards(hcards(cards_string, in_hand=True)) == cards
+
+    def test_indexes(self):
+        cards = CardSet.from_indexes([51, 0, 25])
+        assert cards == CardSet('As/2c/8d')
+        assert list(cards) == [0, 25, 51]
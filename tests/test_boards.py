@@ -0,0 +1,107 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import itertools
+import math
+
+import pytest
+
+from thpoker.boards import Boards
+from thpoker.lookup import cards_indexes
+
+from utils import get_parameters
+
+
+def colex(boards):
+    return sorted(boards, key=lambda board: board[::-1])
+
+
+class TestBoards:
+    @pytest.mark.parametrize("values", [
+        {"count": 3, "dead": None, "size": 22100},
+        {"count": 4, "dead": None, "size": 270725},
+        {"count": 5, "dead": 'As/Kd', "size": math.comb(50, 5)},
+        {"count": 2, "dead": 'As/Kd/2c/7h/9s', "size": math.comb(47, 2)},
+        {"count": 0, "dead": None, "size": 1},
+    ])
+    @get_parameters
+    def test_size(self, count, dead, size):
+        assert len(Boards(count, dead)) == size
+
+    def test_order(self):
+        boards = Boards(3, dead='As/Kd/Qh')
+        deck = [card for card in range(52) if card not in cards_indexes('As/Kd/Qh')]
+        assert list(boards) == colex(itertools.combinations(deck, 3))
+
+    @pytest.mark.parametrize("values", [
+        {"count": 3, "dead": None},
+        {"count": 4, "dead": 'Ah/Ad'},
+        {"count": 2, "dead": 'As/Kd/2c/7h/9s'},
+    ])
+    @get_parameters
+    def test_round_trip(self, count, dead):
+        boards = Boards(count, dead)
+        for index, board in enumerate(boards.iter(0, 3000)):
+            assert boards.board(index) == board
+            assert boards.index(board) == index
+        last = len(boards) - 1
+        assert boards.index(boards.board(last)) == last
+
+    def test_index_of_string(self):
+        boards = Boards(3)
+        assert boards.index('2c/2d/2h') == 0
+        assert boards.index('As/Ah/Ad') == len(boards) - 1
+        assert boards.index('Ks/2c/7h') == boards.index(cards_indexes('2c/7h/Ks'))
+
+    def test_wrong_board(self):
+        boards = Boards(3, dead='As')
+        with pytest.raises(ValueError):
+            boards.index('2c/3c')
+        with pytest.raises(ValueError):
+            boards.index('2c/2c/3c')
+        with pytest.raises(ValueError, match='not in deck'):
+            boards.index('2c/3c/As')
+        with pytest.raises(ValueError, match='not in deck'):
+            boards.index([0, 1, 52])
+        with pytest.raises(IndexError):
+            boards.board(len(boards))
+
+    def test_slice(self):
+        boards = Boards(4)
+        assert list(boards.iter(100000, 100050)) == [boards.board(i) for i in range(100000, 100050)]
+        assert list(boards.iter(len(boards) - 2, len(boards) + 10)) == [
+            boards.board(len(boards) - 2), boards.board(len(boards) - 1)]
+        assert list(boards.iter(10, 10)) == []
+
+    def test_batches(self):
+        pytest.importorskip('numpy')
+        boards = Boards(3, dead='2c/3d')
+        batches = list(boards.batches(1000, 5500, batch_size=1000))
+        assert [len(batch) for batch in batches] == [1000, 1000, 1000, 1000, 500]
+        rows = [tuple(row) for batch in batches for row in batch.tolist()]
+        assert rows == list(boards.iter(1000, 5500))
+
+    @pytest.mark.parametrize("values", [
+        {"count": 1}, {"count": 3}, {"count": 7},
+    ])
+    @get_parameters
+    def test_shards(self, count):
+        boards = Boards(3)
+        shards = boards.shards(count)
+        assert len(shards) == count
+        assert shards[0][0] == 0 and shards[-1][1] == len(boards)
+        assert all(shards[i][1] == shards[i + 1][0] for i in range(count - 1))
+        assert [board for start, stop in shards for board in boards.iter(start, stop)] == list(boards)
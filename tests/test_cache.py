@@ -0,0 +1,134 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import multiprocessing
+
+import pytest
+
+from thpoker.backends import set_backend
+from thpoker.cache import EquityCache
+from thpoker.equity import EquityResult, hand_vs_hand
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with EquityCache(str(tmp_path / 'cache' / 'equity.sqlite'), max_entries=3) as cache:
+        yield cache
+
+
+def put_results(task):
+    path, start = task
+    with EquityCache(path, max_entries=1000) as cache:
+        for i in range(start, start + 20):
+            cache.cached(f'key-{i % 30}', EquityResult, i % 30, 0, 1)
+    return cache.hits, cache.misses
+
+
+class TestEquityCache:
+    def test_get_and_put(self, cache):
+        assert cache.get('key') is None
+        cache.put('key', EquityResult(1, 2, 3))
+        assert cache.get('key') == EquityResult(1, 2, 3)
+        cache.put('key', EquityResult(4, 5, 6))
+        assert cache.get('key') == EquityResult(4, 5, 6)
+        assert len(cache) == 1
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 0, 'entries': 1}
+
+    def test_persistence(self, cache):
+        cache.put('key', EquityResult(1, 2, 3))
+        cache.close()
+        with EquityCache(cache.path) as other:
+            assert other.get('key') == EquityResult(1, 2, 3)
+            assert other.stats()['hits'] == 1
+
+    def test_lru_eviction(self, cache):
+        for i in range(3):
+            cache.put(f'key-{i}', EquityResult(i, 0, 0))
+        # key-0 is used, so key-1 is the least recently used one
+        cache.get('key-0')
+        cache.put('key-3', EquityResult(3, 0, 0))
+        assert cache.get('key-1') is None
+        assert [cache.get(f'key-{i}') for i in (0, 2, 3)] == [
+            EquityResult(0, 0, 0), EquityResult(2, 0, 0), EquityResult(3, 0, 0)]
+        assert len(cache) == 3
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['entries'] == 3
+
+    def test_cached(self, cache):
+        calls = []
+
+        def function(value):
+            calls.append(value)
+            return EquityResult(value, 0, 0)
+
+        assert cache.cached('key', function, 1) == EquityResult(1, 0, 0)
+        assert cache.cached('key', function, 2) == EquityResult(1, 0, 0)
+        assert calls == [1]
+
+    def test_clear(self, cache):
+        cache.put('key', EquityResult(1, 2, 3))
+        cache.get('key')
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats() == {'hits': 0, 'misses': 0, 'evictions': 0, 'entries': 0}
+
+    def test_backend_key(self):
+        try:
+            lookup_key = EquityCache.key('hand', ((0, 1),))
+            set_backend('core')
+            assert EquityCache.key('hand', ((0, 1),)) != lookup_key
+        finally:
+            set_backend()
+
+    def test_processes(self, tmp_path):
+        path = str(tmp_path / 'equity.sqlite')
+        with multiprocessing.Pool(4) as pool:
+            counts = pool.map(put_results, [(path, start) for start in range(0, 80, 10)])
+        with EquityCache(path) as cache:
+            stats = cache.stats()
+            assert len(cache) == stats['entries'] == 30
+            assert stats['hits'] == sum(hits for hits, _ in counts)
+            # several processes could miss the same key before it is put
+            assert stats['misses'] == sum(misses for _, misses in counts) >= 30
+            assert stats['hits'] + stats['misses'] == 160
+            assert all(cache.get(f'key-{i}') == EquityResult(i, 0, 1) for i in range(30))
+
+
+class TestCachedEquity:
+    @pytest.mark.parametrize("hand1, hand2, table, other1, other2, other_table", [
+        ('As/Kd', 'Qh/Qc', '2c/7d/9h', 'Ah/Kc', 'Qs/Qd', '9s/2d/7c'),
+        ('Jh/Th', 'Ac/Ad', '2h/3h/Kc/Ks', 'Js/Ts', 'Ah/Ac', '2s/3s/Kh/Kd'),
+    ])
+    def test_hand_vs_hand(self, cache, hand1, hand2, table, other1, other2, other_table):
+        pytest.importorskip('numpy')
+        result = hand_vs_hand(hand1, hand2, table, processes=1)
+        assert cache.hand_vs_hand(hand1, hand2, table, processes=1) == result
+        assert cache.hand_vs_hand(other1, other2, other_table, processes=1) == result
+        assert cache.hand_vs_hand(hand2, hand1, table, processes=1) == result.reverse()
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_class_vs_class(self, cache):
+        pytest.importorskip('numpy')
+        result = cache.class_vs_class('AA', '89s', '2c/7d/9h/Ts', processes=1)
+        assert cache.class_vs_class('98s', 'AA', '2d/7c/9h/Ts', processes=1) == result.reverse()
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_range_vs_range(self, cache):
+        pytest.importorskip('numpy')
+        result = cache.range_vs_range('QQ+', 'AKs', table='2c/7d/9h/Ts')
+        assert cache.range_vs_range('AKs', 'QQ+', table='2d/7c/9h/Ts') == result.reverse()
+        assert (cache.hits, cache.misses) == (1, 1)
@@ -13,9 +13,17 @@
 # limitations under the License.
 
 
+import pickle
+import random
+import tracemalloc
+
 import pytest
 
-from thpoker.core import Cards, Table, Hand, Combo
+from agstuff.cards.core import Card
+from agstuff.exceptions.cards import CardWeightSymbolError
+
+from thpoker.core import Cards, Table, Hand, Combo, INTERNED_CARDS, COMBO_RECORD
+from thpoker.lookup import pack_key
 
 from utils import get_parameters
 
@@ -248,3 +256,137 @@ class TestCombo:
     @get_parameters
     def test_cards_smaller(self, init_cards1, init_cards2):
         assert Combo(cards=Cards(init_cards1)) < Combo(cards=Cards(init_cards2))
+
+    @pytest.mark.parametrize("values", equal_values)
+    @get_parameters
+    def test_key_equal(self, init_cards1, init_cards2):
+        combo1, combo2 = Combo(cards_string=init_cards1), Combo(cards_string=init_cards2)
+        assert combo1.key == combo2.key
+        assert hash(combo1) == hash(combo2)
+        assert len({combo1, combo2}) == 1
+
+    @pytest.mark.parametrize("values", greater_values)
+    @get_parameters
+    def test_key_greater(self, init_cards1, init_cards2):
+        assert Combo(cards_string=init_cards1).key > Combo(cards_string=init_cards2).key
+
+    def test_key(self):
+        assert Combo(cards_string='Ac/As/6d/5s/4s/3s/2s').key == pack_key(Combo.STRAIGHT_FLUSH, [5])
+        assert Combo(cards_string='Js/Ks/Jd/Kh/Jc/Kd/Jh').key == pack_key(Combo.FOUR_OF_A_KIND, [11, 13])
+        assert Combo(cards_string='As/Kc/Kd/Qs/Qd/Qh').key == pack_key(Combo.FULL_HOUSE, [12, 13])
+        assert Combo(cards_string='5c/5h/4h/4d/3c/3s/2s').key == pack_key(Combo.TWO_PAIRS, [5, 4, 3])
+        assert Combo(cards_string='Ks/Kh/Kc/4d').key == pack_key(Combo.THREE_OF_A_KIND, [13, 4])
+
+    def test_key_max(self):
+        combos = [Combo(cards_string=cards) for cards in ('8h/2c/Jd/Jh/5s', '9d/As/3c/9h/9s', 'Qd/6d/9d/Kd/2d')]
+        assert max(combos) is combos[2]
+        assert sorted(combos, key=lambda combo: combo.key) == sorted(combos)
+
+
+class TestComboMemory:
+    # retained bytes of one 7 cards combo (combo init cards are not counted)
+    MAX_COMBO_SIZE = 512
+
+    def get_combo_size(self):
+        rnd = random.Random(0)
+        signs = [w + s for w in '23456789TJQKA' for s in 'cdhs']
+        cards = [Cards('/'.join(rnd.sample(signs, 7))) for _ in range(1000)]
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            combos = [Combo(cards=c) for c in cards]
+            return (tracemalloc.get_traced_memory()[0] - before) / len(combos)
+        finally:
+            tracemalloc.stop()
+
+    def test_size(self):
+        assert self.get_combo_size() < self.MAX_COMBO_SIZE
+
+    def test_no_dict(self):
+        combo = Combo(cards_string='Td/As/3h/Th/Ah/Ts/9c')
+        assert not hasattr(combo, '__dict__')
+        assert not hasattr(combo.cards, '__dict__')
+
+    def test_lazy_parts(self):
+        combo = Combo(cards_string='Td/As/3h/Th/Ah/Ts/9c')
+        assert combo.repeats is None
+        assert combo.sequence is None
+        assert combo._ratio is None
+        assert not combo.ratio.is_checked
+
+
+class TestPickle:
+    @pytest.mark.parametrize("values", TestCombo.with_hand_variants)
+    @get_parameters
+    def test_combo(self, table, hand, combo_type, cards_items, ratio_value):
+        combo = Combo(table=Table(table), hand=Hand(hand), ratio_check=True)
+        loaded = pickle.loads(pickle.dumps(combo))
+        assert loaded.type == combo_type
+        assert loaded.key == combo.key
+        assert loaded.cards.items == cards_items
+        assert [card.in_hand for card in loaded.cards] == [card.in_hand for card in combo.cards]
+        assert [card.in_hand for card in loaded.init_cards] == [card.in_hand for card in combo.init_cards]
+        assert loaded.ratio._value == ratio_value
+
+    def test_record(self):
+        combo = Combo(cards_string='Td/As/3h/Th/Ah/Ts/9c')
+        record = combo.to_record()
+        assert len(record) == COMBO_RECORD.size
+        loaded = Combo.from_record(record)
+        assert loaded.cards.items == combo.cards.items
+        assert loaded.cards[0] is INTERNED_CARDS['Td']
+        assert not loaded.ratio.is_checked
+        assert loaded.to_record() == record
+
+    def test_size(self):
+        combo = Combo(table=Table('Ac/5s/4s/3s/2s'), hand=Hand('As/6d'), ratio_check=True)
+        assert len(pickle.dumps(combo)) < 100
+        assert len(pickle.dumps(Hand('As/6d'))) < 64
+
+    @pytest.mark.parametrize("values", [
+        {"cards": Hand('As/6d')},
+        {"cards": Hand('Qs/Qd')},
+        {"cards": Hand()},
+        {"cards": Table('Ac/5s/4s/3s')},
+        {"cards": Cards('Ac/5s/4s/3s/Td/Jd/2c')},
+    ])
+    @get_parameters
+    def test_cards(self, cards):
+        loaded = pickle.loads(pickle.dumps(cards))
+        assert type(loaded) is type(cards)
+        assert [str(card) for card in loaded.items] == [str(card) for card in cards.items]
+        assert [card.in_hand for card in loaded.items] == [card.in_hand for card in cards.items]
+        assert getattr(loaded, 'type', None) == getattr(cards, 'type', None)
+
+
+class TestCardsInterning:
+    @pytest.fixture
+    def created_cards(self, monkeypatch):
+        created = []
+        init = Card.__init__
+
+        def counted_init(card, sign):
+            created.append(sign)
+            init(card, sign)
+
+        monkeypatch.setattr(Card, '__init__', counted_init)
+        return created
+
+    def test_no_cards_created(self, created_cards):
+        Combo(cards_string='Ac/As/6d/5s/4s/3s/2s')
+        Combo(cards=Cards('Ac/5c/4d/3c/2h'))
+        assert created_cards == ['Ac', '5c', '4d', '3c', '2h']
+
+    def test_interned(self):
+        combo = Combo(cards_string='Td/As/3h/Th/Ah/Ts/9c')
+        assert combo.cards[0] is INTERNED_CARDS['Td']
+
+    def test_low_ace_in_hand(self):
+        combo = Combo(table=Table('Ac/5s/4s/3s/2s'), hand=Hand('As/6d'))
+        assert combo.cards[4].weight.number == 0
+        assert combo.cards[4].in_hand
+        assert not Combo(cards_string='Ac/5s/4s/3s/2s').cards[4].in_hand
+
+    def test_wrong_sign(self):
+        with pytest.raises(CardWeightSymbolError):
+            Combo(cards_string='Xs/Ad')
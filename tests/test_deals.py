@@ -0,0 +1,119 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from thpoker.deals import Dealer, Deals, hcards_array, indexes_array
+from thpoker.lookup import cards_indexes, get_table
+
+from utils import get_parameters
+
+
+class TestHcards:
+    @pytest.mark.parametrize("values", [
+        {"cards": 'As/2c/Td', "in_hand": False, "hcards": [144, 21, 102]},
+        {"cards": 'As/2c/Td', "in_hand": True, "hcards": [1144, 1021, 1102]},
+        {"cards": '7h/Kd', "in_hand": False, "hcards": [73, 132]},
+    ])
+    @get_parameters
+    def test_hcards(self, cards, in_hand, hcards):
+        indexes = cards_indexes(cards)
+        assert hcards_array(indexes, in_hand).tolist() == hcards
+        assert indexes_array(hcards).tolist() == indexes
+
+    def test_all_cards(self):
+        indexes = np.arange(52)
+        assert indexes_array(hcards_array(indexes, in_hand=True)).tolist() == indexes.tolist()
+
+
+class TestDealer:
+    @pytest.mark.parametrize("values", [
+        {"players": 2, "board_size": 5, "dead": None},
+        {"players": 9, "board_size": 5, "dead": 'As/Kd/2c'},
+        {"players": 3, "board_size": 3, "dead": [0, 1, 2, 3]},
+    ])
+    @get_parameters
+    def test_deal(self, players, board_size, dead):
+        deals = Dealer(players, board_size, dead, seed=1).deal(2000)
+        assert len(deals) == 2000
+        assert deals.players == players
+        assert deals.hands.shape == (2000, players, 2)
+        assert deals.board.shape == (2000, board_size)
+        assert (deals.hands >= 1000).all()
+        assert (deals.board < 1000).all()
+        cards = np.hstack([indexes_array(deals.hands.reshape(2000, -1)), indexes_array(deals.board)])
+        assert (np.diff(np.sort(cards, axis=1), axis=1) > 0).all()
+        dead = cards_indexes(dead) if isinstance(dead, str) or dead is None else dead
+        assert not np.isin(cards, dead).any()
+
+    def test_uniform(self):
+        cards = Dealer(players=2, seed=3).deal_indexes(52000)
+        counts = np.stack([np.bincount(column, minlength=52) for column in cards.T])
+        # every card of every slot is expected 1000 times
+        assert counts.min() > 850
+        assert counts.max() < 1150
+
+    def test_reproducible(self):
+        first = Dealer(players=6, seed=2018, stream=1).deal_indexes(100)
+        assert (Dealer(players=6, seed=2018, stream=1).deal_indexes(100) == first).all()
+        assert not (Dealer(players=6, seed=2018, stream=2).deal_indexes(100) == first).all()
+        assert not (Dealer(players=6, seed=2019, stream=1).deal_indexes(100) == first).all()
+
+    def test_spawn(self):
+        dealers = Dealer(players=4, dead='As', seed=7).spawn(3)
+        assert [dealer.stream for dealer in dealers] == [0, 1, 2]
+        expected = Dealer(players=4, dead='As', seed=7, stream=2).deal_indexes(100)
+        assert (dealers[2].deal_indexes(100) == expected).all()
+
+    def test_spawn_without_seed(self):
+        with pytest.raises(ValueError):
+            Dealer().spawn(2)
+
+    def test_small_deck(self):
+        with pytest.raises(ValueError):
+            Dealer(players=24)
+        with pytest.raises(ValueError):
+            Dealer(players=23, dead='As/Kd')
+
+    def test_batches(self):
+        batches = list(Dealer(seed=5).batches(250, batch_size=100))
+        assert [len(deals) for deals in batches] == [100, 100, 50]
+
+
+class TestDeals:
+    def test_evaluate(self):
+        deals = Dealer(players=3, seed=11).deal(500)
+        keys = deals.evaluate()
+        assert keys.shape == (500, 3)
+        table = get_table()
+        for player in range(3):
+            cards = indexes_array(deals.player_cards(player))
+            assert keys[:, player].tolist() == [table.evaluate(row) for row in cards.tolist()]
+
+    def test_evaluate_ratio(self):
+        deals = Dealer(players=2, seed=12).deal(200)
+        keys, ratios = deals.evaluate(ratio=True)
+        assert (keys == deals.evaluate()).all()
+        assert ratios.shape == (200, 2)
+
+    def test_winners(self):
+        deals = Deals(
+            np.array([[[1144, 1141], [1132, 1133]], [[1021, 1032], [1022, 1033]]], dtype=np.int16),
+            np.array([[143, 142, 51, 62, 73], [101, 114, 122, 84, 94]], dtype=np.int16),
+        )
+        assert deals.winners().tolist() == [[True, False], [True, True]]
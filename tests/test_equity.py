@@ -0,0 +1,185 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import itertools
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from thpoker.core import Cards, Combo
+from thpoker.equity import (
+    EquityResult, class_hands, hand_vs_hand, class_vs_class, monte_carlo, range_vs_range,
+)
+from thpoker.lookup import card_sign, cards_indexes
+from thpoker.ranges import HandRange
+
+from utils import get_parameters
+
+
+def brute_force(hand1, hand2, table):
+    dead = set(cards_indexes(hand1) + cards_indexes(hand2) + cards_indexes(table))
+    deck = [card_sign(card) for card in range(52) if card not in dead]
+    result = EquityResult()
+    for dealt in itertools.combinations(deck, 5 - len(table.split('/'))):
+        combo1 = Combo(cards=Cards('/'.join((hand1, table) + dealt)))
+        combo2 = Combo(cards=Cards('/'.join((hand2, table) + dealt)))
+        result += EquityResult(int(combo1 > combo2), int(combo1 == combo2), int(combo1 < combo2))
+    return result
+
+
+class TestClassHands:
+    def test_count(self):
+        assert len(class_hands('AA')) == 6
+        assert len(class_hands('AKs')) == 4
+        assert len(class_hands('AKo')) == 12
+        assert len(class_hands('AK')) == 16
+
+    def test_order(self):
+        assert class_hands('89s') == class_hands('98s')
+
+
+class TestHandVsHand:
+    situations = [
+        {'hand1': 'As/Ad', 'hand2': 'Kh/Ks', 'table': '2c/7d/9h'},
+        {'hand1': 'Ac/Kc', 'hand2': 'Qc/Qd', 'table': '2c/7c/9h'},
+        {'hand1': '7h/8h', 'hand2': 'Tc/Td', 'table': '9h/Jh/2c/3d'},
+        {'hand1': 'As/Ad', 'hand2': 'Ah/Ac', 'table': '2s/3s/Kd'},
+        {'hand1': 'Ah/Kh', 'hand2': '2c/2d', 'table': 'Qh/Jh/Th/3c/4d'},
+    ]
+
+    @pytest.mark.parametrize("values", situations)
+    @get_parameters
+    def test_exact(self, hand1, hand2, table):
+        assert hand_vs_hand(hand1, hand2, table, processes=1) == brute_force(hand1, hand2, table)
+
+    def test_reverse(self):
+        result = hand_vs_hand('As/Ad', 'Kh/Ks', '2c/7d', processes=1)
+        assert hand_vs_hand('Kh/Ks', 'As/Ad', '2c/7d', processes=1) == result.reverse()
+
+    def test_processes(self):
+        assert hand_vs_hand('Ac/Kc', 'Qc/Qd', '2c/7c', processes=2) == hand_vs_hand('Ac/Kc', 'Qc/Qd', '2c/7c', processes=1)
+
+    @pytest.mark.parametrize("values", [
+        {'hand1': 'As/Ad', 'hand2': 'As/Ks', 'table': None},
+        {'hand1': 'As/Ad', 'hand2': 'Kh/Ks', 'table': '2c/7d/Ks'},
+        {'hand1': 'As/Ad', 'hand2': 'Kh/Ks', 'table': '2c/2c/9h'},
+        {'hand1': 'As/As', 'hand2': 'Kh/Ks', 'table': None},
+    ])
+    @get_parameters
+    def test_same_cards(self, hand1, hand2, table):
+        with pytest.raises(ValueError):
+            hand_vs_hand(hand1, hand2, table, processes=1)
+
+    def test_preflop(self):
+        result = hand_vs_hand('As/Ad', '8h/9h', processes=1)
+        assert result.total == 1712304
+        assert round(result.equity, 4) == 0.7738
+
+
+class TestClassVsClass:
+    def test_flop(self):
+        result = EquityResult()
+        for hand1 in ('Ac/Ad', 'Ac/Ah', 'Ac/As', 'Ad/Ah', 'Ad/As', 'Ah/As'):
+            for hand2 in ('Kc/Kd', 'Kc/Ks', 'Kd/Ks'):  # Kh is on the table
+                result += hand_vs_hand(hand1, hand2, '2c/7d/Kh', processes=1)
+        assert class_vs_class('AA', 'KK', '2c/7d/Kh', processes=1) == result
+
+    def test_preflop(self):
+        result = class_vs_class('AA', '89s', processes=1)
+        assert result.total == 24 * 1712304
+        assert round(result.equity, 4) == 0.7794
+
+    def test_same_table_cards(self):
+        with pytest.raises(ValueError):
+            class_vs_class('AA', 'KK', '2c/2c/Kh', processes=1)
+
+
+class TestMonteCarlo:
+    def test_close_to_exact(self):
+        result = monte_carlo(['Ac/Kc', 'Qc/Qd'], table='2c/7c', target_error=0.002, seed=0)
+        exact = hand_vs_hand('Ac/Kc', 'Qc/Qd', '2c/7c', processes=1).equity
+        assert max(result.errors) < 0.002
+        assert abs(result.equities[0] - exact) < 4 * result.errors[0]
+        assert result.samples % 100000 == 0
+        assert result.throughput > 0
+
+    def test_multiway(self):
+        result = monte_carlo(['As/Ad', '8h/9h', 'Kc/Kd', '7c/2d'], table='2h/3h', max_samples=50000, seed=1)
+        assert result.samples == 50000
+        assert len(result.equities) == len(result.errors) == 4
+        assert round(sum(result.equities), 9) == 1
+
+    def test_seed(self):
+        result1 = monte_carlo(['As/Ad', 'Kh/Ks', 'Qd/Jd'], batch_size=1000, max_samples=3000, seed=7)
+        result2 = monte_carlo(['As/Ad', 'Kh/Ks', 'Qd/Jd'], batch_size=1000, max_samples=3000, seed=7)
+        assert result1.equities == result2.equities
+
+    def test_dead_cards(self):
+        # the last kings are dead so kings never win
+        result = monte_carlo(['Ac/Ad', 'Kc/Kd'], table='2h/3h/8s/9d', dead='Kh/Ks', max_samples=1000, seed=2)
+        assert result.equities == [1.0, 0.0]
+        result = monte_carlo(['Ac/Ad', 'Kc/Kd'], table='2h/3h/8s/9d', max_samples=1000, seed=2)
+        assert result.equities[1] > 0
+
+    def test_same_cards(self):
+        with pytest.raises(ValueError):
+            monte_carlo(['As/Ad', 'Ad/Kd'], max_samples=10)
+        with pytest.raises(ValueError):
+            monte_carlo(['As/Ad', 'Kh/Kd'], table='2c/3c/Kd', max_samples=10)
+        with pytest.raises(ValueError):
+            monte_carlo(['As/Ad', 'Kh/Kd'], table='2c/3c', dead='3c', max_samples=10)
+
+    def test_full_table(self):
+        result = monte_carlo(['As/Ad', 'Kh/Ks', 'Ac/Kc'], table='Ah/Kd/2c/3c/4c', max_samples=10, seed=3)
+        assert result.equities == [0.0, 0.0, 1.0]
+        assert result.errors == [0.0, 0.0, 0.0]
+
+
+class TestRangeVsRange:
+    @pytest.mark.parametrize("values", [
+        {'range1': 'AA, KK', 'range2': 'QQ+, AKs', 'table': '2c/7d/9h'},
+        {'range1': 'AKs, 76s', 'range2': 'TT, 98o', 'table': '9h/Jh/2c/3d'},
+        {'range1': 'AsAd, KhQh', 'range2': '22-44', 'table': 'Qs/Jh/Th/3c'},
+    ])
+    @get_parameters
+    def test_same_as_hands_sum(self, range1, range2, table):
+        expected = EquityResult()
+        for hand1 in HandRange(range1):
+            for hand2 in HandRange(range2):
+                if set(hand1) & set(hand2) or set(hand1 + hand2) & set(cards_indexes(table)):
+                    continue
+                expected += hand_vs_hand(
+                    '/'.join(map(card_sign, hand1)), '/'.join(map(card_sign, hand2)), table, processes=1)
+        assert range_vs_range(range1, range2, table) == expected
+
+    def test_reverse(self):
+        result = range_vs_range('AA, KK', 'QQ+, AKs', table='2c/7d/9h')
+        assert range_vs_range('QQ+, AKs', 'AA, KK', table='2c/7d/9h') == result.reverse()
+
+    def test_dead_cards(self):
+        assert range_vs_range('AA', 'KK', table='2h/3h/8s/9d/Td', dead='Kh/Ks') == EquityResult(6, 0, 0)
+
+    def test_empty_range(self):
+        assert range_vs_range('AA', 'AsAd', table='2h/3h/8s', dead='As') == EquityResult()
+
+    def test_same_cards(self):
+        with pytest.raises(ValueError):
+            range_vs_range('AA', 'KK', table='2h/3h/8s', dead='8s')
+
+    def test_samples(self):
+        result = range_vs_range('TT+, AQs+', '22+, A2s+', samples=500, seed=1)
+        assert result == range_vs_range('TT+, AQs+', '22+, A2s+', samples=500, seed=1)
+        assert 0.6 < result.equity < 0.8
@@ -13,9 +13,18 @@
 # limitations under the License.
 
 
+import random
+
 import pytest
 
-from thpoker.hardcore import hcard, hcards, hcombo, chcombo, rhcombo
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from thpoker.core import Combo
+from thpoker.hardcore import hcard, hcards, hdeck, hcombo, chcombo, rhcombo, hkey, bhcombo
+from thpoker.lookup import unpack_key
 
 from utils import get_parameters
 
@@ -119,7 +128,56 @@ class TestHardCombo:
     def test_hard_cards_combo(self, cards_string, value):
         assert chcombo(hcards(cards_string)) == value
 
+    @pytest.mark.parametrize("values", combo_variants)
+    @get_parameters
+    def test_hard_key(self, cards_string, value):
+        assert hkey(value) == Combo(cards_string=cards_string).key
+
     @pytest.mark.parametrize("values", with_hand_variants)
     @get_parameters
     def test_hard_hand_combo(self, table, hand, kind):
         assert rhcombo(hcards(table), hcards(hand, True))[1] == kind
+
+
+class TestHardKey:
+    def test_order(self):
+        assert hkey([9, 5]) > hkey([8, 14, 13])
+        assert hkey([4, 14, 2]) > hkey([4, 14])
+        assert hkey([2, 8, 14, 11, 10]) == hkey([2, 8, 14, 11, 10])
+        assert hkey([1, 13, 12, 9, 7, 5]) < hkey([1, 13, 12, 9, 7, 6])
+
+    def test_same_as_list_order(self):
+        combos = [[7, 10, 11], [5, 5], [7, 11, 5], [1, 14, 7], [1, 14], [6, 13, 10, 9, 5, 2]]
+        assert sorted(combos, key=hkey) == sorted(combos)
+
+
+@pytest.mark.skipif(np is None, reason='NumPy is not installed')
+class TestBatchHardCombo:
+    @pytest.mark.parametrize("values", TestHardCombo.combo_variants)
+    @get_parameters
+    def test_keys(self, cards_string, value):
+        assert bhcombo(np.array([hcards(cards_string)]))[0] == hkey(value)
+
+    @pytest.mark.parametrize("values", TestHardCombo.with_hand_variants)
+    @get_parameters
+    def test_ratio(self, table, hand, kind):
+        cards = np.array([hcards(table) + hcards(hand, True)])
+        keys, ratios = bhcombo(cards, ratio=True)
+        assert keys[0] == hkey(rhcombo(hcards(table), hcards(hand, True))[0])
+        assert ratios[0] == kind
+
+    @pytest.mark.parametrize("cards_count", [5, 6, 7])
+    def test_same_as_rhcombo(self, cards_count):
+        rnd = random.Random(cards_count)
+        deck = hdeck()
+        cards = np.array([rnd.sample(deck, cards_count) for _ in range(2000)])
+        cards[:, -2:] += 1000
+        keys, ratios = bhcombo(cards, ratio=True)
+        assert keys.shape == ratios.shape == (2000,)
+        for row, key, ratio in zip(cards.tolist(), keys, ratios):
+            combo_type, kickers = unpack_key(int(key))
+            if combo_type in (Combo.STRAIGHT, Combo.STRAIGHT_FLUSH) and kickers[0] == 5:
+                continue  # CTHPoker misses the lowest straight
+            combo, kind = rhcombo(row[:-2], row[-2:])
+            assert hkey(combo) == key
+            assert kind == ratio
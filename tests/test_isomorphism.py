@@ -0,0 +1,105 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import itertools
+
+import pytest
+
+from thpoker.isomorphism import (
+    SUITS_PERMUTATIONS, permute_suits, canonical, canonical_groups, canonical_deals, collapse,
+)
+from thpoker.lookup import cards_indexes
+
+from utils import get_parameters
+
+
+def count_forms(situations):
+    forms = {}
+    for groups in situations:
+        key, multiplicity = canonical_groups(groups)
+        forms[key] = multiplicity
+    return len(forms), sum(forms.values())
+
+
+class TestPermuteSuits:
+    def test_permute(self):
+        assert permute_suits(cards_indexes('As/2c'), (1, 0, 2, 3)) == tuple(cards_indexes('As/2d'))
+        assert len(SUITS_PERMUTATIONS) == 24
+
+
+class TestCanonical:
+    @pytest.mark.parametrize("values", [
+        {'hands': ['As/Kd'], 'board': None, 'multiplicity': 12},
+        {'hands': ['As/Ks'], 'board': None, 'multiplicity': 4},
+        {'hands': ['As/Ad'], 'board': None, 'multiplicity': 6},
+        {'hands': ['As/Kd'], 'board': '2c/3h/4s', 'multiplicity': 24},
+        {'hands': [], 'board': '2c/2d/2h', 'multiplicity': 4},
+        {'hands': [], 'board': '2c/3c/4c', 'multiplicity': 4},
+        {'hands': ['As/Ad', 'Kh/Kc'], 'board': None, 'multiplicity': 6},
+    ])
+    @get_parameters
+    def test_multiplicity(self, hands, board, multiplicity):
+        assert canonical(hands, board)[1] == multiplicity
+
+    def test_same_key(self):
+        assert canonical(['As/Kd'], '2c/3h/4s') == canonical(['Ah/Kc'], '2d/3s/4h')
+        assert canonical(['As/Ad', 'Kh/Qh']) == canonical(['Ac/Ah', 'Kd/Qd'])
+        assert canonical(['As/Kd'])[0] != canonical(['As/Ks'])[0]
+
+    def test_order_inside_groups(self):
+        assert canonical(['As/Kd'], '2c/3h/4s') == canonical(['Kd/As'], '4s/2c/3h')
+        assert canonical(['As/Kd', '2c/2d']) != canonical(['2c/2d', 'As/Kd'])
+
+    def test_streets(self):
+        flop_turn1 = canonical([], '2c/3c/4c/5c', streets=True)
+        flop_turn2 = canonical([], '2c/3c/5c/4c', streets=True)
+        assert flop_turn1 != flop_turn2
+        assert canonical([], '2c/3c/4c/5c') == canonical([], '2c/3c/5c/4c')
+
+    def test_indexes(self):
+        assert canonical([cards_indexes('As/Kd')], cards_indexes('2c')) == canonical(['As/Kd'], '2c')
+
+
+class TestForms:
+    def test_preflop(self):
+        assert count_forms([hand] for hand in itertools.combinations(range(52), 2)) == (169, 1326)
+
+    def test_flop(self):
+        assert count_forms([flop] for flop in itertools.combinations(range(52), 3)) == (1755, 22100)
+
+    def test_collapse(self):
+        situations = [([hand], None) for hand in itertools.combinations(range(52), 2)]
+        weights = collapse(situations)
+        assert len(weights) == 169
+        assert sum(weights.values()) == 1326
+
+
+class TestCanonicalDeals:
+    def test_weights(self):
+        deals = canonical_deals(['As/Kd'], count=3)
+        assert sum(deals.values()) == 19600
+        # clubs and hearts are even
+        assert len(deals) == 10968
+
+    def test_no_symmetry(self):
+        deals = canonical_deals(['As/Ad'], '2c/7d/9h', count=1)
+        assert len(deals) == sum(deals.values()) == 47
+
+    def test_suited_pair_symmetry(self):
+        deals = canonical_deals(['As/Ks'], count=1)
+        # other suits are even
+        assert deals[tuple(cards_indexes('2c'))] == 3
+        assert deals[tuple(cards_indexes('2s'))] == 1
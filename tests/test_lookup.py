@@ -0,0 +1,194 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import random
+
+import pytest
+
+from thpoker.core import Cards, Table, Hand, Combo
+from thpoker.lookup import (
+    LookupTable, StreetEvaluator, RANKS_TABLE_SIZE, MAX_CARDS, RANKS_COUNT,
+    cards_indexes, core_card_index, core_cards_indexes, pack_key, unpack_key, ranks_hash, _iter_repeats,
+)
+
+import test_core
+from utils import get_parameters
+
+
+SIGNS = [w + s for w in '23456789TJQKA' for s in 'cdhs']
+
+
+@pytest.fixture(scope='module')
+def table():
+    return LookupTable.build()
+
+
+@pytest.fixture
+def lookup_combo(table):
+    Combo.enable_lookup_table(table)
+    yield Combo
+    Combo.disable_lookup_table()
+
+
+def combo_signature(combo):
+    return combo.type, [(card.weight.number, card.suit.symbol, card.in_hand) for card in combo.cards]
+
+
+class TestKey:
+    def test_pack(self):
+        assert pack_key(Combo.STRAIGHT_FLUSH, [14]) == 9 << 20 | 14 << 16
+        assert pack_key(Combo.ONE_PAIR, [5, 13, 12, 11]) == 2 << 20 | 5 << 16 | 13 << 12 | 12 << 8 | 11 << 4
+
+    def test_unpack(self):
+        assert unpack_key(pack_key(Combo.FULL_HOUSE, [10, 11])) == (Combo.FULL_HOUSE, [10, 11])
+        assert unpack_key(pack_key(Combo.HIGH_CARD, [4])) == (Combo.HIGH_CARD, [4])
+
+    def test_order(self):
+        assert pack_key(Combo.FLUSH, [7, 5, 4, 3, 2]) > pack_key(Combo.STRAIGHT, [14])
+        assert pack_key(Combo.THREE_OF_A_KIND, [14, 2]) > pack_key(Combo.THREE_OF_A_KIND, [14])
+
+
+class TestCardIndex:
+    def test_indexes(self):
+        assert cards_indexes('2c/As/Td') == [0, 51, 33]
+        assert cards_indexes(None) == []
+
+    def test_wrong_sign(self):
+        with pytest.raises(ValueError):
+            cards_indexes('As/Xd')
+
+    def test_core_cards(self):
+        assert core_cards_indexes(Cards('2c/As/Td')) == [0, 51, 33]
+        assert core_cards_indexes(Hand('Kd/7h').items) == cards_indexes('Kd/7h')
+        assert core_cards_indexes(Cards()) == []
+
+    def test_core_low_ace(self):
+        combo = Combo(cards_string='As/2d/3h/4c/5s/Kd')
+        low_ace = combo.cards.items[-1]
+        assert low_ace.weight.number == 0
+        assert core_card_index(low_ace) == cards_indexes('As')[0]
+
+
+class TestRanksHash:
+    def test_perfect(self):
+        indexes = set()
+        for cards_count in range(1, MAX_CARDS + 1):
+            for counts in _iter_repeats(RANKS_COUNT, cards_count):
+                indexes.add(ranks_hash(counts, cards_count))
+        assert indexes == set(range(1, RANKS_TABLE_SIZE))
+
+
+class TestLookupTable:
+    def test_save_and_load(self, table, tmp_path):
+        path = str(tmp_path / 'table.bin')
+        table.save(path)
+        loaded = LookupTable.load(path)
+        assert loaded.flushes == table.flushes
+        assert loaded.ranks == table.ranks
+
+    def test_load_broken_file(self, table, tmp_path):
+        path = tmp_path / 'table.bin'
+        path.write_bytes(b'broken')
+        loaded = LookupTable.load(str(path))
+        assert loaded.ranks == table.ranks
+        assert LookupTable.read(str(path)).ranks == table.ranks
+
+    def test_map(self, table, tmp_path):
+        path = str(tmp_path / 'table.bin')
+        mapped = LookupTable.map(path)
+        assert mapped.mapped
+        assert list(mapped.flushes) == list(table.flushes)
+        assert list(mapped.ranks) == list(table.ranks)
+        rnd = random.Random(2)
+        for _ in range(300):
+            cards = rnd.sample(range(52), 7)
+            assert mapped.evaluate(cards) == table.evaluate(cards)
+        mapped.close()
+        assert not mapped.mapped
+
+    def test_map_broken_file(self, table, tmp_path):
+        path = tmp_path / 'table.bin'
+        path.write_bytes(b'broken')
+        mapped = LookupTable.map(str(path))
+        assert list(mapped.ranks) == list(table.ranks)
+        mapped.close()
+
+    def test_random_cards(self, lookup_combo):
+        rnd = random.Random(0)
+        for _ in range(3000):
+            cards_string = '/'.join(rnd.sample(SIGNS, rnd.randint(1, 7)))
+            Combo.lookup_table, table = None, Combo.lookup_table
+            expected = combo_signature(Combo(cards_string=cards_string))
+            Combo.lookup_table = table
+            assert combo_signature(Combo(cards_string=cards_string)) == expected
+
+    def test_random_ratio(self, lookup_combo):
+        rnd = random.Random(1)
+        for _ in range(1000):
+            signs = rnd.sample(SIGNS, 7)
+            table, hand = '/'.join(signs[:5]), '/'.join(signs[5:])
+            Combo.lookup_table, lookup_table = None, Combo.lookup_table
+            expected = Combo(table=Table(table), hand=Hand(hand), ratio_check=True)
+            Combo.lookup_table = lookup_table
+            combo = Combo(table=Table(table), hand=Hand(hand), ratio_check=True)
+            assert combo_signature(combo) == combo_signature(expected)
+            assert combo.ratio._value == expected.ratio._value
+
+
+@pytest.mark.usefixtures('lookup_combo')
+class TestLookupCombo:
+    @pytest.mark.parametrize("values", test_core.TestCombo.combo_variants)
+    @get_parameters
+    def test_cards_result(self, init_cards, combo_type, cards_items):
+        combo = Combo(cards=Cards(init_cards))
+        assert combo.type == combo_type
+        assert combo.cards.items == cards_items
+
+    @pytest.mark.parametrize("values", test_core.TestCombo.with_hand_variants)
+    @get_parameters
+    def test_table_hand_nominal_result(self, table, hand, combo_type, cards_items, ratio_value):
+        combo = Combo(table=Table(table), hand=Hand(hand), ratio_check=True)
+        assert combo.type == combo_type
+        assert combo.cards.items == cards_items
+        assert combo.ratio._value == ratio_value
+
+
+class TestStreetEvaluator:
+    def test_flop(self, table):
+        evaluator = StreetEvaluator(cards_indexes('As/Kd/Qs/Js/2c'), table)
+        assert len(evaluator) == 5
+        assert evaluator.key == pack_key(Combo.HIGH_CARD, [14, 13, 12, 11, 2])
+        assert evaluator.add(cards_indexes('Ts')[0]) == pack_key(Combo.STRAIGHT, [14])
+        assert evaluator.add(cards_indexes('Ah')[0]) == pack_key(Combo.ONE_PAIR, [14, 13, 12, 11])
+        assert len(evaluator) == 5
+
+    def test_runouts(self, table):
+        cards = cards_indexes('7h/8h/9h/Tc/2d')
+        evaluator = StreetEvaluator(cards, table)
+        deck = [card for card in range(52) if card not in cards]
+        for turn in deck:
+            evaluator.push(turn)
+            for river in deck:
+                if river > turn:
+                    assert evaluator.add(river) == table.evaluate(cards + [turn, river])
+            assert evaluator.pop() == turn
+        assert evaluator.cards == cards
+        assert evaluator.key == table.evaluate(cards)
+
+    def test_same_as_combo(self, table):
+        evaluator = StreetEvaluator(cards_indexes('Qh/Jh'), table)
+        for sign in ('Th', '2c', '9h', 'Kh'):
+            evaluator.push(cards_indexes(sign)[0])
+        assert evaluator.key == Combo(cards_string='Qh/Jh/Th/2c/9h/Kh').key
@@ -0,0 +1,157 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import io
+import itertools
+import json
+import random
+
+import pytest
+
+from thpoker.core import Combo
+from thpoker.pipeline import read_hands, evaluate_record, evaluate_stream, HandStats, run
+from thpoker.showdown import showdown
+
+from utils import get_parameters
+
+
+SIGNS = [w + s for w in '23456789TJQKA' for s in 'cdhs']
+
+
+def random_records(count, seed=0):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        signs = rnd.sample(SIGNS, 13)
+        hands = ['/'.join(signs[i:i + 2]) for i in range(5, 13, 2)]
+        if rnd.random() < 0.3:
+            hands[rnd.randrange(4)] = None
+        yield {'board': '/'.join(signs[:5]), 'hands': hands, 'contributions': [rnd.randint(1, 50) for _ in hands]}
+
+
+class TestReadHands:
+    def test_jsonl(self):
+        stream = io.StringIO(
+            '{"board": "As/Kd/Tc/7h/2s", "hands": ["Ah/Ac", null]}\n'
+            '\n'
+            '{"id": "hand-7", "board": "As/Kd/Tc/7h/2s", "hands": ["Ah/Ac", "Qs/Js"], "contributions": [10, 20]}\n')
+        assert list(read_hands(stream)) == [
+            {'id': 0, 'board': 'As/Kd/Tc/7h/2s', 'hands': ['Ah/Ac', None]},
+            {'id': 'hand-7', 'board': 'As/Kd/Tc/7h/2s', 'hands': ['Ah/Ac', 'Qs/Js'], 'contributions': [10, 20]},
+        ]
+
+    def test_csv(self):
+        stream = io.StringIO('board,hands,contributions\nAs/Kd/Tc/7h/2s,Ah/Ac - Qs/Js,10 20 20\nAs/Kd/Tc,Ah/Ac Qs/Js,\n')
+        assert list(read_hands(stream, 'csv')) == [
+            {'id': 0, 'board': 'As/Kd/Tc/7h/2s', 'hands': ['Ah/Ac', None, 'Qs/Js'], 'contributions': [10, 20, 20]},
+            {'id': 1, 'board': 'As/Kd/Tc', 'hands': ['Ah/Ac', 'Qs/Js'], 'contributions': None},
+        ]
+
+    def test_path(self, tmp_path):
+        path = tmp_path / 'hands.csv'
+        path.write_text('id,board,hands\nx,As/Kd/Tc/7h/2s,Ah/Ac Qs/Js\n')
+        assert [record['id'] for record in read_hands(str(path))] == ['x']
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            list(read_hands(io.StringIO(''), 'xml'))
+
+
+class TestEvaluateRecord:
+    @pytest.mark.parametrize("values", [
+        {"record": {"id": 1, "board": "As/Kd/Tc/7h/2s", "hands": ["Ah/Ac", None, "Qs/Js"], "contributions": [10, 20, 20]},
+         "types": [Combo.THREE_OF_A_KIND, None, Combo.STRAIGHT], "winners": [2], "payouts": [0, 0, 50]},
+        {"record": {"id": 2, "board": "As/Kd/Tc/7h/2s", "hands": ["Ah/3c", "Ad/3d"]},
+         "types": [Combo.ONE_PAIR, Combo.ONE_PAIR], "winners": [0, 1], "payouts": None},
+    ])
+    @get_parameters
+    def test_result(self, record, types, winners, payouts):
+        result = evaluate_record(record)
+        assert result['id'] == record['id']
+        assert result['types'] == types
+        assert result['winners'] == winners
+        assert result['payouts'] == payouts
+        assert result['keys'] == showdown(record['board'], record['hands']).keys
+        assert json.loads(json.dumps(result)) == result
+
+    def test_wrong_record(self):
+        with pytest.raises(ValueError, match="'bad'"):
+            evaluate_record({'id': 'bad', 'board': 'As/Kd/Tc/7h/2s', 'hands': ['Ah/Xc']})
+        with pytest.raises(ValueError):
+            evaluate_record({'id': 'bad', 'hands': ['Ah/Ac']})
+
+
+class TestEvaluateStream:
+    def test_ordered(self):
+        records = list(random_records(300))
+        expected = [evaluate_record(record) for record in records]
+        assert list(evaluate_stream(iter(records), processes=1, chunk_size=7)) == expected
+        assert list(evaluate_stream(iter(records), processes=2, chunk_size=7)) == expected
+
+    def test_unordered(self):
+        records = [dict(record, id=i) for i, record in enumerate(random_records(300))]
+        results = list(evaluate_stream(iter(records), processes=2, chunk_size=7, ordered=False))
+        assert sorted(results, key=lambda result: result['id']) == [evaluate_record(record) for record in records]
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_backpressure(self, ordered):
+        read = 0
+
+        def records():
+            nonlocal read
+            for record in random_records(2000):
+                read += 1
+                yield record
+
+        yielded = 0
+        for _ in evaluate_stream(records(), processes=2, chunk_size=50, ordered=ordered, max_pending=3):
+            yielded += 1
+            # pending chunks and one chunk which is read before waiting
+            assert read - yielded <= 4 * 50
+        assert yielded == 2000
+
+    @pytest.mark.parametrize("processes", [1, 2])
+    def test_error(self, processes):
+        records = itertools.chain(random_records(20), [{'id': 'bad', 'board': 'As/Kd/Tc/7h/2s', 'hands': ['Ah/Xc']}])
+        with pytest.raises(ValueError, match="'bad'"):
+            list(evaluate_stream(records, processes=processes, chunk_size=5))
+
+
+class TestHandStats:
+    def test_add(self):
+        stats = HandStats()
+        stats.add(evaluate_record({'board': 'As/Kd/Tc/7h/2s', 'hands': ['Ah/Ac', None, 'Qs/Js']}))
+        stats.add(evaluate_record({'board': 'As/Kd/Tc/7h/2s', 'hands': ['Ah/3c', 'Ad/3d']}))
+        assert stats.to_dict() == {
+            'records': 2,
+            'types': {
+                Combo.ONE_PAIR: {'hands': 2, 'wins': 0, 'ties': 2},
+                Combo.THREE_OF_A_KIND: {'hands': 1, 'wins': 0, 'ties': 0},
+                Combo.STRAIGHT: {'hands': 1, 'wins': 1, 'ties': 0},
+            },
+        }
+
+
+class TestRun:
+    def test_run(self, tmp_path):
+        path = tmp_path / 'hands.jsonl'
+        records = list(random_records(100))
+        path.write_text(''.join(json.dumps(record) + '\n' for record in records))
+        output = io.StringIO()
+        stats = run(str(path), output, processes=1, chunk_size=30)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [result['id'] for result in results] == list(range(100))
+        assert stats.records == 100
+        assert sum(stats.hands) == sum(hand is not None for record in records for hand in record['hands'])
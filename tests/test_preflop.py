@@ -0,0 +1,78 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import math
+
+import pytest
+
+from thpoker.core import Hand
+from thpoker.preflop import HAND_TYPES, PreflopMatrix, hand_type_index
+
+
+def fake_equity(hand_type1, hand_type2, processes):
+    return hand_type_index(hand_type2) / len(HAND_TYPES)
+
+
+class TestHandTypes:
+    def test_count(self):
+        assert len(HAND_TYPES) == len(set(HAND_TYPES)) == 169
+
+    def test_grid(self):
+        assert HAND_TYPES[:3] == ['AA', 'AKs', 'AQs']
+        assert HAND_TYPES[13:15] == ['AKo', 'KK']
+        assert HAND_TYPES[-1] == '22'
+
+    def test_index(self):
+        assert hand_type_index('89s') == hand_type_index('98s')
+        assert HAND_TYPES[hand_type_index(Hand('Td/9c').type)] == 'T9o'
+
+
+class TestPreflopMatrix:
+    def test_generate(self, tmp_path):
+        path = str(tmp_path / 'preflop.bin')
+        PreflopMatrix.generate(path, hand_types=['AKs', 'QQ', '72o'], equity_function=fake_equity)
+        with PreflopMatrix(path) as matrix:
+            assert matrix.equity('AKs', 'QQ') == pytest.approx(hand_type_index('QQ') / 169)
+            assert matrix['QQ', 'AKs'] == pytest.approx(1 - hand_type_index('QQ') / 169)
+            assert matrix.equity('72o', '72o') == 0.5
+            assert math.isnan(matrix.equity('AKs', 'JJ'))
+
+    def test_continue(self, tmp_path):
+        path = str(tmp_path / 'preflop.bin')
+        PreflopMatrix.generate(path, hand_types=['AKs', 'QQ'], equity_function=fake_equity)
+        calls = []
+
+        def equity_function(hand_type1, hand_type2, processes):
+            calls.append((hand_type1, hand_type2))
+            return 0.25
+
+        PreflopMatrix.generate(path, hand_types=['AKs', 'QQ', 'JJ'], equity_function=equity_function)
+        assert calls == [('AKs', 'JJ'), ('QQ', 'JJ')]
+        with PreflopMatrix(path) as matrix:
+            assert matrix.equity('AKs', 'QQ') == pytest.approx(hand_type_index('QQ') / 169)
+            assert matrix.equity('JJ', 'QQ') == 0.75
+
+    def test_wrong_file(self, tmp_path):
+        path = tmp_path / 'preflop.bin'
+        path.write_bytes(b'THPF' + b'\0' * 10)
+        with pytest.raises(ValueError):
+            PreflopMatrix(str(path))
+
+    def test_exact(self, tmp_path):
+        pytest.importorskip('numpy')
+        path = str(tmp_path / 'preflop.bin')
+        PreflopMatrix.generate(path, hand_types=['AA', '89s'], processes=1)
+        with PreflopMatrix(path) as matrix:
+            assert matrix.equity('AA', '98s') == pytest.approx(0.7794, abs=1e-4)
@@ -0,0 +1,142 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import pickle
+
+import pytest
+
+from thpoker import profiling
+from thpoker.core import Table, Hand, Combo
+from thpoker.profiling import Profiler
+
+from utils import get_parameters
+
+
+@pytest.fixture
+def profiler():
+    with profiling.profile() as profiler:
+        yield profiler
+
+
+class TestProfiler:
+    def test_count(self):
+        profiler = Profiler()
+        profiler.count('type.fl')
+        profiler.count('type.fl', 2)
+        assert profiler.snapshot()['counters'] == {'type.fl': 3}
+
+    def test_add_time(self):
+        profiler = Profiler()
+        profiler.add_time('sort', 0.5)
+        profiler.add_time('sort', 0.25)
+        assert profiler.snapshot()['timers'] == {'sort': {'calls': 2, 'seconds': 0.75}}
+
+    def test_reset(self):
+        profiler = Profiler()
+        profiler.count('type.fl')
+        profiler.add_time('sort', 0.5)
+        profiler.reset()
+        assert profiler.snapshot() == {'counters': {}, 'timers': {}}
+
+    def test_snapshot_is_copy(self):
+        profiler = Profiler()
+        snapshot = profiler.snapshot()
+        profiler.count('type.fl')
+        assert snapshot['counters'] == {}
+
+
+@pytest.mark.usefixtures('profiler')
+class TestComboProfiling:
+    @pytest.mark.parametrize("values", [
+        {'cards_string': 'As/Ks/Qs/Js/Ts/2c', 'branch': '_get_flush_with_five_or_more_in_a_row', 'type': 'sf'},
+        {'cards_string': 'As/Ad/Ah/Ac/Ts/2c', 'branch': '_find_with_four_weigh_repeats', 'type': 'fk'},
+        {'cards_string': 'As/Ad/Ah/Tc/Ts/2c', 'branch': '_find_with_three_two_weigh_repeats', 'type': 'fh'},
+        {'cards_string': '9s/8d/7h/6c/5s/2c', 'branch': '_get_combo_with_five_or_more_in_a_row', 'type': 'st'},
+        {'cards_string': 'As/Ad/Qh/Tc/9s/2c', 'branch': '_get_two_weigh_repeats', 'type': 'op'},
+        {'cards_string': 'As/Jd/Qh/Tc/8s/2c', 'branch': '_get_no_weigh_repeats', 'type': 'hc'},
+    ])
+    @get_parameters
+    def test_branches(self, cards_string, branch, type):
+        Combo(cards_string=cards_string)
+        counters = profiling.snapshot()['counters']
+        assert counters[f'branch.{branch}'] == 1
+        assert counters[f'type.{type}'] == 1
+
+    @pytest.mark.parametrize("values", [
+        {'cards_string': 'As/Ad/Ah/Tc/Ts/2c', 'branches': ['_get_3', '_get_3_with_1_rep_and_2_with_1_rep']},
+        {'cards_string': 'As/Ad/Qh/Qc/9s/9c', 'branches': ['_get_2', '_get_2_with_3_rep', '_get_2_with_2_rep']},
+        {'cards_string': 'As/Jd/Qh/Tc/8s/2c', 'branches': ['_get_1']},
+    ])
+    @get_parameters
+    def test_weight_repeats_branches(self, cards_string, branches):
+        Combo(cards_string=cards_string)
+        counters = profiling.snapshot()['counters']
+        assert sorted(name for name in counters if name.startswith('branch.weight_repeats.')) == sorted(
+            f'branch.weight_repeats.{branch}' for branch in branches)
+
+    def test_stages(self):
+        Combo(cards_string='As/Ad/Qh/Tc/9s/2c')
+        Combo(table=Table('As/Ad/Qh/Tc/9s'), hand=Hand('2c/3c'), ratio_check=True)
+        timers = profiling.snapshot()['timers']
+        assert {name: timer['calls'] for name, timer in timers.items()} == {
+            'combo': 2, 'parse': 1, 'sort': 2, 'repeats': 2, 'sequence': 2, 'ratio': 1,
+        }
+        assert all(timer['seconds'] >= 0 for timer in timers.values())
+
+    def test_lookup_table(self):
+        Combo.enable_lookup_table()
+        try:
+            Combo(cards_string='As/Ad/Qh/Qc/9s/2c')
+        finally:
+            Combo.disable_lookup_table()
+        snapshot = profiling.snapshot()
+        assert snapshot['counters'] == {'branch._pick_tp': 1, 'type.tp': 1}
+        assert snapshot['timers']['lookup']['calls'] == 1
+        assert 'repeats' not in snapshot['timers']
+
+    def test_pickle(self):
+        combo = Combo(table=Table('As/Ad/Qh/Tc/9s'), hand=Hand('2c/3c'), ratio_check=True)
+        profiling.get_profiler().reset()
+        assert pickle.loads(pickle.dumps(combo)) == combo
+        assert not any(name.startswith('branch.') for name in profiling.snapshot()['counters'])
+
+
+class TestEnable:
+    def test_disable(self):
+        wrapped = list(profiling.STAGES.values()) + list(profiling.BRANCHES.values())
+        methods = {(cls, name): cls.__dict__[name] for cls, name in wrapped}
+        profiler = profiling.enable()
+        assert profiling.get_profiler() is profiler
+        assert profiling.disable() is profiler
+        assert profiling.get_profiler() is None
+        assert {(cls, name): cls.__dict__[name] for cls, name in wrapped} == methods
+
+    def test_branches_exist(self):
+        for cls, name in profiling.BRANCHES.values():
+            assert callable(cls.__dict__[name])
+
+    def test_disabled(self):
+        Combo(cards_string='As/Ad/Qh/Tc/9s/2c')
+        assert profiling.snapshot() == {'counters': {}, 'timers': {}}
+
+    def test_enable_twice(self):
+        profiling.enable()
+        profiler = profiling.enable()
+        Combo(cards_string='As/Ad/Qh/Tc/9s/2c')
+        profiling.disable()
+        assert profiler.counters['type.op'] == 1
+        assert profiler.timers['combo'][0] == 1
+        assert not hasattr(Combo.__init__, '__wrapped__')
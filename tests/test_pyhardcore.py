@@ -0,0 +1,104 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import importlib
+import random
+import sys
+
+import pytest
+
+try:
+    import cthpoker
+except ImportError:
+    cthpoker = None
+
+from thpoker import hardcore
+from thpoker.hardcore import hcards, hdeck
+from thpoker.lookup import get_table, ratio_code, unpack_key
+from thpoker.pyhardcore import HCARDS_INDEXES, find_combo, find_ratio_combo
+
+import test_hardcore
+from utils import get_parameters
+
+
+def is_wheel(combo):
+    # CTHPoker misses the lowest straight
+    return combo[0] in (5, 9) and combo[1] == 5
+
+
+class TestPyHardCombo:
+    @pytest.mark.parametrize("values", test_hardcore.TestHardCombo.combo_variants)
+    @get_parameters
+    def test_combo(self, cards_string, value):
+        assert find_combo(hcards(cards_string)) == value
+
+    @pytest.mark.parametrize("values", test_hardcore.TestHardCombo.with_hand_variants)
+    @get_parameters
+    def test_ratio(self, table, hand, kind):
+        assert find_ratio_combo(hcards(table) + hcards(hand, True))[1] == kind
+
+    @pytest.mark.parametrize("cards_count", [1, 3, 5, 6, 7])
+    def test_same_as_lookup_table(self, cards_count):
+        rnd = random.Random(cards_count)
+        deck = hdeck()
+        for _ in range(3000):
+            cards = [card + 1000 * (rnd.random() < 0.4) for card in rnd.sample(deck, cards_count)]
+            indexes = [HCARDS_INDEXES[card] for card in cards]
+            key = get_table().evaluate(indexes)
+            combo_type, kickers = unpack_key(key)
+            assert find_ratio_combo(cards) == [
+                [combo_type] + kickers, ratio_code(key, indexes, [card >= 1000 for card in cards])]
+
+    def test_result_is_copy(self):
+        combo = find_combo(hcards('As/Ks/Qs/Js/Ts'))
+        combo.append(1)
+        assert find_combo(hcards('As/Ks/Qs/Js/Ts')) == [9, 14]
+
+
+@pytest.mark.skipif(cthpoker is None, reason='CTHPoker is not installed')
+class TestSameAsCHardCombo:
+    @pytest.mark.parametrize("cards_count", [1, 2, 3, 4, 5, 6, 7])
+    def test_combo(self, cards_count):
+        rnd = random.Random(cards_count)
+        deck = hdeck()
+        for _ in range(3000):
+            cards = rnd.sample(deck, cards_count)
+            combo = find_combo(cards)
+            if not is_wheel(combo):
+                assert combo == cthpoker.findCombo(cards)
+
+    @pytest.mark.parametrize("cards_count", [5, 6, 7])
+    def test_ratio_combo(self, cards_count):
+        rnd = random.Random(cards_count)
+        deck = hdeck()
+        for _ in range(3000):
+            cards = rnd.sample(deck, cards_count)
+            cards[-2:] = [card + 1000 for card in cards[-2:]]
+            result = find_ratio_combo(cards)
+            if not is_wheel(result[0]):
+                assert result == cthpoker.findRatioCombo(cards)
+
+
+class TestFallback:
+    def test_without_cthpoker(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'cthpoker', None)
+        try:
+            module = importlib.reload(hardcore)
+            assert module.findCombo is find_combo
+            assert module.rhcombo(hcards('As/Ad/Qh/Tc/9s'), hcards('Ah/2c', True)) == [[4, 14, 12, 10], 2]
+        finally:
+            monkeypatch.undo()
+            importlib.reload(hardcore)
@@ -0,0 +1,91 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import pytest
+
+from thpoker.exceptions import RangeNotationError
+from thpoker.lookup import cards_indexes
+from thpoker.ranges import HandRange, class_hands
+
+from utils import get_parameters
+
+
+class TestNotation:
+    @pytest.mark.parametrize("values", [
+        {'notation': 'AA', 'count': 6},
+        {'notation': 'TT+', 'count': 30},
+        {'notation': '22-55', 'count': 24},
+        {'notation': '55-22', 'count': 24},
+        {'notation': 'AKs', 'count': 4},
+        {'notation': 'KAs', 'count': 4},
+        {'notation': 'AKo', 'count': 12},
+        {'notation': 'AK', 'count': 16},
+        {'notation': 'AQs+', 'count': 8},
+        {'notation': 'KTo+', 'count': 36},
+        {'notation': 'A2s-A5s', 'count': 16},
+        {'notation': 'AsKd', 'count': 1},
+        {'notation': 'As/Kd, KdAs', 'count': 1},
+        {'notation': 'TT+, AQs+, KJo', 'count': 50},
+        {'notation': 'AA, AA,  AsAd', 'count': 6},
+        {'notation': '22+ AK', 'count': 94},
+        {'notation': '', 'count': 0},
+    ])
+    @get_parameters
+    def test_count(self, notation, count):
+        assert len(HandRange(notation)) == count
+
+    @pytest.mark.parametrize("notation", ['AAs', 'AKx', 'A5s-K2s', 'QQs+', '22-A5', 'AsAs', 'A5s-A2o', 'Xx'])
+    def test_wrong(self, notation):
+        with pytest.raises(RangeNotationError):
+            HandRange(notation)
+
+    def test_hands(self):
+        assert HandRange('AKs').hands == sorted(
+            ((max(hand), min(hand)) for hand in class_hands('AKs')), reverse=True)
+        assert all(hand[0] > hand[1] for hand in HandRange('22+, AK'))
+
+
+class TestHandRange:
+    def test_contains(self):
+        hand_range = HandRange('TT+, AQs+')
+        assert 'AsKs' in hand_range
+        assert 'Ks/As' in hand_range
+        assert 'AsKd' not in hand_range
+        assert tuple(cards_indexes('Td/Tc')) in hand_range
+
+    def test_remove(self):
+        hand_range = HandRange('AA, KK')
+        assert len(hand_range.remove('As')) == 9
+        assert len(hand_range.remove('As/Kd')) == 6
+        assert len(hand_range.remove(cards_indexes('As/Ad/Ah'))) == 6
+        assert len(hand_range) == 12
+
+    def test_union(self):
+        assert len(HandRange('AA') | HandRange('AA, KK')) == 12
+
+    def test_from_hands(self):
+        assert HandRange.from_hands([(0, 51), (51, 0)]).hands == [(51, 0)]
+
+    def test_compact(self):
+        hand_range = HandRange('22+')
+        assert len(hand_range.cards) == 2 * 78
+        assert hand_range.cards.itemsize == 1
+
+    def test_to_array(self):
+        pytest.importorskip('numpy')
+        array = HandRange('AKs, QQ').to_array()
+        assert array.shape == (10, 2)
+        assert [tuple(row) for row in array.tolist()] == HandRange('AKs, QQ').hands
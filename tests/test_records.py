@@ -0,0 +1,90 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import random
+
+import pytest
+
+from thpoker.core import Combo, Table, Hand, COMBO_RECORD
+from thpoker.lookup import MISS, HALF, REAL, cards_indexes
+from thpoker.records import HEADER, write_records, read_records, load_records
+
+
+SIGNS = [w + s for w in '23456789TJQKA' for s in 'cdhs']
+
+
+def combo_signature(combo):
+    return (
+        combo.key, [(card.weight.number, card.suit.symbol, card.in_hand) for card in combo.cards],
+        [(card.weight.number, card.suit.symbol, card.in_hand) for card in combo.init_cards],
+        combo._ratio._value if combo._ratio else None,
+    )
+
+
+@pytest.fixture
+def combos():
+    rnd = random.Random(0)
+    combos = []
+    for _ in range(500):
+        signs = rnd.sample(SIGNS, 7)
+        combos.append(Combo(table=Table('/'.join(signs[:5])), hand=Hand('/'.join(signs[5:])), ratio_check=True))
+        combos.append(Combo(cards_string='/'.join(signs[:rnd.randint(1, 7)])))
+    combos.append(Combo(table=Table('Ac/5s/4s/3s/Kd'), hand=Hand('2s/9c'), ratio_check=True))
+    return combos
+
+
+class TestRecords:
+    def test_write_and_read(self, combos, tmp_path):
+        path = str(tmp_path / 'combos.bin')
+        assert write_records(path, combos[:300]) == 300
+        assert write_records(path, combos[300:], append=True) == len(combos) - 300
+        loaded = list(read_records(path))
+        assert [combo_signature(c) for c in loaded] == [combo_signature(c) for c in combos]
+
+    def test_wrong_file(self, tmp_path):
+        path = tmp_path / 'combos.bin'
+        path.write_bytes(b'broken file')
+        with pytest.raises(ValueError):
+            list(read_records(str(path)))
+        with pytest.raises(ValueError):
+            write_records(str(path), [], append=True)
+
+    def test_partial_record(self, combos, tmp_path):
+        path = tmp_path / 'combos.bin'
+        write_records(str(path), combos[:2])
+        path.write_bytes(path.read_bytes()[:HEADER.size + COMBO_RECORD.size + 3])
+        with pytest.raises(ValueError):
+            list(read_records(str(path)))
+
+    @pytest.mark.parametrize("mmap", [False, True])
+    def test_load_arrays(self, combos, tmp_path, mmap):
+        pytest.importorskip('numpy')
+        path = str(tmp_path / 'combos.bin')
+        write_records(path, combos)
+        arrays = load_records(path, mmap=mmap)
+        assert arrays['key'].tolist() == [combo.key for combo in combos]
+        assert arrays['type'].tolist() == [combo.type for combo in combos]
+        for i, combo in enumerate(combos):
+            indexes = [(card.weight.number - 1) * 4 + card.suit.number for card in combo.init_cards]
+            assert arrays['cards'][i].tolist() == indexes + [-1] * (7 - len(indexes))
+            assert arrays['in_hand'][i, :len(indexes)].tolist() == [card.in_hand for card in combo.init_cards]
+            assert (arrays['combo'][i] >= 0).sum() == len(combo.cards)
+        # ace of the lowest straight is the ace of combo search cards
+        assert arrays['combo'][-1].tolist() == cards_indexes('5s/4s/3s/2s/Ac')
+        assert arrays['low_ace'][-1].tolist() == [False, False, False, False, True]
+        assert arrays['ratio'][-1] == REAL
+        assert set(arrays['ratio'][::2].tolist()) == {MISS, HALF, REAL}
+        assert set(arrays['ratio'][1::2].tolist()) == {-1}
@@ -0,0 +1,203 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import asyncio
+import random
+import threading
+
+import pytest
+
+from thpoker.backends import create_backend, get_backend
+from thpoker.lookup import cards_indexes
+from thpoker.server import (
+    EvaluationServer, EvaluationClient, RequestError, FRAME, HEADER, KEY, OP_EVALUATE,
+)
+from thpoker.showdown import showdown
+
+from utils import get_parameters
+
+
+class BlockedBackend:
+    """Backend which evaluates nothing until it is released."""
+
+    name = 'blocked'
+
+    def __init__(self):
+        self.backend = get_backend()
+        self.released = threading.Event()
+
+    def evaluate(self, cards):
+        self.released.wait()
+        return self.backend.evaluate(cards)
+
+    def evaluate_batch(self, cards):
+        self.released.wait()
+        return self.backend.evaluate_batch(cards)
+
+
+def run_with_server(function, path=None, **server_arguments):
+    """Run coroutine function with started server and its client."""
+
+    async def main():
+        async with EvaluationServer(**server_arguments) as server:
+            if path:
+                await server.start(path=path)
+                client = EvaluationClient(path=path, connections=2)
+            else:
+                _, port = await server.start()
+                client = EvaluationClient(port=port, connections=2)
+            async with client:
+                return await function(server, client)
+
+    return asyncio.run(main())
+
+
+class TestEvaluationServer:
+    @pytest.mark.parametrize("values", [
+        {"cards": 'As/Kd/Qh/Jc/Ts'},
+        {"cards": 'As/Ad/Ah/Ac/Kd/Kh/2c'},
+        {"cards": '2c'},
+        {"cards": [0, 4, 8, 12, 51, 30]},
+    ])
+    @get_parameters
+    def test_evaluate(self, cards):
+        async def check(server, client):
+            return await client.evaluate(cards)
+
+        indexes = cards_indexes(cards) if isinstance(cards, str) else cards
+        assert run_with_server(check) == get_backend().evaluate(indexes)
+
+    def test_batches(self):
+        rnd = random.Random(0)
+        cards = [rnd.sample(range(52), rnd.randint(5, 7)) for _ in range(2000)]
+
+        async def check(server, client):
+            return await client.evaluate_many(cards), server.stats()
+
+        keys, stats = run_with_server(check, max_batch_size=256, max_delay=0.01)
+        assert keys == [get_backend().evaluate(c) for c in cards]
+        assert stats['evaluations'] == 2000
+        assert stats['batches'] < 2000
+        assert 1 < stats['max_batch'] <= 256
+
+    @pytest.mark.parametrize("values", [
+        {"table": 'As/Kd/Tc/7h/2s', "hands": ['Ah/Ac', None, 'Qs/Js'], "contributions": [10, 20, 20]},
+        {"table": 'As/Kd/Tc/7h/2s', "hands": ['Ah/3c', 'Ad/3d', '4c/4d'], "contributions": None},
+        {"table": 'As/Kd/Tc', "hands": ['Ah/3c', None], "contributions": None},
+    ])
+    @get_parameters
+    def test_showdown(self, table, hands, contributions):
+        async def check(server, client):
+            return await client.showdown(table, hands, contributions)
+
+        result = run_with_server(check)
+        expected = showdown(table, hands, contributions)
+        assert result.keys == expected.keys
+        assert result.ranking == expected.ranking
+        assert result.payouts == expected.payouts
+
+    @pytest.mark.parametrize("values", [
+        {"cards": [1, 1, 2]},
+        {"cards": [52, 1]},
+        {"cards": []},
+        {"cards": list(range(8))},
+    ])
+    @get_parameters
+    def test_wrong_cards(self, cards):
+        async def check(server, client):
+            with pytest.raises(RequestError):
+                await client.evaluate(cards)
+            # connection is still usable
+            return await client.evaluate('As/Kd'), client.stats(), server.stats()
+
+        key, client_stats, server_stats = run_with_server(check)
+        assert key == get_backend().evaluate(cards_indexes('As/Kd'))
+        assert (client_stats['requests'], client_stats['errors']) == (2, 1)
+        assert (server_stats['requests'], server_stats['errors']) == (2, 1)
+
+    def test_wrong_showdown(self):
+        async def check(server, client):
+            with pytest.raises(RequestError):
+                await client.showdown('As/Kd/Tc', ['As/2c', 'Qh/Jh'])
+            with pytest.raises(RequestError):
+                await client.showdown('As/Kd/Tc', ['Qd/2c', 'Qd/Jh'])
+
+        run_with_server(check)
+
+    def test_backend(self):
+        async def check(server, client):
+            return await client.evaluate('As/Kd/Qh/Jc/Ts'), await client.server_stats()
+
+        key, stats = run_with_server(check, backend=create_backend('core'))
+        assert key == get_backend().evaluate(cards_indexes('As/Kd/Qh/Jc/Ts'))
+        assert stats['backend'] == 'core'
+
+    def test_unix_socket(self, tmp_path):
+        async def check(server, client):
+            return await client.evaluate('As/Kd/Qh/Jc/Ts')
+
+        path = str(tmp_path / 'thpoker.sock')
+        assert run_with_server(check, path=path) == get_backend().evaluate(cards_indexes('As/Kd/Qh/Jc/Ts'))
+
+    def test_connections_pool(self):
+        async def check(server, client):
+            await client.evaluate_many(['As/Kd'] * 50)
+            connections = [connection for connection in client._connections if connection is not None]
+            return len(connections), client.stats()
+
+        count, stats = run_with_server(check)
+        assert count == 2
+        assert stats['requests'] == 50
+        assert stats['p99_ms'] >= stats['p50_ms'] > 0
+
+    def test_closed_server(self):
+        async def check(server, client):
+            await client.evaluate('As/Kd')
+            await server.close()
+            with pytest.raises(ConnectionError):
+                for _ in range(3):
+                    await client.evaluate('As/Kd')
+
+        run_with_server(check)
+
+    def test_max_in_flight(self):
+        backend = BlockedBackend()
+
+        async def check(server, client):
+            reader, writer = await asyncio.open_connection(*server.address[:2])
+            for request_id in range(10):
+                body = bytes(cards_indexes('As/Kd/Qh'))
+                writer.write(FRAME.pack(HEADER.size + len(body)) + HEADER.pack(request_id, OP_EVALUATE) + body)
+            await writer.drain()
+            await asyncio.sleep(0.1)
+            # the rest requests are not read until responses of requests in progress are sent
+            evaluations = server.evaluations
+            backend.released.set()
+            responses = []
+            for _ in range(10):
+                size = FRAME.unpack(await reader.readexactly(FRAME.size))[0]
+                payload = await reader.readexactly(size)
+                responses.append((HEADER.unpack_from(payload)[0], KEY.unpack_from(payload, HEADER.size)[0]))
+            writer.close()
+            return evaluations, responses
+
+        try:
+            evaluations, responses = run_with_server(check, backend=backend, max_in_flight=3, max_delay=0.01)
+        finally:
+            backend.released.set()
+        assert evaluations == 3
+        key = get_backend().evaluate(cards_indexes('As/Kd/Qh'))
+        assert sorted(responses) == [(request_id, key) for request_id in range(10)]
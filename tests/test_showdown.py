@@ -0,0 +1,157 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import random
+
+import pytest
+
+from thpoker.backends import create_backend
+from thpoker.core import Table, Hand, Combo
+from thpoker.lookup import cards_indexes
+from thpoker.showdown import Pot, showdown, showdown_batch
+
+from utils import get_parameters
+
+
+SIGNS = [w + s for w in '23456789TJQKA' for s in 'cdhs']
+
+
+class TestRanking:
+    @pytest.mark.parametrize("values", [
+        {'table': 'As/Kd/7h/5c/2s', 'hands': ['Ah/Qc', 'Ac/Qd', 'Kh/Ks'], 'ranking': [[2], [0, 1]]},
+        {'table': 'As/Kd/7h/5c/2s', 'hands': ['3c/4c', 'Kh/Ks', '7c/7d'], 'ranking': [[0], [1], [2]]},
+        {'table': 'Ts/Js/Qs/Ks/As', 'hands': ['2c/3c', '2d/3d', '4h/5h'], 'ranking': [[0, 1, 2]]},
+        {'table': 'As/Kd/7h/5c/2s', 'hands': ['Ah/Qc', None, '8c/8d'], 'ranking': [[0], [2]]},
+    ])
+    @get_parameters
+    def test_ranking(self, table, hands, ranking):
+        result = showdown(table, hands)
+        assert result.ranking == ranking
+        assert result.winners == ranking[0]
+        assert result.ties == [group for group in ranking if len(group) > 1]
+        assert result.pots is None and result.payouts is None
+
+    def test_folded_key(self):
+        assert showdown('As/Kd/7h/5c/2s', ['Ah/Qc', None]).keys[1] is None
+
+    def test_core_cards(self):
+        result = showdown(Table('As/Kd/7h/5c/2s'), [Hand('Ah/Qc'), Hand('Kh/Ks')])
+        assert result.ranking == [[1], [0]]
+        assert result.keys[0] == Combo(table=Table('As/Kd/7h/5c/2s'), hand=Hand('Ah/Qc')).key
+
+    def test_same_as_combos_comparison(self):
+        rnd = random.Random(0)
+        for _ in range(300):
+            players_count = rnd.randint(2, 9)
+            signs = rnd.sample(SIGNS, 5 + 2 * players_count)
+            table = '/'.join(signs[:5])
+            hands = ['/'.join(signs[5 + 2 * i:7 + 2 * i]) for i in range(players_count)]
+            combos = [Combo(table=Table(table), hand=Hand(hand)) for hand in hands]
+            result = showdown(table, hands)
+            for group, next_group in zip(result.ranking, result.ranking[1:]):
+                assert all(combos[p] == combos[group[0]] for p in group)
+                assert combos[group[0]] > combos[next_group[0]]
+            assert sorted(sum(result.ranking, [])) == list(range(players_count))
+
+    def test_backend(self):
+        result = showdown('As/Kd/7h/5c/2s', ['Ah/Qc', 'Kh/Ks'], backend=create_backend('core'))
+        assert result.ranking == [[1], [0]]
+
+
+class TestPots:
+    def test_main_pot(self):
+        result = showdown('As/Kd/7h/5c/2s', ['Ah/Qc', 'Kh/Ks', '8c/8d'], [100, 100, 100])
+        assert result.pots == [Pot(300, [0, 1, 2], [1])]
+        assert result.payouts == [0, 300, 0]
+
+    def test_side_pots(self):
+        result = showdown(
+            'As/Kd/7h/5c/2s', ['Ah/Qc', 'Ac/Qd', 'Kh/Ks', None, '7c/7d'], [100, 100, 50, 30, 200])
+        assert result.pots == [
+            Pot(230, [0, 1, 2, 4], [2]),
+            Pot(150, [0, 1, 4], [4]),
+            Pot(100, [4], [4]),
+        ]
+        assert result.payouts == [0, 0, 230, 0, 250]
+        assert sum(result.payouts) == 480
+
+    def test_split_pot_odd_chips(self):
+        result = showdown('As/Kd/7h/5c/2s', ['Ah/Qc', 'Ac/Qd', '8c/8d'], [33, 33, 35])
+        assert result.pots == [Pot(99, [0, 1, 2], [0, 1]), Pot(2, [2], [2])]
+        assert result.payouts == [50, 49, 2]
+
+    def test_all_in_short_stack_wins(self):
+        result = showdown('As/Kd/7h/5c/2s', ['Kh/Ks', 'Ah/Qc', '8c/8d'], [20, 100, 100])
+        assert result.payouts == [60, 160, 0]
+
+    def test_folded_biggest_contribution(self):
+        result = showdown('As/Kd/7h/5c/2s', ['Kh/Ks', None], [50, 80])
+        assert result.pots == [Pot(100, [0], [0]), Pot(30, [], [1])]
+        assert result.payouts == [100, 30]
+
+    def test_wrong_contributions(self):
+        with pytest.raises(ValueError):
+            showdown('As/Kd/7h/5c/2s', ['Kh/Ks', 'Ah/Qc'], [50])
+
+
+class TestBatch:
+    def test_same_as_showdown(self):
+        np = pytest.importorskip('numpy')
+        rnd = random.Random(1)
+        tables, hands, contributions, folded = [], [], [], []
+        for _ in range(500):
+            cards = rnd.sample(range(52), 23)
+            tables.append(cards[:5])
+            hands.append([cards[5 + 2 * i:7 + 2 * i] for i in range(9)])
+            contributions.append([rnd.choice([0, 10, 20, 50, 100, 333]) for _ in range(9)])
+            folded.append([rnd.random() < 0.3 for _ in range(9)])
+        result = showdown_batch(tables, hands, contributions, folded)
+        assert len(result) == 500
+        for i in range(500):
+            expected = showdown(
+                tables[i], [None if f else hand for hand, f in zip(hands[i], folded[i])], contributions[i])
+            assert result.keys[i].tolist() == [key or 0 for key in expected.keys]
+            assert np.flatnonzero(result.winners[i]).tolist() == expected.winners
+            assert result.payouts[i].tolist() == expected.payouts
+            one = result[i]
+            assert (one.ranking, one.pots, one.payouts) == (expected.ranking, expected.pots, expected.payouts)
+
+    def test_without_contributions(self):
+        pytest.importorskip('numpy')
+        tables = [cards_indexes('As/Kd/7h/5c/2s'), cards_indexes('Ts/Js/Qs/Ks/As')]
+        hands = [
+            [cards_indexes('Ah/Qc'), cards_indexes('Ac/Qd'), cards_indexes('Kh/Ks')],
+            [cards_indexes('2c/3c'), cards_indexes('2d/3d'), cards_indexes('4h/5h')],
+        ]
+        result = showdown_batch(tables, hands, folded=[[False, False, True], [False, False, False]])
+        assert result.winners.tolist() == [[True, True, False], [True, True, True]]
+        assert result.keys[0, 2] == 0
+        assert result.payouts is None
+        assert result[0].ranking == [[0, 1]]
+
+    def test_all_folded(self):
+        pytest.importorskip('numpy')
+        result = showdown_batch(
+            [cards_indexes('As/Kd/7h/5c/2s')], [[cards_indexes('Ah/Qc'), cards_indexes('Kh/Ks')]],
+            [[50, 80]], [[True, True]])
+        assert result.winners.tolist() == [[False, False]]
+        assert result.payouts.tolist() == [[50, 80]]
+
+    def test_wrong_contributions(self):
+        pytest.importorskip('numpy')
+        with pytest.raises(ValueError):
+            showdown_batch(
+                [cards_indexes('As/Kd/7h/5c/2s')], [[cards_indexes('Ah/Qc'), cards_indexes('Kh/Ks')]], [[50]])
@@ -0,0 +1,74 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import os
+
+import pytest
+
+from thpoker.backends import get_backend, set_backend
+from thpoker.lookup import LookupTable, cards_indexes, get_table
+from thpoker.workers import WorkerPool
+
+
+def worker_state(cards):
+    table = get_table()
+    return os.getpid(), table.mapped, get_backend().name, get_backend().evaluate(cards)
+
+
+def set_marker(value):
+    os.environ['THPOKER_TEST_MARKER'] = value
+
+
+def get_marker(_):
+    return os.environ.get('THPOKER_TEST_MARKER')
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    return str(tmp_path / 'table.bin')
+
+
+class TestWorkerPool:
+    def test_mapped_table(self, table_path):
+        cards = [cards_indexes('As/Ks/Qs/Js/Ts/2c/3d'), cards_indexes('2c/2d/7h/7s/9c/Jd/Ah')] * 4
+        with WorkerPool(2, table_path=table_path) as pool:
+            states = pool.map(worker_state, cards, chunksize=1)
+        assert os.path.exists(table_path)
+        assert all(mapped for _, mapped, _, _ in states)
+        assert {name for _, _, name, _ in states} == {get_backend().name}
+        assert [key for _, _, _, key in states] == [get_table().evaluate(c) for c in cards]
+        assert os.getpid() not in {pid for pid, _, _, _ in states}
+
+    def test_backend(self, table_path):
+        try:
+            set_backend('core')
+            with WorkerPool(2, table_path=table_path) as pool:
+                assert {state[2] for state in pool.map(worker_state, [[0, 1, 2]] * 4)} == {'core'}
+        finally:
+            set_backend()
+        with WorkerPool(2, backend='core', table_path=table_path) as pool:
+            assert {state[2] for state in pool.imap_unordered(worker_state, [[0, 1, 2]] * 4)} == {'core'}
+
+    def test_initializer(self, table_path):
+        with WorkerPool(2, table_path=table_path, initializer=set_marker, initargs=('ready',)) as pool:
+            assert pool.map(get_marker, range(4)) == ['ready'] * 4
+
+    def test_spawn(self, table_path):
+        LookupTable.load(table_path)
+        with WorkerPool(1, table_path=table_path, context='spawn') as pool:
+            _, mapped, _, key = pool.apply_async(worker_state, (cards_indexes('Ah/Ad/Ac/Kh/Kd'),)).get(60)
+        assert mapped
+        assert key == get_table().evaluate(cards_indexes('Ah/Ad/Ac/Kh/Kd'))
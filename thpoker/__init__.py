@@ -0,0 +1,34 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import importlib
+
+
+# Submodules are imported on first attribute access (thpoker.core, thpoker.hardcore, ...).
+SUBMODULES = (
+    'backends', 'bitmask', 'boards', 'cache', 'core', 'deals', 'equity', 'exceptions', 'hardcore',
+    'isomorphism', 'lookup', 'pipeline', 'preflop', 'profiling', 'pyhardcore', 'ranges', 'records', 'server',
+    'showdown', 'workers',
+)
+
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(SUBMODULES))
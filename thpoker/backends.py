@@ -0,0 +1,220 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import os
+
+from thpoker.exceptions import UnknownBackendError, BackendUnavailableError
+from thpoker.lookup import MISS, HALF, REAL, LookupTable, card_sign, get_table, pack_key, ratio_code, require_numpy
+
+
+ENVIRONMENT_VARIABLE = 'THPOKER_BACKEND'
+
+
+class Backend:
+    """
+    Combos evaluator.
+    Cards are cards indexes (4 * rank + suit), results are combo keys (the same as Combo key).
+    """
+
+    name = None
+    # results version, cached results of other versions are not used
+    version = '1'
+
+    def evaluate(self, cards):
+        """Combo key of cards."""
+        raise NotImplementedError
+
+    def evaluate_ratio(self, table, hand):
+        """Combo key and ratio code of table and hand cards."""
+        raise NotImplementedError
+
+    def evaluate_hands(self, table, hands):
+        """Combos keys of every hand with the same table."""
+        table = list(table)
+        return [self.evaluate(table + list(hand)) for hand in hands]
+
+    def evaluate_batch(self, cards):
+        """Combo keys (uint32 array) of N x k array of cards. Needs NumPy."""
+
+        np = require_numpy('Batch evaluation')
+        cards = np.asarray(cards)
+        return np.fromiter((self.evaluate(row) for row in cards.tolist()), dtype=np.uint32, count=len(cards))
+
+
+class LookupBackend(Backend):
+    """Precomputed lookup table (pure Python, vectorized batches)."""
+
+    name = 'lookup'
+    version = str(LookupTable.VERSION)
+
+    def __init__(self):
+        self.table = get_table()
+
+    def evaluate(self, cards):
+        return self.table.evaluate(cards)
+
+    def evaluate_ratio(self, table, hand):
+        cards = list(table) + list(hand)
+        key = self.table.evaluate(cards)
+        return key, ratio_code(key, cards, [False] * len(table) + [True] * len(hand))
+
+    def evaluate_hands(self, table, hands):
+        return self.table.evaluate_hands(table, hands)
+
+    def evaluate_batch(self, cards):
+        return self.table.evaluate_batch(cards)
+
+
+class CTHPokerBackend(Backend):
+    """CTHPoker C extension (misses the lowest straight in version 1.0.3)."""
+
+    name = 'cthpoker'
+
+    def __init__(self):
+        from cthpoker import findCombo, findRatioCombo
+        self._find_combo = findCombo
+        self._find_ratio_combo = findRatioCombo
+        # results depend on extension version (1.0.3 misses the lowest straight)
+        from importlib.metadata import version, PackageNotFoundError
+        try:
+            self.version = version('cthpoker')
+        except PackageNotFoundError:
+            self.version = 'unknown'
+
+    @staticmethod
+    def _hcards(cards, in_hand=False):
+        in_hand = 1000 * int(in_hand)
+        return [in_hand + ((card >> 2) + 2) * 10 + (card & 3) + 1 for card in cards]
+
+    def evaluate(self, cards):
+        combo = self._find_combo(self._hcards(cards))
+        return pack_key(combo[0], combo[1:])
+
+    def evaluate_ratio(self, table, hand):
+        combo, ratio = self._find_ratio_combo(self._hcards(table) + self._hcards(hand, True))
+        return pack_key(combo[0], combo[1:]), ratio
+
+
+class CoreBackend(Backend):
+    """Core Combo."""
+
+    name = 'core'
+
+    def __init__(self):
+        # core is imported by core backend only, it is slow to import
+        from thpoker.core import Table, Hand, Combo
+
+        self._table, self._hand, self._combo = Table, Hand, Combo
+        self.ratio_codes = {
+            Combo.Ratio.REAL: REAL,
+            Combo.Ratio.HALF: HALF,
+            Combo.Ratio.MISS: MISS,
+        }
+
+    @staticmethod
+    def _cards_string(cards):
+        return '/'.join(card_sign(card) for card in cards)
+
+    def evaluate(self, cards):
+        return self._combo(cards_string=self._cards_string(cards)).key
+
+    def evaluate_ratio(self, table, hand):
+        combo = self._combo(
+            table=self._table(self._cards_string(table)), hand=self._hand(self._cards_string(hand)),
+            ratio_check=True)
+        return combo.key, self.ratio_codes[combo.ratio._value]
+
+
+# Backends by names, the first available one is used by default.
+BACKENDS = {
+    LookupBackend.name: LookupBackend,
+    CTHPokerBackend.name: CTHPokerBackend,
+    CoreBackend.name: CoreBackend,
+}
+
+_backend = None
+_source = None
+
+
+def register_backend(backend_class, name=None):
+    """Add backend class (it raises ImportError on creation if it is not available)."""
+    BACKENDS[name or backend_class.name] = backend_class
+
+
+def create_backend(name):
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise UnknownBackendError(name, list(BACKENDS))
+    try:
+        return backend_class()
+    except ImportError as e:
+        raise BackendUnavailableError(name, e) from e
+
+
+def available_backends():
+    """Names of backends which could be created."""
+
+    names = []
+    for name in BACKENDS:
+        try:
+            create_backend(name)
+        except BackendUnavailableError:
+            continue
+        names.append(name)
+    return names
+
+
+def set_backend(name=None):
+    """
+    Set process wide backend by name.
+    Without name backend is chosen again (THPOKER_BACKEND environment variable or the first available one).
+    """
+
+    global _backend, _source
+    _backend = _source = None
+    if name:
+        _backend, _source = create_backend(name), 'api'
+    return get_backend()
+
+
+def get_backend():
+    """Process wide backend (chosen on first call)."""
+
+    global _backend, _source
+    if _backend is None:
+        name = os.environ.get(ENVIRONMENT_VARIABLE)
+        if name:
+            _backend, _source = create_backend(name), 'environment'
+        else:
+            for name in BACKENDS:
+                try:
+                    _backend = create_backend(name)
+                except BackendUnavailableError:
+                    continue
+                _source = 'default'
+                break
+    return _backend
+
+
+def backend_info():
+    """Current backend name and how it was chosen (for diagnostics)."""
+
+    backend = get_backend()
+    return {
+        'name': backend.name,
+        'source': _source,
+        'available': available_backends(),
+    }
@@ -0,0 +1,171 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from thpoker.core import Cards, Table, Hand
+from thpoker.lookup import RANKS_COUNT, SUITS_COUNT, card_index, card_sign, core_cards_indexes, get_table
+
+
+# Card bit is 13 * suit + rank
+# where rank is 0 (Two) ... 12 (Ace) and suit is 0 (clubs) ... 3 (spades).
+RANKS_MASK = (1 << RANKS_COUNT) - 1
+DECK_BITS = (1 << (RANKS_COUNT * SUITS_COUNT)) - 1
+
+
+def straight_weight(ranks_mask):
+    """Weight of the highest straight card of 13 bit ranks mask or 0 if there is no straight."""
+
+    # the lowest bit is an ace in the lowest straight
+    mask = ((ranks_mask << 1) | (ranks_mask >> (RANKS_COUNT - 1))) & ((RANKS_MASK << 1) | 1)
+    in_a_row = mask & (mask >> 1) & (mask >> 2) & (mask >> 3) & (mask >> 4)
+    return in_a_row.bit_length() + 4 if in_a_row else 0
+
+
+class CardSet:
+    """
+    Cards set packed into 52 bit integer.
+    Every suit has 13 bit ranks mask, so sets are joined, compared and checked by bit operations.
+
+    CardSet('As/Kd/Tc') or CardSet.from_cards(Table('As/Kd/Tc')) or CardSet.from_hcards([144, 132, 101])
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, cards_string=None, bits=0):
+        if cards_string:
+            bits = 0
+            for sign in cards_string.split('/'):
+                bits |= self.card_bit(card_index(sign))
+        self.bits = bits
+
+    @staticmethod
+    def card_bit(index):
+        """Bit of card index (4 * rank + suit)."""
+        return 1 << ((index & 3) * RANKS_COUNT + (index >> 2))
+
+    @classmethod
+    def deck(cls):
+        return cls(bits=DECK_BITS)
+
+    @classmethod
+    def from_indexes(cls, indexes):
+        bits = 0
+        for index in indexes:
+            bits |= cls.card_bit(index)
+        return cls(bits=bits)
+
+    @classmethod
+    def from_cards(cls, cards):
+        """Set of Core cards (Cards, Table, Hand or iterable of Card)."""
+
+        return cls.from_indexes(core_cards_indexes(cards))
+
+    @classmethod
+    def from_hcards(cls, hcards):
+        """Set of HardCore cards (hand cards marks are dropped)."""
+
+        bits = 0
+        for hcard in hcards:
+            hcard %= 1000
+            rank = (hcard // 10 - 2) % RANKS_COUNT
+            bits |= 1 << ((hcard % 10 - 1) * RANKS_COUNT + rank)
+        return cls(bits=bits)
+
+    def __repr__(self):
+        return f"CardSet('{self.to_string()}')"
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    def __iter__(self):
+        return iter(self.indexes())
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            item = card_index(item)
+        return bool(self.bits & self.card_bit(item))
+
+    def __eq__(self, other):
+        return self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __or__(self, other):
+        return CardSet(bits=self.bits | other.bits)
+
+    def __and__(self, other):
+        return CardSet(bits=self.bits & other.bits)
+
+    def __sub__(self, other):
+        return CardSet(bits=self.bits & ~other.bits)
+
+    def __invert__(self):
+        """Cards out of set."""
+        return CardSet(bits=DECK_BITS & ~self.bits)
+
+    def suit_mask(self, suit):
+        """13 bit ranks mask of suit (0 is clubs ... 3 is spades)."""
+        return (self.bits >> (suit * RANKS_COUNT)) & RANKS_MASK
+
+    @property
+    def ranks_mask(self):
+        """13 bit mask of all ranks of set."""
+        bits = self.bits
+        return (bits | bits >> RANKS_COUNT | bits >> 2 * RANKS_COUNT | bits >> 3 * RANKS_COUNT) & RANKS_MASK
+
+    @property
+    def flush_suit(self):
+        """Suit with five or more cards or None."""
+
+        for suit in range(SUITS_COUNT):
+            if bin(self.suit_mask(suit)).count('1') >= 5:
+                return suit
+        return None
+
+    @property
+    def straight_weight(self):
+        """Weight of the highest straight card (2 ... 14) or 0."""
+        return straight_weight(self.ranks_mask)
+
+    @property
+    def key(self):
+        """Combo key of cards (the same as Combo key)."""
+        return get_table().evaluate(self.indexes())
+
+    def indexes(self):
+        """Cards indexes (4 * rank + suit) from the lowest card."""
+        return sorted(
+            rank * SUITS_COUNT + suit
+            for suit in range(SUITS_COUNT)
+            for rank in range(RANKS_COUNT)
+            if self.bits >> (suit * RANKS_COUNT + rank) & 1
+        )
+
+    def to_string(self):
+        return '/'.join(card_sign(index) for index in self.indexes())
+
+    def to_cards(self, cards_class=Cards):
+        """Core cards object (Cards, Table or Hand)."""
+        return cards_class(cards_string=self.to_string()) if self.bits else cards_class()
+
+    def to_table(self):
+        return self.to_cards(Table)
+
+    def to_hand(self):
+        return self.to_cards(Hand)
+
+    def hcards(self, in_hand=False):
+        """HardCore cards."""
+        return [1000 * int(in_hand) + ((index >> 2) + 2) * 10 + (index & 3) + 1 for index in self.indexes()]
@@ -0,0 +1,121 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import math
+
+from thpoker.lookup import card_sign, cards_indexes, require_numpy
+
+
+DECK_SIZE = 52
+
+
+class Boards:
+    """
+    All boards of count cards from deck without dead cards.
+    Board is numbered by combinatorial number system:
+    board of deck positions p1 < p2 < ... < pk has index C(p1, 1) + C(p2, 2) + ... + C(pk, k).
+    So any board or slice of boards is got without enumerating previous ones
+    and enumeration is split into shards deterministically.
+
+    Boards(3) (all flops) or Boards(2, dead='As/Ad/2c/7d/9h') (turns and rivers)
+    """
+
+    def __init__(self, count, dead=None):
+        dead = set(cards_indexes(dead) if dead is None or isinstance(dead, str) else dead)
+        self.count = count
+        self.deck = [card for card in range(DECK_SIZE) if card not in dead]
+        self.positions = {card: position for position, card in enumerate(self.deck)}
+        # binomials[n][i] is C(n, i)
+        self.binomials = [[math.comb(n, i) for i in range(count + 1)] for n in range(len(self.deck) + 1)]
+        self.size = self.binomials[len(self.deck)][count]
+
+    def __repr__(self):
+        return f"Boards(count={self.count}, size={self.size})"
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return self.iter()
+
+    def index(self, board):
+        """Index of board (cards string or cards indexes)."""
+
+        if isinstance(board, str):
+            board = cards_indexes(board)
+        try:
+            positions = sorted(self.positions[card] for card in board)
+        except KeyError as e:
+            card = e.args[0]
+            raise ValueError(f"Card {card_sign(card) if card in range(DECK_SIZE) else card} is not in deck.") from None
+        if len(positions) != self.count or len(set(positions)) != self.count:
+            raise ValueError(f"Board needs {self.count} different cards.")
+        return sum(self.binomials[p][i] for i, p in enumerate(positions, 1))
+
+    def board(self, index):
+        """Board (cards indexes from the lowest one) by index."""
+
+        if not 0 <= index < self.size:
+            raise IndexError(f"Board index {index} is out of range.")
+        positions = []
+        position = len(self.deck)
+        for i in range(self.count, 0, -1):
+            # the highest position which binomial fits in index
+            position -= 1
+            while self.binomials[position][i] > index:
+                position -= 1
+            index -= self.binomials[position][i]
+            positions.append(position)
+        return tuple(self.deck[p] for p in reversed(positions))
+
+    def iter(self, start=0, stop=None):
+        """Boards from start index to stop index (not included)."""
+
+        stop = self.size if stop is None else min(stop, self.size)
+        if start >= stop:
+            return
+        deck = self.deck
+        positions = [self.positions[card] for card in self.board(start)]
+        for _ in range(stop - start):
+            yield tuple(deck[p] for p in positions)
+            # the next board: the lowest position which could be moved up is moved,
+            # lower positions are reset to the lowest values
+            for i in range(self.count):
+                if i + 1 == self.count or positions[i] + 1 < positions[i + 1]:
+                    positions[i] += 1
+                    positions[:i] = range(i)
+                    break
+
+    def batches(self, start=0, stop=None, batch_size=100000):
+        """Boards arrays (batch_size x count) from start index to stop index. Needs NumPy."""
+
+        np = require_numpy('Boards batches')
+        stop = self.size if stop is None else min(stop, self.size)
+        binomials = np.array(self.binomials, dtype=np.int64)
+        deck = np.array(self.deck, dtype=np.intp)
+        for batch_start in range(start, stop, batch_size):
+            indexes = np.arange(batch_start, min(batch_start + batch_size, stop), dtype=np.int64)
+            board = np.empty((len(indexes), self.count), dtype=np.intp)
+            for i in range(self.count, 0, -1):
+                # binomials column is increasing, so the highest fitting position is found by binary search
+                positions = np.searchsorted(binomials[:, i], indexes, side='right') - 1
+                indexes -= binomials[positions, i]
+                board[:, i - 1] = positions
+            yield deck[board]
+
+    def shards(self, count):
+        """Index ranges (start, stop) of count even shards."""
+        return [(self.size * i // count, self.size * (i + 1) // count) for i in range(count)]
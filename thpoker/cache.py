@@ -0,0 +1,228 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import os
+import sqlite3
+
+from thpoker.backends import get_backend
+from thpoker.equity import EquityResult, hand_vs_hand, class_vs_class, range_vs_range
+from thpoker.isomorphism import SUITS_PERMUTATIONS, canonical_groups, permute_suits
+from thpoker.lookup import card_sign, cards_indexes
+from thpoker.preflop import HAND_TYPES, hand_type_index
+from thpoker.ranges import HandRange
+
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS results ('
+    'key TEXT PRIMARY KEY, win INTEGER NOT NULL, tie INTEGER NOT NULL, loss INTEGER NOT NULL, used INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS results_used ON results (used)',
+    'CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+    "INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0), ('evictions', 0), ('entries', 0)",
+)
+
+
+def _ordered(key1, key2):
+    """Key of situation without hands order and flag of swapped hands."""
+    return (key2, True) if key2 < key1 else (key1, False)
+
+
+def _range_key(hands1, hands2, table, dead):
+    """Canonical suit isomorphic form of hands ranges with table and dead cards."""
+
+    return min(
+        (
+            tuple(sorted(tuple(sorted(permute_suits(hand, permutation))) for hand in hands1)),
+            tuple(sorted(tuple(sorted(permute_suits(hand, permutation))) for hand in hands2)),
+            tuple(sorted(permute_suits(table, permutation))),
+            tuple(sorted(permute_suits(dead, permutation))),
+        )
+        for permutation in SUITS_PERMUTATIONS
+    )
+
+
+class _transaction:
+    """Write transaction (database is locked for other writers until it is finished)."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, exc_type, *args):
+        self.connection.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+def _add_stat(connection, name, value):
+    connection.execute('UPDATE stats SET value = value + ? WHERE name = ?', (value, name))
+    return connection.execute('SELECT value FROM stats WHERE name = ?', (name,)).fetchone()[0]
+
+
+def _next_used(connection):
+    """The next number of results usage order (shared by processes)."""
+    return connection.execute('SELECT COALESCE(MAX(used), 0) + 1 FROM results').fetchone()[0]
+
+
+def _cards_string(cards):
+    return '/'.join(card_sign(card) for card in cards) or None
+
+
+class EquityCache:
+    """
+    Persistent equity results cache (SQLite file).
+    Results are keyed by suit isomorphic form of situation and backend name and version,
+    so isomorphic situations and swapped hands share one entry.
+    The least recently used entries are removed when cache has more than max_entries results.
+    Every process opens its own connection, writes are serialized by SQLite file lock.
+    """
+
+    def __init__(self, path, max_entries=100000, timeout=30.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def _connect(self):
+        # SQLite connection could not be used by forked process
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with _transaction(connection):
+                for statement in SCHEMA:
+                    connection.execute(statement)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = self._pid = None
+
+    def get(self, key):
+        """Cached result by key or None."""
+
+        connection = self._connect()
+        with _transaction(connection):
+            row = connection.execute('SELECT win, tie, loss FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                _add_stat(connection, 'misses', 1)
+                return None
+            self.hits += 1
+            _add_stat(connection, 'hits', 1)
+            connection.execute('UPDATE results SET used = ? WHERE key = ?', (_next_used(connection), key))
+        return EquityResult(*row)
+
+    def put(self, key, result):
+        """Save result by key and remove the least recently used results over max entries."""
+
+        connection = self._connect()
+        with _transaction(connection):
+            exists = connection.execute('SELECT 1 FROM results WHERE key = ?', (key,)).fetchone()
+            connection.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                (key, result.win, result.tie, result.loss, _next_used(connection)))
+            if exists:
+                return
+            entries = _add_stat(connection, 'entries', 1)
+            if entries > self.max_entries:
+                removed = connection.execute(
+                    'DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY used LIMIT ?)',
+                    (entries - self.max_entries,)).rowcount
+                _add_stat(connection, 'entries', -removed)
+                _add_stat(connection, 'evictions', removed)
+
+    def cached(self, key, function, *args, **kwargs):
+        """Cached result by key or result of function call (which is cached)."""
+
+        result = self.get(key)
+        if result is None:
+            result = function(*args, **kwargs)
+            self.put(key, result)
+        return result
+
+    def stats(self):
+        """Hits, misses and evictions of all processes and entries count."""
+        return dict(self._connect().execute('SELECT name, value FROM stats').fetchall())
+
+    def clear(self):
+        """Remove all results and statistics."""
+
+        connection = self._connect()
+        with _transaction(connection):
+            connection.execute('DELETE FROM results')
+            connection.execute('UPDATE stats SET value = 0')
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(kind, situation):
+        """Cache key of situation of kind with current backend."""
+
+        backend = get_backend()
+        return f'{kind}:{backend.name}:{backend.version}:{situation!r}'
+
+    def hand_vs_hand(self, hand1, hand2, table=None, processes=None):
+        """Cached equity.hand_vs_hand."""
+
+        hand1, hand2, table = cards_indexes(hand1), cards_indexes(hand2), cards_indexes(table)
+        situation, swapped = _ordered(
+            canonical_groups((hand1, hand2, table))[0], canonical_groups((hand2, hand1, table))[0])
+        result = self.cached(self.key('hand', situation), hand_vs_hand, *(
+            (_cards_string(hand2), _cards_string(hand1)) if swapped else (_cards_string(hand1), _cards_string(hand2))
+        ), table=_cards_string(table), processes=processes)
+        return result.reverse() if swapped else result
+
+    def class_vs_class(self, hand_type1, hand_type2, table=None, processes=None):
+        """Cached equity.class_vs_class."""
+
+        hand_type1 = HAND_TYPES[hand_type_index(hand_type1)]
+        hand_type2 = HAND_TYPES[hand_type_index(hand_type2)]
+        table = canonical_groups((cards_indexes(table),))[0][0]
+        (type1, type2), swapped = _ordered((hand_type1, hand_type2), (hand_type2, hand_type1))
+        result = self.cached(
+            self.key('class', (type1, type2, table)), class_vs_class, type1, type2,
+            table=_cards_string(table), processes=processes)
+        return result.reverse() if swapped else result
+
+    def range_vs_range(self, range1, range2, table=None, dead=None):
+        """Cached exact equity.range_vs_range."""
+
+        table, dead = cards_indexes(table), cards_indexes(dead)
+        range1, range2 = (r if isinstance(r, HandRange) else HandRange(r) for r in (range1, range2))
+        situation, swapped = _ordered(
+            _range_key(range1, range2, table, dead), _range_key(range2, range1, table, dead))
+        if swapped:
+            range1, range2 = range2, range1
+        result = self.cached(
+            self.key('range', situation), range_vs_range, range1, range2,
+            table=_cards_string(table), dead=_cards_string(dead))
+        return result.reverse() if swapped else result
@@ -15,10 +15,44 @@
 
 # -*- coding: utf-8 -*-
 
-import random
+
+import struct
 
 from agstuff.cards.core import Card, Cards as BaseCards
 from thpoker.exceptions import ComboCardsTypeError, ComboArgumentsError
+from thpoker.lookup import (
+    MISS, HALF, REAL, card_sign, core_card_index, core_cards_indexes, get_table, pack_key, unpack_key,
+)
+
+
+# Cards shared by combos, they are not changed by combos search.
+INTERNED_CARDS = {
+    f'{w}{s}': Card(f'{w}{s}') for w in Card.Weight.REAL_SYMBOLS for s in Card.Suit.SYMBOLS
+}
+
+
+def _get_low_aces():
+    low_aces = {}
+    for suit_symbol in Card.Suit.SYMBOLS:
+        for in_hand in (False, True):
+            low_aces[suit_symbol, in_hand] = low_ace = Card(f'1{suit_symbol}')
+            low_ace.in_hand = in_hand
+    return low_aces
+
+
+LOW_ACES = _get_low_aces()
+ACE_NUMBER = Card.Weight.NUMBERS_BY_SYMBOLS['A']
+
+# Combo record is combo key, 7 combo search cards codes (card index + 1, hand cards have HAND_CARD_FLAG, 0 is no card),
+# 5 combo cards codes (position in search cards + 1, an ace of the lowest straight has LOW_ACE_FLAG, 0 is no card)
+# and ratio code (lookup ratio code + 1, 0 is not checked ratio).
+COMBO_RECORD = struct.Struct('<I7s5sB')
+HAND_CARD_FLAG = 0x40
+LOW_ACE_FLAG = 0x80
+
+
+def _cards_string(cards):
+    return '/'.join(card.weight.symbol + card.suit.symbol for card in cards) or None
 
 
 class Cards(BaseCards):
@@ -27,6 +61,10 @@ class Cards(BaseCards):
     def __init__(self, cards_string=None, cards=None):
         super().__init__(cards_string=cards_string, cards=cards, max_count=7)
 
+    def __reduce__(self):
+        # cards string is much smaller than pickled cards objects
+        return self.__class__, (_cards_string(self.items),)
+
 
 class Table(BaseCards):
     """Table cards."""
@@ -34,6 +72,9 @@ class Table(BaseCards):
     def __init__(self, cards_string=None, cards=None):
         super().__init__(cards_string=cards_string, cards=cards, max_count=5)
 
+    def __reduce__(self):
+        return self.__class__, (_cards_string(self.items),)
+
 
 class Hand(BaseCards):
     """Player's hand cards."""
@@ -45,6 +86,11 @@ class Hand(BaseCards):
         if self.items:
             self._after_pull()
 
+    def __reduce__(self):
+        # hand cards are sorted from the highest one on creation (pair cards order is kept by stable sort),
+        # so reversed order gives the same cards order
+        return self.__class__, (_cards_string(self.items[::-1]),)
+
     def clean(self):
         super().clean()
         self.type = ''
@@ -84,6 +130,11 @@ class Combo:
         Combo(table=Table('6s/Jc/Ah/9h'), hand=Hand('3d/Jd'))
     or
         Combo(table=Table('6s/Jc/Ah/9h'), hand=Hand('3d/Jd'), ratio_check=True)
+
+    Combos are found by precomputed lookup table after Combo.enable_lookup_table() call.
+
+    Combo strength is packed into one integer (Combo.key)
+    with combo type in high bits and combo cards weights below.
     '''
 
     HIGH_CARD = 1
@@ -120,10 +171,16 @@ class Combo:
         STRAIGHT_FLUSH: "sf"
     }
 
+    lookup_table = None
+
+    __slots__ = ('init_cards', 'cards', 'type', 'key', 'repeats', 'sequence', '_ratio')
+
 
     class Sequence:
         """Cards sequence."""
 
+        __slots__ = ('state', 'cards', 'order_cards', 'max_in_a_row')
+
         FIVE_OR_MORE_IN_A_ROW = 'five_or_more_in_a_row'
         FOUR_OR_LESS_IN_A_ROW = 'four_or_less_in_a_row'
 
@@ -156,12 +213,10 @@ class Combo:
             """Add an ace with weight 1 if an real ace is in cards."""
 
             for card in self.cards:
-                if card == Card('A'): break
+                if card.weight.number == ACE_NUMBER: break
             else:
                 return
-            new_ace = Card(f'1{card.suit.symbol}')
-            new_ace.in_hand = card.in_hand
-            self.cards.insert(0, new_ace)
+            self.cards.insert(0, LOW_ACES[card.suit.symbol, card.in_hand])
 
         def _get_rank(self):
             rank = [None] * 14
@@ -181,6 +236,8 @@ class Combo:
 
         class BaseRepeats:
 
+            __slots__ = ('_repeats', 'card_counts', 'included_cards', 'repeat_counts', 'all', 'max')
+
             def __init__(self, repeats):
                 self._repeats = repeats
                 self.card_counts = {}
@@ -189,10 +246,10 @@ class Combo:
                 self.all = {}
                 self.max = 0
 
-            def add(self, card):
-                self.card_counts[card] = self.card_counts.get(card, 0) + 1
-                if self.card_counts[card] == 1:
-                    self.included_cards.append(card)
+            def add(self, number):
+                self.card_counts[number] = self.card_counts.get(number, 0) + 1
+                if self.card_counts[number] == 1:
+                    self.included_cards.append(number)
 
             def find(self):
                 for card in self.included_cards:
@@ -208,6 +265,8 @@ class Combo:
 
         class WeightRepeats(BaseRepeats):
 
+            __slots__ = ('state', 'cards')
+
             FOUR = 'four'
             DOUBLE_THREE = 'double_three'
             THREE_AND_TWO = 'three_and_two'
@@ -290,30 +349,35 @@ class Combo:
 
         class SuitRepeats(BaseRepeats):
 
+            __slots__ = ('five_or_more', 'flush_suit')
+
             def __init__(self, repeats):
                 super().__init__(repeats)
                 self.five_or_more = False
-                self.flush_card = None
+                self.flush_suit = None
 
             def find(self):
                 super().find()
                 if (five_or_more := self.max >= 5):
-                    self.flush_card = self.all[self.max][0]
+                    self.flush_suit = self.all[self.max][0]
                     self._repeats.state = self._repeats.FIVE_OR_MORE_SUIT_REPEATS
                 else:
-                    self.flush_card = None
+                    self.flush_suit = None
                 self.five_or_more = five_or_more
 
 
+        __slots__ = ('weight', 'suit', 'state')
+
         def __init__(self):
             self.weight = self.WeightRepeats(self)
             self.suit = self.SuitRepeats(self)
             self.state = self.THREE_OR_LESS_WEIGHT_REPEATS
 
         def find(self, cards):
+            # weights and suits are counted by their numbers
             for card in cards:
-                self.weight.add(Card(card.weight.symbol))
-                self.suit.add(Card(card.suit.symbol))
+                self.weight.add(card.weight.number)
+                self.suit.add(card.suit.number)
             self.weight.find()
             self.suit.find()
 
@@ -324,6 +388,8 @@ class Combo:
         Allows to compare similar type combinations.
         """
 
+        __slots__ = ('items',)
+
         def __init__(self):
             self.items = []
 
@@ -368,7 +434,11 @@ class Combo:
             self.items.extend(cards)
 
         def get_other_cards(self, all_cards):  # add cards to main combination
-            cards_to_add = list(filter(lambda card: card not in self, all_cards))
+            # cards are equal by weights, so weights mask is checked instead of cards list
+            weights = 0
+            for card in self.items:
+                weights |= 1 << card.weight.number
+            cards_to_add = [card for card in all_cards if not weights >> card.weight.number & 1]
             if not cards_to_add: return
             cards_to_add.reverse()
             free_places = 5 - len(self)
@@ -385,6 +455,8 @@ class Combo:
         HALF = "half" # half combo base cards inlude hand cards
         MISS = "miss" # combo base cards don't inlude hand cards
 
+        __slots__ = ('_combo', '_value')
+
         def __init__(self, combo):
             self._combo = combo
             self._value = None
@@ -408,6 +480,7 @@ class Combo:
         def check(self):
             suffix = Combo.SHORT_TYPE_NAMES[self._combo.type]
             getattr(self, f'_check_{suffix}')()
+            self._combo = None
 
         def _check_hc(self):
             self._check_all_cards()
@@ -430,8 +503,8 @@ class Combo:
             self._check_all_cards()
 
         def _check_fh(self):
-            three = list(filter(lambda c: c == self._combo.repeats.weight.cards[3], self._combo.init_cards))
-            two = list(filter(lambda c: c == self._combo.repeats.weight.cards[2], self._combo.init_cards))
+            three = list(filter(lambda c: c == self._combo.cards[0], self._combo.init_cards))
+            two = list(filter(lambda c: c == self._combo.cards[3], self._combo.init_cards))
             self._find_with_half((three, two))
 
         def _check_fk(self):
@@ -468,7 +541,7 @@ class Combo:
     def __init__(self, cards_string=None, cards=None, table=None, hand=None, ratio_check=False):
         ratio_check_needed = False
         if cards_string:
-            self.init_cards = Cards(cards_string).items
+            self.init_cards = self._parse(cards_string)
         elif cards:
             cards_type = type(cards)
             if not cards_type is Cards:
@@ -488,15 +561,33 @@ class Combo:
             raise ComboArgumentsError()
 
         self.cards = self.Cards()
-        self.repeats = self.Repeats()
-        self.sequence = self.Sequence()
-        self.ratio = self.Ratio(self)
+        # repeats and sequence are kept during combo search only
+        self.repeats = None
+        self.sequence = None
+        self._ratio = None
         self.type = None
+        self.key = None
 
         self._find()
         if ratio_check_needed:
             self.ratio.check()
 
+    @classmethod
+    def enable_lookup_table(cls, table=None):
+        """Find combos by precomputed lookup table (process wide one by default)."""
+        cls.lookup_table = table or get_table()
+
+    @classmethod
+    def disable_lookup_table(cls):
+        cls.lookup_table = None
+
+    @property
+    def ratio(self):
+        """Combo ratio (created on first access)."""
+        if self._ratio is None:
+            self._ratio = self.Ratio(self)
+        return self._ratio
+
     @property
     def name(self):
         return self.TYPE_NAMES[self.type]
@@ -512,36 +603,111 @@ class Combo:
         return repr([self.type] + self.cards.items)
 
     def __lt__(self, other):
-        return (self.type, self.cards) < (other.type, other.cards)
+        return self.key < other.key
 
     def __gt__(self, other):
-        return (self.type, self.cards) > (other.type, other.cards)
+        return self.key > other.key
 
     def __eq__(self, other):
-        return (self.type, self.cards) == (other.type, other.cards)
+        return self.key == other.key
 
     def __ne__(self, other):
-        return (self.type, self.cards) != (other.type, other.cards)
+        return self.key != other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __reduce__(self):
+        # combo is pickled as its record, so cards, repeats and ratio objects are not pickled
+        return _combo_from_record, (self.to_record(),)
+
+    def to_record(self):
+        """Fixed width (COMBO_RECORD.size bytes) binary record of combo."""
+
+        cards = bytes(core_card_index(card) + 1 | HAND_CARD_FLAG * card.in_hand for card in self.init_cards)
+        combo_cards = bytes(self._record_position(card) for card in self.cards)
+        ratio = self._ratio._value if self._ratio is not None else None
+        ratio_code = 0 if ratio is None else RATIO_CODES[ratio] + 1
+        return COMBO_RECORD.pack(self.key, cards, combo_cards, ratio_code)
+
+    @classmethod
+    def from_record(cls, record):
+        """Combo of binary record (combo is not searched again)."""
+
+        key, cards, combo_cards, ratio_code = COMBO_RECORD.unpack(record)
+        combo = cls.__new__(cls)
+        combo.init_cards = [_get_record_card(code) for code in cards if code]
+        combo.cards = cls.Cards()
+        for code in combo_cards.rstrip(b'\0'):
+            card = combo.init_cards[(code & ~LOW_ACE_FLAG) - 1]
+            combo.cards.add_card(LOW_ACES[card.suit.symbol, card.in_hand] if code & LOW_ACE_FLAG else card)
+        combo.key = key
+        combo.type = unpack_key(key)[0]
+        combo.repeats = None
+        combo.sequence = None
+        combo._ratio = None
+        if ratio_code:
+            combo._ratio = cls.Ratio(None)
+            combo._ratio._value = RATIO_VALUES[ratio_code - 1]
+        return combo
+
+    def _record_position(self, card):
+        low_ace = card.weight.number == 0
+        number = ACE_NUMBER if low_ace else card.weight.number
+        for position, init_card in enumerate(self.init_cards):
+            if (init_card.weight.number == number and init_card.suit.number == card.suit.number
+                    and init_card.in_hand == card.in_hand):
+                return position + 1 | LOW_ACE_FLAG * low_ace
+        raise ValueError(f"Combo card {card!r} is not one of combo search cards.")
+
+    @staticmethod
+    def _parse(cards_string):
+        try:
+            return [INTERNED_CARDS[sign] for sign in cards_string.split('/')[:7]]
+        except (KeyError, AttributeError):
+            return Cards(cards_string).items
 
     def _find(self):
-        self.init_cards.sort()
+        self._sort()
+        if self.lookup_table:
+            self._find_with_lookup_table()
+            return
+        self.repeats = self.Repeats()
+        self.sequence = self.Sequence()
         self.repeats.find(self.init_cards)
         getattr(self, f'_find_with_{self.repeats.state}')()
+        self.key = self._get_key()
+        self.repeats = None
+        self.sequence = None
+
+    def _sort(self):
+        self.init_cards.sort()
+
+    def _get_key(self):
+        weights = []
+        for card in self.cards:
+            # key weights are from 2 (Two) to 14 (Ace) and 1 for an ace in a low straight
+            weight = card.weight.number + 1
+            if not weights or weights[-1] != weight:
+                weights.append(weight)
+        if self.type in (self.STRAIGHT, self.STRAIGHT_FLUSH):
+            weights = weights[:1]
+        return pack_key(self.type, weights)
 
     def _find_with_four_weigh_repeats(self):
         self.type = self.FOUR_OF_A_KIND
-        four = list(filter(lambda card: card == self.repeats.weight.cards[4], self.init_cards))
+        four = list(filter(lambda card: card.weight.number == self.repeats.weight.cards[4], self.init_cards))
         self.cards.add_cards(four)
         self.cards.get_other_cards(self.init_cards)
 
     def _find_with_three_two_weigh_repeats(self):
         self.type = self.FULL_HOUSE
-        the_set = list(filter(lambda card: card == self.repeats.weight.cards[3], self.init_cards))
-        pair = list(filter(lambda card: card == self.repeats.weight.cards[2], self.init_cards))[:2]
+        the_set = list(filter(lambda card: card.weight.number == self.repeats.weight.cards[3], self.init_cards))
+        pair = list(filter(lambda card: card.weight.number == self.repeats.weight.cards[2], self.init_cards))[:2]
         self.cards.add_cards(the_set + pair)
 
     def _find_with_five_or_more_suit_repeats(self):
-        cards = list(filter(lambda card: card == self.repeats.suit.flush_card, self.init_cards))
+        cards = list(filter(lambda card: card.suit.number == self.repeats.suit.flush_suit, self.init_cards))
         self.sequence.find(cards)
         getattr(self, f'_get_flush_with_{self.sequence.state}')()
 
@@ -568,7 +734,7 @@ class Combo:
 
     def _get_three_weigh_repeats(self):
         self.type = self.THREE_OF_A_KIND
-        three = list(filter(lambda card: card == self.repeats.weight.cards[3], self.init_cards))
+        three = list(filter(lambda card: card.weight.number == self.repeats.weight.cards[3], self.init_cards))
         self.cards.add_cards(three)
         self.cards.get_other_cards(self.init_cards)
 
@@ -577,14 +743,14 @@ class Combo:
 
     def _get_double_two_weigh_repeats(self):
         self.type = self.TWO_PAIRS
-        high_pair = list(filter(lambda card: card == self.repeats.weight.cards[22], self.init_cards))
-        low_pair = list(filter(lambda card: card == self.repeats.weight.cards[21], self.init_cards))
+        high_pair = list(filter(lambda card: card.weight.number == self.repeats.weight.cards[22], self.init_cards))
+        low_pair = list(filter(lambda card: card.weight.number == self.repeats.weight.cards[21], self.init_cards))
         self.cards.add_cards(high_pair + low_pair)
         self.cards.get_other_cards(self.init_cards)
 
     def _get_two_weigh_repeats(self):
         self.type = self.ONE_PAIR
-        pair = list(filter(lambda card: card == self.repeats.weight.cards[2], self.init_cards))
+        pair = list(filter(lambda card: card.weight.number == self.repeats.weight.cards[2], self.init_cards))
         self.cards.add_cards(pair)
         self.cards.get_other_cards(self.init_cards)
 
@@ -593,3 +759,75 @@ class Combo:
         top_five_cards = self.init_cards[-5:]
         top_five_cards.reverse()
         self.cards.add_cards(top_five_cards)
+
+    def _find_with_lookup_table(self):
+        self.key = self.lookup_table.evaluate(core_cards_indexes(self.init_cards))
+        self.type, kickers = unpack_key(self.key)
+        # lookup table weights are from 2 (Two) to 14 (Ace) unlike card weight numbers
+        getattr(self, f'_pick_{self.short_name}')([weight - 1 for weight in kickers])
+
+    def _pick_hc(self, kickers):
+        self._get_no_weigh_repeats()
+
+    def _pick_op(self, kickers):
+        self._pick_repeats(kickers[:1])
+
+    def _pick_tp(self, kickers):
+        self._pick_repeats(kickers[:2])
+
+    def _pick_tk(self, kickers):
+        self._pick_repeats(kickers[:1])
+
+    def _pick_st(self, kickers):
+        self._pick_sequence(self.init_cards, kickers[0])
+
+    def _pick_fl(self, kickers):
+        cards = self._get_flush_cards()[-5:]
+        cards.reverse()
+        self.cards.add_cards(cards)
+
+    def _pick_fh(self, kickers):
+        the_set = [card for card in self.init_cards if card.weight.number == kickers[0]]
+        pair = [card for card in self.init_cards if card.weight.number == kickers[1]][:2]
+        self.cards.add_cards(the_set + pair)
+
+    def _pick_fk(self, kickers):
+        self._pick_repeats(kickers[:1])
+
+    def _pick_sf(self, kickers):
+        self._pick_sequence(self._get_flush_cards(), kickers[0])
+
+    def _pick_repeats(self, weights):
+        for weight in weights:
+            self.cards.add_cards([card for card in self.init_cards if card.weight.number == weight])
+        self.cards.get_other_cards(self.init_cards)
+
+    def _pick_sequence(self, cards, top_weight):
+        by_weight = {card.weight.number: card for card in cards}
+        order_cards = [by_weight[weight] for weight in range(top_weight, max(top_weight - 5, 0), -1)]
+        if top_weight == 4:
+            ace = next(card for card in cards if card.weight.number == ACE_NUMBER)
+            order_cards.append(LOW_ACES[ace.suit.symbol, ace.in_hand])
+        self.cards.add_cards(order_cards)
+
+    def _get_flush_cards(self):
+        suits = [card.suit.number for card in self.init_cards]
+        flush_suit = max(range(4), key=suits.count)
+        return [card for card in self.init_cards if card.suit.number == flush_suit]
+
+
+RATIO_CODES = {Combo.Ratio.MISS: MISS, Combo.Ratio.HALF: HALF, Combo.Ratio.REAL: REAL}
+RATIO_VALUES = {code: value for value, code in RATIO_CODES.items()}
+
+
+def _get_record_card(code):
+    sign = card_sign((code & ~HAND_CARD_FLAG) - 1)
+    if not code & HAND_CARD_FLAG:
+        return INTERNED_CARDS[sign]
+    card = Card(sign)
+    card.in_hand = True
+    return card
+
+
+def _combo_from_record(record):
+    return Combo.from_record(record)
@@ -0,0 +1,153 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+from thpoker.hardcore import bhcombo
+from thpoker.lookup import cards_indexes, require_numpy
+
+
+DECK_SIZE = 52
+HAND_SIZE = 2
+BOARD_SIZE = 5
+IN_HAND = 1000
+
+
+def hcards_array(indexes, in_hand=False):
+    """HardCore cards (int16 array) of cards indexes array (4 * rank + suit)."""
+
+    np = require_numpy('Deals')
+    indexes = np.asarray(indexes)
+    return ((indexes >> 2) * 10 + (indexes & 3) + 21 + IN_HAND * int(in_hand)).astype(np.int16)
+
+
+def indexes_array(hcards):
+    """Cards indexes (int8 array) of HardCore cards array (hand cards marks are dropped)."""
+
+    np = require_numpy('Deals')
+    plain = np.asarray(hcards) % IN_HAND
+    return ((plain // 10 - 2) * 4 + plain % 10 - 1).astype(np.int8)
+
+
+class Deals:
+    """
+    Several deals as HardCore cards arrays:
+    hands (N x players x 2, hand cards are marked as in hand) and board (N x board size).
+    """
+
+    def __init__(self, hands, board):
+        self.hands = hands
+        self.board = board
+
+    def __repr__(self):
+        return f"Deals(count={len(self)}, players={self.players})"
+
+    def __len__(self):
+        return len(self.board)
+
+    @property
+    def players(self):
+        return self.hands.shape[1]
+
+    def player_cards(self, player):
+        """N x (2 + board size) HardCore cards of player hand and board."""
+
+        np = require_numpy('Deals')
+        return np.hstack([self.hands[:, player], self.board])
+
+    def evaluate(self, ratio=False):
+        """
+        Combos keys of every player (N x players array) evaluated by one batch
+        or keys and ratios arrays if ratio is True.
+        """
+
+        np = require_numpy('Deals')
+        count, players = len(self), self.players
+        cards = np.concatenate([self.hands, np.repeat(self.board[:, None, :], players, axis=1)], axis=2)
+        result = bhcombo(cards.reshape(count * players, -1), ratio)
+        if ratio:
+            return tuple(values.reshape(count, players) for values in result)
+        return result.reshape(count, players)
+
+    def winners(self, keys=None):
+        """N x players bool array of winners of every deal (several winners share pot)."""
+
+        keys = self.evaluate() if keys is None else keys
+        return keys == keys.max(axis=1, keepdims=True)
+
+
+class Dealer:
+    """
+    Deals generator. Every deal is independent uniform random deal of players hands and board from deck without dead cards.
+    Random stream is got by seed and stream number, so every worker gets its own reproducible stream by its number.
+
+    Dealer(players=6, seed=2018, stream=worker_number).deal(100000)
+    """
+
+    def __init__(self, players=2, board_size=BOARD_SIZE, dead=None, seed=None, stream=None):
+        np = require_numpy('Deals')
+        dead = set(cards_indexes(dead) if dead is None or isinstance(dead, str) else dead)
+        self.players = players
+        self.board_size = board_size
+        self.deck = np.array([card for card in range(DECK_SIZE) if card not in dead], dtype=np.intp)
+        if players * HAND_SIZE + board_size > len(self.deck):
+            raise ValueError(f"Deck of {len(self.deck)} cards is too small for {players} players and board.")
+        self.seed = seed
+        self.stream = stream
+        sequence = np.random.SeedSequence(seed, spawn_key=() if stream is None else (stream,))
+        self.rng = np.random.default_rng(sequence)
+
+    def __repr__(self):
+        return f"Dealer(players={self.players}, board_size={self.board_size}, seed={self.seed}, stream={self.stream})"
+
+    def spawn(self, count):
+        """Dealers of count independent streams (like one dealer for every worker)."""
+
+        if self.seed is None:
+            raise ValueError("Dealer without seed could not spawn reproducible streams.")
+        return [
+            Dealer(self.players, self.board_size, set(range(DECK_SIZE)) - set(self.deck.tolist()), self.seed, stream)
+            for stream in range(count)
+        ]
+
+    def deal_indexes(self, count):
+        """N x (players * 2 + board size) array of dealt cards indexes (hands cards first)."""
+
+        np = require_numpy('Deals')
+        size = self.players * HAND_SIZE + self.board_size
+        positions = np.empty((count, size), dtype=np.int8)
+        # every card is drawn from the whole deck and drawn again if it is already dealt,
+        # so it is uniform over cards left (memory is count x dealt cards, not count x deck)
+        for i in range(size):
+            column = self.rng.integers(0, len(self.deck), count, dtype=np.int8)
+            rows = np.flatnonzero((positions[:, :i] == column[:, None]).any(axis=1))
+            while len(rows):
+                column[rows] = self.rng.integers(0, len(self.deck), len(rows), dtype=np.int8)
+                # only rows with already dealt card are checked again
+                rows = rows[(positions[rows, :i] == column[rows, None]).any(axis=1)]
+            positions[:, i] = column
+        return self.deck[positions]
+
+    def deal(self, count):
+        """Deals of count independent deals."""
+
+        indexes = self.deal_indexes(count)
+        hands = indexes[:, :self.players * HAND_SIZE].reshape(count, self.players, HAND_SIZE)
+        return Deals(hcards_array(hands, in_hand=True), hcards_array(indexes[:, self.players * HAND_SIZE:]))
+
+    def batches(self, count, batch_size=100000):
+        """Deals by batches (count deals in total), so memory does not depend on count."""
+
+        for start in range(0, count, batch_size):
+            yield self.deal(min(batch_size, count - start))
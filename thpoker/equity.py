@@ -0,0 +1,327 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from thpoker.backends import get_backend
+from thpoker.isomorphism import SUITS_PERMUTATIONS, canonical_groups, permute_suits
+from thpoker.lookup import SUITS_COUNT, card_sign, cards_indexes, require_numpy
+from thpoker.ranges import HandRange, class_hands
+from thpoker.workers import WorkerPool
+
+
+DECK_SIZE = 52
+TABLE_SIZE = 5
+RANGE_CHUNK_CELLS = 1 << 22
+
+
+class EquityResult:
+    """Win, tie and loss counts of the first hand."""
+
+    def __init__(self, win=0, tie=0, loss=0):
+        self.win = win
+        self.tie = tie
+        self.loss = loss
+
+    def __repr__(self):
+        return f"EquityResult(win={self.win}, tie={self.tie}, loss={self.loss})"
+
+    def __eq__(self, other):
+        return (self.win, self.tie, self.loss) == (other.win, other.tie, other.loss)
+
+    def __add__(self, other):
+        return EquityResult(self.win + other.win, self.tie + other.tie, self.loss + other.loss)
+
+    @property
+    def total(self):
+        return self.win + self.tie + self.loss
+
+    @property
+    def equity(self):
+        return (self.win + self.tie / 2) / self.total if self.total else 0.0
+
+    def reverse(self):
+        """Result of the second hand."""
+        return EquityResult(self.loss, self.tie, self.win)
+
+
+class MonteCarloResult:
+    """Sampled equities of several hands with their standard errors."""
+
+    def __init__(self, equities, errors, samples, seconds):
+        self.equities = equities
+        self.errors = errors
+        self.samples = samples
+        self.seconds = seconds
+
+    def __repr__(self):
+        equities = ', '.join(f'{e:.4f}' for e in self.equities)
+        return f"MonteCarloResult(equities=[{equities}], samples={self.samples})"
+
+    @property
+    def throughput(self):
+        """Sampled tables per second."""
+        return self.samples / self.seconds if self.seconds else float('inf')
+
+
+def _check_cards(*groups):
+    """Every card of cards indexes groups could be used once."""
+
+    used = set()
+    for card in (card for group in groups for card in group):
+        if card in used:
+            raise ValueError(f"Card {card_sign(card)} is used more than once.")
+        used.add(card)
+
+
+def _get_situations(hands1, hands2, table):
+    """Suit isomorphic situations of hands pairs with their weights."""
+
+    situations = {}
+    used = set(table)
+    for hand1 in hands1:
+        for hand2 in hands2:
+            if len(used.union(hand1, hand2)) != len(table) + 4:
+                continue
+            situation = canonical_groups((hand1, hand2, table))[0]
+            situations[situation] = situations.get(situation, 0) + 1
+    return situations
+
+
+def _combinations(cards, count):
+    """All combinations of count cards from cards as rows of array."""
+
+    cards = np.asarray(cards, dtype=np.intp)
+    if count == 0:
+        return np.zeros((1, 0), dtype=np.intp)
+    positions = np.arange(len(cards))[:, None]
+    for _ in range(count - 1):
+        last = positions[:, -1]
+        counts = len(cards) - 1 - last
+        starts = np.cumsum(counts) - counts
+        positions = np.repeat(positions, counts, axis=0)
+        added = np.arange(counts.sum()) - np.repeat(starts, counts) + np.repeat(last + 1, counts)
+        positions = np.hstack([positions, added[:, None]])
+    return cards[positions]
+
+
+def _count_tables(task):
+    """Weighted win, tie and loss counts of one shard of tables."""
+
+    hand1, hand2, table, weight, first = task
+    dead = set(hand1 + hand2 + table)
+    deck = [card for card in range(DECK_SIZE) if card not in dead]
+    count = TABLE_SIZE - len(table)
+    if count:
+        tables = _combinations(deck[first + 1:], count - 1)
+        tables = np.hstack([np.full((len(tables), 1), deck[first]), tables])
+    else:
+        tables = np.zeros((1, 0), dtype=np.intp)
+
+    # Deal only one table of each suit isomorphic tables group,
+    # suits permutations which keep hands and table are used to find groups.
+    fixed = (set(hand1), set(hand2), set(table))
+    permutations = [
+        p for p in SUITS_PERMUTATIONS
+        if (set(permute_suits(hand1, p)), set(permute_suits(hand2, p)), set(permute_suits(table, p))) == fixed
+    ]
+    if count and len(permutations) > 1:
+        codes = []
+        for p in permutations:
+            permuted = np.sort(tables - tables % SUITS_COUNT + np.asarray(p)[tables % SUITS_COUNT], axis=1)
+            codes.append((permuted * (DECK_SIZE ** np.arange(count))).sum(axis=1))
+        codes = np.array(codes)
+        canonical = codes[0] == codes.min(axis=0)
+        rates = len(permutations) // (codes == codes[0]).sum(axis=0)
+        tables, rates = tables[canonical], rates[canonical]
+    else:
+        rates = np.ones(len(tables), dtype=np.intp)
+
+    backend = get_backend()
+    known = np.asarray(table, dtype=np.intp)[None, :].repeat(len(tables), axis=0)
+    keys1 = backend.evaluate_batch(np.hstack([np.tile(hand1, (len(tables), 1)), known, tables]))
+    keys2 = backend.evaluate_batch(np.hstack([np.tile(hand2, (len(tables), 1)), known, tables]))
+    return EquityResult(
+        int(rates[keys1 > keys2].sum()) * weight,
+        int(rates[keys1 == keys2].sum()) * weight,
+        int(rates[keys1 < keys2].sum()) * weight,
+    )
+
+
+def _get_tasks(situations):
+    for (hand1, hand2, table), weight in situations.items():
+        # tables are split into shards by the first dealt card
+        shards = DECK_SIZE - len(hand1 + hand2 + table) - (TABLE_SIZE - len(table)) + 1
+        for first in range(shards if len(table) < TABLE_SIZE else 1):
+            yield hand1, hand2, table, weight, first
+
+
+def _compute(hands1, hands2, table, processes):
+    require_numpy('Equity')
+    situations = _get_situations(hands1, hands2, tuple(table))
+    tasks = _get_tasks(situations)
+    result = EquityResult()
+    processes = processes or os.cpu_count()
+    if processes == 1:
+        for shard_result in map(_count_tables, tasks):
+            result += shard_result
+        return result
+    with WorkerPool(processes) as pool:
+        for shard_result in pool.imap_unordered(_count_tables, tasks):
+            result += shard_result
+    return result
+
+
+def hand_vs_hand(hand1, hand2, table=None, processes=None):
+    """
+    Exact equity of two hands (cards strings like 'As/Kd').
+    Table is cards string of already known table cards.
+    """
+
+    hand1, hand2, table = cards_indexes(hand1), cards_indexes(hand2), cards_indexes(table)
+    _check_cards(hand1, hand2, table)
+    return _compute([tuple(hand1)], [tuple(hand2)], table, processes)
+
+
+def class_vs_class(hand_type1, hand_type2, table=None, processes=None):
+    """
+    Exact equity of two hand types (like 'AA', 'AKs', 'T9o').
+    Every possible pair of hands of the hand types is counted.
+    """
+
+    table = cards_indexes(table)
+    _check_cards(table)
+    return _compute(class_hands(hand_type1), class_hands(hand_type2), table, processes)
+
+
+def _cards_masks(cards):
+    """Bit masks (uint64) of N x k array of cards."""
+
+    masks = np.zeros(len(cards), dtype=np.uint64)
+    for column in cards.T:
+        masks |= np.left_shift(np.uint64(1), column.astype(np.uint64))
+    return masks
+
+
+def _get_range_keys(backend, hands, boards, valid):
+    """Combos keys of every hand with every board (0 for hands which have board cards)."""
+
+    keys = np.zeros(valid.shape, dtype=np.uint32)
+    board_rows, hand_rows = np.nonzero(valid)
+    if len(board_rows):
+        keys[board_rows, hand_rows] = backend.evaluate_batch(np.hstack([hands[hand_rows], boards[board_rows]]))
+    return keys
+
+
+def range_vs_range(range1, range2, table=None, dead=None, samples=None, seed=None):
+    """
+    Equity of two hand ranges (HandRange or notation like 'TT+, AQs+').
+    Every possible table is dealt (or samples count of random tables).
+    Every hand of both ranges is evaluated once per table,
+    then keys of every pair of hands without common cards are compared.
+    Result counts are (first range hand, second range hand, table) situations.
+    """
+
+    require_numpy('Equity')
+    table = cards_indexes(table)
+    _check_cards(table, cards_indexes(dead))
+    used = set(table + cards_indexes(dead))
+    hands1, hands2 = (
+        (r if isinstance(r, HandRange) else HandRange(r)).remove(used).to_array() for r in (range1, range2))
+    result = EquityResult()
+    if not len(hands1) or not len(hands2):
+        return result
+
+    deck = np.array([card for card in range(DECK_SIZE) if card not in used], dtype=np.intp)
+    count = TABLE_SIZE - len(table)
+    if samples is None:
+        dealt = _combinations(deck, count)
+    elif count:
+        rng = np.random.default_rng(seed)
+        dealt = deck[rng.random((samples, len(deck))).argpartition(count, axis=1)[:, :count]]
+    else:
+        dealt = np.zeros((1, 0), dtype=np.intp)
+    boards = np.hstack([np.tile(np.asarray(table, dtype=np.intp), (len(dealt), 1)), dealt])
+
+    masks1, masks2 = _cards_masks(hands1), _cards_masks(hands2)
+    compatible = (masks1[:, None] & masks2[None, :]) == 0
+    backend = get_backend()
+    # tables are taken by chunks to keep hands pairs arrays small
+    chunk = max(1, RANGE_CHUNK_CELLS // compatible.size)
+    for start in range(0, len(boards), chunk):
+        part = boards[start:start + chunk]
+        board_masks = _cards_masks(part)[:, None]
+        valid1 = (masks1[None, :] & board_masks) == 0
+        valid2 = (masks2[None, :] & board_masks) == 0
+        keys1 = _get_range_keys(backend, hands1, part, valid1)[:, :, None]
+        keys2 = _get_range_keys(backend, hands2, part, valid2)[:, None, :]
+        valid = compatible[None, :, :] & valid1[:, :, None] & valid2[:, None, :]
+        result += EquityResult(
+            int(np.count_nonzero(valid & (keys1 > keys2))),
+            int(np.count_nonzero(valid & (keys1 == keys2))),
+            int(np.count_nonzero(valid & (keys1 < keys2))),
+        )
+    return result
+
+
+def monte_carlo(hands, table=None, dead=None, target_error=0.001,
+                batch_size=100000, max_samples=10000000, seed=None):
+    """
+    Sampled equity of several hands (cards strings like 'As/Kd').
+    Table is cards string of already known table cards, dead is cards string of cards out of deck.
+    Tables are sampled by batches until standard error of every hand equity
+    is below target error or max samples are drawn.
+    """
+
+    require_numpy('Equity')
+    started = time.perf_counter()
+    hands = [cards_indexes(hand) for hand in hands]
+    table = cards_indexes(table)
+    _check_cards(table, cards_indexes(dead), *hands)
+    used = set(table + cards_indexes(dead)).union(*hands)
+    deck = np.array([card for card in range(DECK_SIZE) if card not in used], dtype=np.intp)
+    count = TABLE_SIZE - len(table)
+    rng = np.random.default_rng(seed)
+    backend = get_backend()
+    sums = np.zeros(len(hands))
+    squares = np.zeros(len(hands))
+    samples = 0
+    while samples < max_samples:
+        size = min(batch_size, max_samples - samples)
+        # random count cards without replacement for every table
+        dealt = deck[rng.random((size, len(deck))).argpartition(count, axis=1)[:, :count]] if count else (
+            np.zeros((size, 0), dtype=np.intp))
+        known = np.asarray(table, dtype=np.intp)[None, :].repeat(size, axis=0)
+        keys = np.array([
+            backend.evaluate_batch(np.hstack([np.tile(hand, (size, 1)), known, dealt]))
+            for hand in hands
+        ])
+        winners = keys == keys.max(axis=0)
+        shares = winners / winners.sum(axis=0)
+        sums += shares.sum(axis=1)
+        squares += (shares ** 2).sum(axis=1)
+        samples += size
+        means = sums / samples
+        errors = np.sqrt(np.maximum(squares / samples - means ** 2, 0) / samples)
+        if errors.max() < target_error:
+            break
+    return MonteCarloResult(
+        [float(e) for e in means], [float(e) for e in errors], samples, time.perf_counter() - started)
@@ -31,3 +31,23 @@ class ComboArgumentsError(Exception):
                     Combo(table=Table('As/Ks/Qs'), hand=Hand('Js/Ts'), ratio_check_needed=True).
             """
         )
+
+
+class NumpyRequiredError(ImportError):
+    def __init__(self, feature):
+        super().__init__(f"{feature} needs NumPy. Install it with 'pip install THPoker[numpy]'.")
+
+
+class UnknownBackendError(Exception):
+    def __init__(self, name, names):
+        super().__init__(f"Unknown backend '{name}'. Backends are {', '.join(names)}.")
+
+
+class BackendUnavailableError(ImportError):
+    def __init__(self, name, reason):
+        super().__init__(f"Backend '{name}' is not available ({reason}).")
+
+
+class RangeNotationError(ValueError):
+    def __init__(self, notation):
+        super().__init__(f"Wrong hand range notation '{notation}'.")
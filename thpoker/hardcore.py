@@ -13,7 +13,13 @@
 # limitations under the License.
 
 
-from cthpoker import findCombo, findRatioCombo
+try:
+    from cthpoker import findCombo, findRatioCombo
+except ImportError:
+    # pure Python functions with the same results
+    from thpoker.pyhardcore import find_combo as findCombo, find_ratio_combo as findRatioCombo
+
+from thpoker.lookup import get_table, pack_key, ratio_batch, require_numpy
 
 
 all_weights = '23456789TJQKA'
@@ -45,3 +51,24 @@ def chcombo(cards):
 
 def rhcombo(table, hand):
     return findRatioCombo(table + hand)
+
+
+def hkey(combo):
+    """Combo strength packed into one integer (combo type in high bits and kickers below)."""
+    return pack_key(combo[0], combo[1:])
+
+
+def bhcombo(cards, ratio=False):
+    """
+    Combos keys of N x k (k is from 1 to 7) array of cards.
+    Returns keys array or keys and ratios arrays (if ratio is True). Needs NumPy.
+    """
+
+    np = require_numpy('Batch evaluation')
+    cards = np.asarray(cards)
+    plain = cards % 1000
+    indexes = (plain // 10 - 2) * 4 + plain % 10 - 1
+    keys = get_table().evaluate_batch(indexes)
+    if ratio:
+        return keys, ratio_batch(keys, indexes, cards >= 1000)
+    return keys
@@ -0,0 +1,103 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import itertools
+
+from thpoker.lookup import SUITS_COUNT, cards_indexes
+
+
+SUITS_PERMUTATIONS = list(itertools.permutations(range(SUITS_COUNT)))
+
+
+def permute_suits(cards, permutation):
+    """Cards indexes with suits replaced by permutation (suit is replaced by permutation[suit])."""
+    return tuple(card - card % SUITS_COUNT + permutation[card % SUITS_COUNT] for card in cards)
+
+
+def _get_indexes(cards):
+    if cards is None or isinstance(cards, str):
+        return cards_indexes(cards)
+    return list(cards)
+
+
+def canonical_groups(groups):
+    """
+    Canonical suit isomorphic form of cards groups and count of situations of the same form.
+    Cards order inside a group does not matter, groups order does.
+    """
+
+    variants = {
+        tuple(tuple(sorted(permute_suits(group, permutation))) for group in groups)
+        for permutation in SUITS_PERMUTATIONS
+    }
+    return min(variants), len(variants)
+
+
+def get_groups(hands, board=None, streets=False):
+    """Cards groups of situation (hands and board or flop, turn and river if streets is True)."""
+
+    groups = [_get_indexes(hand) for hand in hands]
+    board = _get_indexes(board)
+    if streets:
+        groups.extend(street for street in (board[:3], board[3:4], board[4:5]) if street)
+    elif board:
+        groups.append(board)
+    return groups
+
+
+def canonical(hands, board=None, streets=False):
+    """
+    Canonical key of (hands, board) situation and its multiplicity
+    (count of suit isomorphic situations with the same key, up to 24).
+    Hands and board are cards strings or cards indexes.
+    If streets is True flop, turn and river are different groups, otherwise board is one group.
+
+    canonical(['As/Kd']) or canonical(['As/Ad', 'Kh/Qh'], '2c/7d/9h')
+    """
+
+    return canonical_groups(get_groups(hands, board, streets))
+
+
+def collapse(situations, streets=False):
+    """Canonical keys of (hands, board) situations with total weights."""
+
+    weights = {}
+    for hands, board in situations:
+        key = canonical_groups(get_groups(hands, board, streets))[0]
+        weights[key] = weights.get(key, 0) + 1
+    return weights
+
+
+def canonical_deals(hands, board=None, count=1):
+    """
+    Canonical deals of count cards to situation with their weights.
+    Deals which differ by suits permutation keeping hands and board are collapsed.
+    Keys are tuples of dealt cards.
+    """
+
+    groups = get_groups(hands, board)
+    used = set().union(*groups)
+    fixed = [set(group) for group in groups]
+    # only suits permutations which keep hands and board could collapse deals
+    permutations = [
+        p for p in SUITS_PERMUTATIONS
+        if [set(permute_suits(group, p)) for group in groups] == fixed
+    ]
+    deals = {}
+    for dealt in itertools.combinations([card for card in range(52) if card not in used], count):
+        key = min(tuple(sorted(permute_suits(dealt, p))) for p in permutations)
+        deals[key] = deals.get(key, 0) + 1
+    return deals
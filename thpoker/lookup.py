@@ -0,0 +1,590 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import sys
+from array import array
+
+from thpoker.exceptions import NumpyRequiredError
+
+
+# Card index is 4 * rank + suit
+# where rank is 0 (Two) ... 12 (Ace) and suit is 0 (clubs) ... 3 (spades).
+RANKS_COUNT = 13
+SUITS_COUNT = 4
+RANK_SYMBOLS = '23456789TJQKA'
+SUIT_SYMBOLS = 'cdhs'
+MAX_CARDS = 7
+MAX_REPEATS = 4
+
+HIGH_CARD = 1
+ONE_PAIR = 2
+TWO_PAIRS = 3
+THREE_OF_A_KIND = 4
+STRAIGHT = 5
+FLUSH = 6
+FULL_HOUSE = 7
+FOUR_OF_A_KIND = 8
+STRAIGHT_FLUSH = 9
+
+# Ratio shows whether combo base cards inlude hand cards (the same as CTHPoker ratio).
+REAL = 2
+HALF = 1
+MISS = 0
+
+# Key is combo type in high bits and up to 5 kicker weights (2 ... 14) below.
+KICKER_BITS = 4
+KICKER_SLOTS = 5
+TYPE_SHIFT = KICKER_BITS * KICKER_SLOTS
+KICKER_MASK = (1 << KICKER_BITS) - 1
+
+
+def pack_key(combo_type, kickers):
+    """Pack combo type and kicker weights into one integer."""
+
+    key = combo_type << TYPE_SHIFT
+    shift = TYPE_SHIFT
+    for weight in kickers[:KICKER_SLOTS]:
+        shift -= KICKER_BITS
+        key |= weight << shift
+    return key
+
+
+def unpack_key(key):
+    """Unpack integer key into combo type and kicker weights."""
+
+    kickers = []
+    shift = TYPE_SHIFT
+    while shift:
+        shift -= KICKER_BITS
+        weight = (key >> shift) & KICKER_MASK
+        if not weight:
+            break
+        kickers.append(weight)
+    return key >> TYPE_SHIFT, kickers
+
+
+CARDS_INDEXES = {
+    w + s: rank * SUITS_COUNT + suit for rank, w in enumerate(RANK_SYMBOLS) for suit, s in enumerate(SUIT_SYMBOLS)
+}
+
+
+def card_index(sign):
+    """Card index by card sign (like 'As')."""
+    try:
+        return CARDS_INDEXES[sign]
+    except KeyError:
+        raise ValueError(f"Wrong card sign '{sign}'.") from None
+
+
+def cards_indexes(cards_string):
+    """Cards indexes by cards string (like 'As/Kd/Tc')."""
+    return [card_index(sign) for sign in cards_string.split('/')] if cards_string else []
+
+
+def core_card_index(card):
+    """Card index of Core card (low Ace is the same as Ace)."""
+    # Core weight numbers are 1 (Two) ... 13 (Ace) and 0 (low Ace)
+    return (card.weight.number - 1) % RANKS_COUNT * SUITS_COUNT + card.suit.number
+
+
+def core_cards_indexes(cards):
+    """Cards indexes of Core cards (Cards, Table, Hand or iterable of Card)."""
+    # the same as core_card_index, it is inlined for Combo lookup table search
+    return [
+        (card.weight.number - 1) % RANKS_COUNT * SUITS_COUNT + card.suit.number
+        for card in getattr(cards, 'items', cards)
+    ]
+
+
+def card_sign(index):
+    return RANK_SYMBOLS[index >> 2] + SUIT_SYMBOLS[index & 3]
+
+
+def require_numpy(feature):
+    """NumPy module (it is imported on first use to keep package import fast)."""
+
+    try:
+        import numpy
+    except ImportError:
+        raise NumpyRequiredError(feature) from None
+    return numpy
+
+
+def _get_repeats_count():
+    """
+    Count of ranks repeats variants.
+    repeats_count[n][k] is the number of ways to place k cards over n ranks
+    with not more than 4 cards per rank.
+    """
+
+    repeats_count = [[0] * (MAX_CARDS + 1) for _ in range(RANKS_COUNT + 1)]
+    repeats_count[0][0] = 1
+    for n in range(1, RANKS_COUNT + 1):
+        for k in range(MAX_CARDS + 1):
+            repeats_count[n][k] = sum(
+                repeats_count[n - 1][k - c] for c in range(min(k, MAX_REPEATS) + 1))
+    return repeats_count
+
+
+def _get_hash_parts(repeats_count):
+    """
+    Perfect hash parts of ranks repeats.
+    Index of rank i repeated q times while k cards are left is (i * 5 + q) * 8 + k.
+    """
+
+    parts = [0] * (RANKS_COUNT * (MAX_REPEATS + 1) * (MAX_CARDS + 1))
+    for i in range(RANKS_COUNT):
+        left_ranks = RANKS_COUNT - 1 - i
+        for q in range(MAX_REPEATS + 1):
+            for k in range(q, MAX_CARDS + 1):
+                parts[(i * (MAX_REPEATS + 1) + q) * (MAX_CARDS + 1) + k] = sum(
+                    repeats_count[left_ranks][k - c] for c in range(q))
+    return parts
+
+
+REPEATS_COUNT = _get_repeats_count()
+HASH_PARTS = _get_hash_parts(REPEATS_COUNT)
+HASH_OFFSETS = [sum(REPEATS_COUNT[RANKS_COUNT][:k]) for k in range(MAX_CARDS + 2)]
+RANKS_TABLE_SIZE = HASH_OFFSETS[MAX_CARDS + 1]
+FLUSHES_TABLE_SIZE = 1 << RANKS_COUNT
+
+
+def ranks_hash(counts, cards_count):
+    """Perfect hash of ranks repeats (list of 13 counts)."""
+
+    index = HASH_OFFSETS[cards_count]
+    left = cards_count
+    for i, count in enumerate(counts):
+        if count:
+            index += HASH_PARTS[(i * (MAX_REPEATS + 1) + count) * (MAX_CARDS + 1) + left]
+            left -= count
+            if not left:
+                break
+    return index
+
+
+def _get_straight_weight(mask):
+    """Weight of the highest straight card or 0 if there is no straight."""
+
+    # Ace could be the lowest straight card too.
+    mask = (mask << 1) | (mask >> (RANKS_COUNT - 1))
+    for top in range(RANKS_COUNT, 3, -1):
+        sequence = 0b11111 << (top - 4)
+        if mask & sequence == sequence:
+            return top + 1
+    return 0
+
+
+def _get_weights(mask):
+    return [i + 2 for i in range(RANKS_COUNT - 1, -1, -1) if mask & (1 << i)]
+
+
+def _get_flush_key(mask):
+    if (weight := _get_straight_weight(mask)):
+        return pack_key(STRAIGHT_FLUSH, [weight])
+    return pack_key(FLUSH, _get_weights(mask)[:5])
+
+
+def _get_ranks_key(counts):
+    groups = {}
+    mask = 0
+    for i in range(RANKS_COUNT - 1, -1, -1):
+        if counts[i]:
+            groups.setdefault(counts[i], []).append(i + 2)
+            mask |= 1 << i
+    weights = _get_weights(mask)
+
+    def others(*used):
+        return [w for w in weights if w not in used]
+
+    if 4 in groups:
+        four = groups[4][0]
+        return pack_key(FOUR_OF_A_KIND, [four] + others(four)[:1])
+    if 3 in groups:
+        three = groups[3][0]
+        pairs = sorted(groups[3][1:] + groups.get(2, []), reverse=True)
+        if pairs:
+            return pack_key(FULL_HOUSE, [three, pairs[0]])
+    if (weight := _get_straight_weight(mask)):
+        return pack_key(STRAIGHT, [weight])
+    if 3 in groups:
+        three = groups[3][0]
+        return pack_key(THREE_OF_A_KIND, [three] + others(three)[:2])
+    if len(groups.get(2, [])) >= 2:
+        high, low = groups[2][:2]
+        return pack_key(TWO_PAIRS, [high, low] + others(high, low)[:1])
+    if 2 in groups:
+        pair = groups[2][0]
+        return pack_key(ONE_PAIR, [pair] + others(pair)[:3])
+    return pack_key(HIGH_CARD, weights[:5])
+
+
+def _iter_repeats(ranks_left, cards_left):
+    if not ranks_left:
+        if not cards_left:
+            yield []
+        return
+    for count in range(min(cards_left, MAX_REPEATS) + 1):
+        for tail in _iter_repeats(ranks_left - 1, cards_left - count):
+            yield [count] + tail
+
+
+def get_cache_dir():
+    """Directory to keep built tables in."""
+
+    if (path := os.environ.get('THPOKER_CACHE_DIR')):
+        return path
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'thpoker')
+
+
+class LookupTable:
+    """
+    Precomputed combo keys of every 1 ... 7 cards set.
+
+    Flush combos are looked up by 13 bit ranks mask of flush suit,
+    other combos are looked up by perfect hash of ranks repeats.
+    """
+
+    VERSION = 1
+    MAGIC = b'THPL'
+    FILE_NAME = f'lookup-v{VERSION}.bin'
+
+    def __init__(self, flushes, ranks, buffer=None):
+        self.flushes = flushes
+        self.ranks = ranks
+        # memory map which flushes and ranks are views of
+        self._buffer = buffer
+
+    @classmethod
+    def build(cls):
+        flushes = array('I', [0]) * FLUSHES_TABLE_SIZE
+        for mask in range(FLUSHES_TABLE_SIZE):
+            if bin(mask).count('1') >= 5:
+                flushes[mask] = _get_flush_key(mask)
+        ranks = array('I', [0]) * RANKS_TABLE_SIZE
+        for cards_count in range(1, MAX_CARDS + 1):
+            for counts in _iter_repeats(RANKS_COUNT, cards_count):
+                ranks[ranks_hash(counts, cards_count)] = _get_ranks_key(counts)
+        return cls(flushes, ranks)
+
+    @classmethod
+    def load(cls, path=None):
+        """Load table from disk cache. Table is built and cached if there is no valid cache."""
+
+        path = path or os.path.join(get_cache_dir(), cls.FILE_NAME)
+        try:
+            return cls.read(path)
+        except (OSError, ValueError, EOFError):
+            table = cls.build()
+            try:
+                table.save(path)
+            except OSError:
+                pass
+            return table
+
+    @classmethod
+    def read(cls, path):
+        with open(path, 'rb') as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"'{path}' is not a lookup table file.")
+            flushes = array('I')
+            flushes.fromfile(f, FLUSHES_TABLE_SIZE)
+            ranks = array('I')
+            ranks.fromfile(f, RANKS_TABLE_SIZE)
+            if f.read(1):
+                raise ValueError(f"'{path}' lookup table file has wrong size.")
+        if sys.byteorder != 'little':
+            flushes.byteswap()
+            ranks.byteswap()
+        return cls(flushes, ranks)
+
+    @classmethod
+    def map(cls, path=None):
+        """
+        Table memory mapped from disk cache file (file is built if there is no valid one).
+        Pages of mapped file are shared by all processes which map it, so workers do not copy table.
+        """
+
+        path = path or os.path.join(get_cache_dir(), cls.FILE_NAME)
+        # file values are little endian, other platforms copy them
+        if sys.byteorder != 'little':
+            return cls.load(path)
+        try:
+            return cls._map(path)
+        except (OSError, ValueError):
+            table = cls.load(path)
+        try:
+            return cls._map(path)
+        except (OSError, ValueError):
+            return table
+
+    @classmethod
+    def _map(cls, path):
+        import mmap
+
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        flushes_end = len(cls.MAGIC) + FLUSHES_TABLE_SIZE * 4
+        if buffer[:len(cls.MAGIC)] != cls.MAGIC or len(buffer) != flushes_end + RANKS_TABLE_SIZE * 4:
+            buffer.close()
+            raise ValueError(f"'{path}' is not a lookup table file.")
+        view = memoryview(buffer)
+        return cls(view[len(cls.MAGIC):flushes_end].cast('I'), view[flushes_end:].cast('I'), buffer)
+
+    @property
+    def mapped(self):
+        return self._buffer is not None
+
+    def close(self):
+        """Release memory map of mapped table (table could not be used after it)."""
+
+        if self._buffer is not None:
+            self.flushes.release()
+            self.ranks.release()
+            self._buffer.close()
+            self._buffer = None
+
+    def save(self, path):
+        # tempfile import is slow and it is needed only when table is built
+        import tempfile
+
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        flushes, ranks = array('I', self.flushes), array('I', self.ranks)
+        if sys.byteorder != 'little':
+            flushes.byteswap()
+            ranks.byteswap()
+        # Write to temporary file first so concurrent readers never see a partial table.
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.lookup-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.MAGIC)
+                flushes.tofile(f)
+                ranks.tofile(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def evaluate(self, cards):
+        """Combo key of cards indexes."""
+
+        counts = [0] * RANKS_COUNT
+        suits = [0] * SUITS_COUNT
+        for card in cards:
+            rank = card >> 2
+            counts[rank] += 1
+            suits[card & 3] |= 1 << rank
+        flushes = self.flushes
+        for mask in suits:
+            if (key := flushes[mask]):
+                return key
+        return self.ranks[ranks_hash(counts, len(cards))]
+
+    def evaluate_hands(self, table, hands):
+        """Combos keys of every hand with table (table cards are counted once)."""
+
+        table_counts = [0] * RANKS_COUNT
+        table_suits = [0] * SUITS_COUNT
+        for card in table:
+            table_counts[card >> 2] += 1
+            table_suits[card & 3] |= 1 << (card >> 2)
+        flushes, ranks = self.flushes, self.ranks
+        keys = []
+        for hand in hands:
+            counts = table_counts[:]
+            suits = table_suits[:]
+            for card in hand:
+                rank = card >> 2
+                counts[rank] += 1
+                suits[card & 3] |= 1 << rank
+            for mask in suits:
+                if (key := flushes[mask]):
+                    break
+            else:
+                key = ranks[ranks_hash(counts, len(table) + len(hand))]
+            keys.append(key)
+        return keys
+
+    def evaluate_batch(self, cards):
+        """Combo keys (uint32 array) of N x k array of cards indexes. Needs NumPy."""
+
+        np = require_numpy('Batch evaluation')
+        cards = np.asarray(cards)
+        rows_count, cards_count = cards.shape
+        ranks, suits = cards >> 2, cards & 3
+        rows = np.arange(rows_count)
+        counts = np.zeros((rows_count, RANKS_COUNT), dtype=np.intp)
+        masks = np.zeros((rows_count, SUITS_COUNT), dtype=np.intp)
+        # loops are over cards and ranks, never over rows
+        for i in range(cards_count):
+            counts[rows, ranks[:, i]] += 1
+            masks[rows, suits[:, i]] |= 1 << ranks[:, i]
+        flushes = np.frombuffer(self.flushes, dtype=np.uint32)[masks].max(axis=1)
+        parts = np.asarray(HASH_PARTS, dtype=np.intp)
+        index = np.full(rows_count, HASH_OFFSETS[cards_count], dtype=np.intp)
+        left = np.full(rows_count, cards_count, dtype=np.intp)
+        for i in range(RANKS_COUNT):
+            count = counts[:, i]
+            index += parts[(i * (MAX_REPEATS + 1) + count) * (MAX_CARDS + 1) + left]
+            left -= count
+        return np.where(flushes, flushes, np.frombuffer(self.ranks, dtype=np.uint32)[index])
+
+
+class StreetEvaluator:
+    """
+    Cards set evaluated street by street (hand and flop, then turn and river).
+    Ranks repeats and suits masks are changed in place by every card,
+    so a card is evaluated without recounting all cards.
+
+    For example
+        evaluator = StreetEvaluator(cards_indexes('As/Kd/Qs/Js/2c'))
+        turn_keys = [evaluator.add(card) for card in deck]
+    or
+        evaluator.push(turn)
+        river_keys = [evaluator.add(card) for card in deck]
+        evaluator.pop()
+    """
+
+    def __init__(self, cards=(), table=None):
+        self.table = table or get_table()
+        self.counts = [0] * RANKS_COUNT
+        self.suits = [0] * SUITS_COUNT
+        self.cards = []
+        for card in cards:
+            self.push(card)
+
+    def __len__(self):
+        return len(self.cards)
+
+    @property
+    def key(self):
+        """Combo key of current cards."""
+
+        flushes = self.table.flushes
+        for mask in self.suits:
+            if (key := flushes[mask]):
+                return key
+        return self.table.ranks[ranks_hash(self.counts, len(self.cards))]
+
+    def push(self, card):
+        """Add card to current cards."""
+
+        rank = card >> 2
+        self.counts[rank] += 1
+        self.suits[card & 3] |= 1 << rank
+        self.cards.append(card)
+
+    def pop(self):
+        """Remove the last added card from current cards."""
+
+        card = self.cards.pop()
+        rank = card >> 2
+        self.counts[rank] -= 1
+        self.suits[card & 3] &= ~(1 << rank)
+        return card
+
+    def add(self, card):
+        """Combo key of current cards and one more card (current cards are not changed)."""
+
+        self.push(card)
+        key = self.key
+        self.pop()
+        return key
+
+
+def ratio_batch(keys, cards, in_hand):
+    """
+    Ratio codes of N combo keys.
+    cards is N x k array of cards indexes, in_hand is N x k bool array of hand cards.
+    """
+
+    np = require_numpy('Batch ratio check')
+    keys, cards, in_hand = np.asarray(keys), np.asarray(cards), np.asarray(in_hand, dtype=bool)
+    types = (keys >> TYPE_SHIFT)[:, None]
+    kickers = [
+        ((keys >> (TYPE_SHIFT - KICKER_BITS * (i + 1))) & KICKER_MASK)[:, None]
+        for i in range(KICKER_SLOTS)
+    ]
+    weights, suits = (cards >> 2) + 2, cards & 3
+    top = kickers[0]
+    in_straight = ((weights <= top) & (weights > top - 5)) | ((top == 5) & (weights == 14))
+    in_kickers = np.logical_or.reduce([weights == kicker for kicker in kickers])
+    suits_counts = (suits[:, :, None] == np.arange(SUITS_COUNT)).sum(axis=1)
+    in_flush_suit = suits == suits_counts.argmax(axis=1)[:, None]
+    base = np.select(
+        [types == HIGH_CARD, types == STRAIGHT, types == FLUSH, types == STRAIGHT_FLUSH],
+        [in_kickers, in_straight, in_kickers & in_flush_suit, in_straight & in_flush_suit],
+        default=weights == top,
+    )
+    # two pairs and full house ratio is count of hand cards in both base cards groups
+    in_groups = (in_hand & ((weights == kickers[0]) | (weights == kickers[1]))).sum(axis=1)
+    grouped = ((types == TWO_PAIRS) | (types == FULL_HOUSE))[:, 0]
+    return np.where(
+        grouped,
+        np.minimum(in_groups, REAL),
+        np.where((base & in_hand).any(axis=1), REAL, MISS),
+    ).astype(np.int8)
+
+
+def ratio_code(key, cards, in_hand):
+    """Ratio code of combo key (the same as ratio_batch one row)."""
+
+    combo_type, kickers = unpack_key(key)
+    weights = [(card >> 2) + 2 for card in cards]
+    # two pairs and full house ratio is count of hand cards in both base cards groups
+    if combo_type in (TWO_PAIRS, FULL_HOUSE):
+        groups = kickers[:2]
+        return min(sum(1 for weight, hand in zip(weights, in_hand) if hand and weight in groups), REAL)
+    top = kickers[0]
+    flush_suit = None
+    if combo_type in (FLUSH, STRAIGHT_FLUSH):
+        suits_counts = [0] * SUITS_COUNT
+        for card in cards:
+            suits_counts[card & 3] += 1
+        flush_suit = suits_counts.index(max(suits_counts))
+    for card, weight, hand in zip(cards, weights, in_hand):
+        if not hand:
+            continue
+        if combo_type in (STRAIGHT, STRAIGHT_FLUSH):
+            base = top - 5 < weight <= top or (top == 5 and weight == 14)
+        elif combo_type in (HIGH_CARD, FLUSH):
+            base = weight in kickers
+        else:
+            base = weight == top
+        if base and (flush_suit is None or card & 3 == flush_suit):
+            return REAL
+    return MISS
+
+
+_table = None
+
+
+def get_table():
+    """Process wide lookup table (loaded on first call)."""
+
+    global _table
+    if _table is None:
+        _table = LookupTable.load()
+    return _table
+
+
+def set_table(table):
+    """Set process wide lookup table (like memory mapped one), None to load it again on next call."""
+
+    global _table
+    _table = table
@@ -0,0 +1,221 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import collections
+import csv
+import itertools
+import json
+import os
+import queue
+
+from thpoker.backends import create_backend, get_backend
+from thpoker.lookup import TYPE_SHIFT
+from thpoker.showdown import showdown
+from thpoker.workers import WorkerPool
+
+
+FORMATS = ('jsonl', 'csv')
+# combo types are 1 (high card) ... 9 (straight flush)
+TYPES_COUNT = 10
+
+
+def _get_format(source, format):
+    if format is None:
+        name = source if isinstance(source, str) else getattr(source, 'name', '')
+        format = 'csv' if str(name).endswith('.csv') else 'jsonl'
+    if format not in FORMATS:
+        raise ValueError(f"Unknown hand records format '{format}' (formats are {', '.join(FORMATS)}).")
+    return format
+
+
+def _parse_csv_row(row):
+    hands = [None if hand == '-' else hand for hand in row['hands'].split()]
+    contributions = row.get('contributions')
+    return {
+        'id': row.get('id'),
+        'board': row['board'],
+        'hands': hands,
+        'contributions': [int(c) for c in contributions.split()] if contributions else None,
+    }
+
+
+def read_hands(source, format=None):
+    """
+    Hand records of JSONL or CSV stream (or file path) one by one, so any file size is read in constant memory.
+    JSONL line is object with board (cards string), hands (cards strings, null for folded hand)
+    and optional contributions and id.
+    CSV has board and hands (separated by spaces, '-' for folded hand) columns
+    and optional contributions (separated by spaces) and id columns.
+    Record id is its number (from 0) if it has no id.
+    Format is got by file extension if it is not passed (jsonl by default).
+    """
+
+    format = _get_format(source, format)
+    if isinstance(source, str):
+        with open(source, newline='') as f:
+            yield from read_hands(f, format)
+        return
+    if format == 'csv':
+        records = map(_parse_csv_row, csv.DictReader(source))
+    else:
+        records = (json.loads(line) for line in source if line.strip())
+    for number, record in enumerate(records):
+        if record.get('id') is None:
+            record['id'] = number
+        yield record
+
+
+def evaluate_record(record, backend=None):
+    """Showdown result of hand record as dict of plain values."""
+
+    try:
+        result = showdown(record['board'], record['hands'], record.get('contributions'), backend)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Wrong hand record {record.get('id')!r}: {e!r}") from e
+    return {
+        'id': record.get('id'),
+        'keys': result.keys,
+        'types': [None if key is None else key >> TYPE_SHIFT for key in result.keys],
+        'ranking': result.ranking,
+        'winners': result.winners,
+        'payouts': result.payouts,
+    }
+
+
+def evaluate_chunk(records):
+    """Results of records chunk (task of worker process)."""
+
+    backend = get_backend()
+    return [evaluate_record(record, backend) for record in records]
+
+
+def _chunks(records, size):
+    records = iter(records)
+    while (chunk := list(itertools.islice(records, size))):
+        yield chunk
+
+
+def evaluate_stream(records, processes=None, chunk_size=1000, ordered=True, max_pending=None, backend=None):
+    """
+    Results of hand records stream evaluated by processes pool.
+    Records are sent to workers by chunks and no more than max_pending chunks (2 per process by default)
+    are sent but not yielded, so memory does not depend on stream size.
+    Results are yielded in records order if ordered is True, otherwise as soon as chunks are evaluated.
+    With one process (or one CPU) records are evaluated by current process.
+    """
+
+    chunks = _chunks(records, chunk_size)
+    processes = processes or os.cpu_count()
+    if processes == 1:
+        backend = create_backend(backend) if backend else get_backend()
+        for chunk in chunks:
+            yield from (evaluate_record(record, backend) for record in chunk)
+        return
+
+    with WorkerPool(processes, backend=backend) as pool:
+        max_pending = max_pending or 2 * processes
+        if ordered:
+            pending = collections.deque()
+            for chunk in chunks:
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().get()
+                pending.append(pool.apply_async(evaluate_chunk, (chunk,)))
+            while pending:
+                yield from pending.popleft().get()
+        else:
+            done = queue.Queue()
+            pending = 0
+            for chunk in chunks:
+                if pending >= max_pending:
+                    yield from _get_done(done)
+                    pending -= 1
+                pool.apply_async(evaluate_chunk, (chunk,), callback=done.put, error_callback=done.put)
+                pending += 1
+            for _ in range(pending):
+                yield from _get_done(done)
+
+
+def _get_done(done):
+    results = done.get()
+    if isinstance(results, BaseException):
+        raise results
+    return results
+
+
+class HandStats:
+    """Showdown hands, wins and ties counts by combo type (index is combo type)."""
+
+    def __init__(self):
+        self.records = 0
+        self.hands = [0] * TYPES_COUNT
+        self.wins = [0] * TYPES_COUNT
+        self.ties = [0] * TYPES_COUNT
+
+    def __repr__(self):
+        return f"HandStats(records={self.records})"
+
+    def add(self, result):
+        self.records += 1
+        for combo_type in result['types']:
+            if combo_type is not None:
+                self.hands[combo_type] += 1
+        counts = self.wins if len(result['winners']) == 1 else self.ties
+        for player in result['winners']:
+            counts[result['types'][player]] += 1
+
+    def to_dict(self):
+        return {
+            'records': self.records,
+            'types': {
+                combo_type: {'hands': self.hands[combo_type], 'wins': self.wins[combo_type], 'ties': self.ties[combo_type]}
+                for combo_type in range(1, TYPES_COUNT) if self.hands[combo_type]
+            },
+        }
+
+
+def run(source, output, format=None, processes=None, chunk_size=1000, ordered=True, backend=None):
+    """Write results of hand records file (or stream) to JSONL output stream, returns hands stats."""
+
+    stats = HandStats()
+    records = read_hands(source, format)
+    for result in evaluate_stream(records, processes, chunk_size, ordered, backend=backend):
+        stats.add(result)
+        output.write(json.dumps(result) + '\n')
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+    import io
+    import sys
+
+    parser = argparse.ArgumentParser(description='Evaluate showdowns of hand records file.')
+    parser.add_argument('source', help='JSONL or CSV file, - for standard input')
+    parser.add_argument('--format', choices=FORMATS, default=None)
+    parser.add_argument('--output', default=None, help='JSONL results file (standard output by default)')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--unordered', action='store_true')
+    parser.add_argument('--backend', default=None)
+    args = parser.parse_args()
+    source = io.TextIOWrapper(sys.stdin.buffer, newline='') if args.source == '-' else args.source
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        stats = run(source, output, args.format, args.processes, args.chunk_size, not args.unordered, args.backend)
+    finally:
+        if args.output:
+            output.close()
+    print(json.dumps(stats.to_dict()), file=sys.stderr)
@@ -0,0 +1,170 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import math
+import mmap
+import os
+import struct
+from array import array
+
+from thpoker.lookup import RANK_SYMBOLS
+
+
+# Hand types grid: row and column are weights from Ace to Two,
+# pairs are on diagonal, suited hands are above it and offsuit hands are below it.
+GRID_WEIGHTS = RANK_SYMBOLS[::-1]
+GRID_SIZE = len(GRID_WEIGHTS)
+TYPES_COUNT = GRID_SIZE * GRID_SIZE
+
+
+def _get_hand_types():
+    hand_types = []
+    for row, weight1 in enumerate(GRID_WEIGHTS):
+        for column, weight2 in enumerate(GRID_WEIGHTS):
+            if row == column:
+                hand_types.append(weight1 + weight2)
+            elif row < column:
+                hand_types.append(weight1 + weight2 + 's')
+            else:
+                hand_types.append(weight2 + weight1 + 'o')
+    return hand_types
+
+
+HAND_TYPES = _get_hand_types()
+HAND_TYPES_INDEXES = {hand_type: i for i, hand_type in enumerate(HAND_TYPES)}
+
+
+def hand_type_index(hand_type):
+    """Index of hand type (like 'AKs', 'T9o', 'QQ' or '89s')."""
+
+    weights = ''.join(sorted(hand_type[:2], key=GRID_WEIGHTS.index))
+    return HAND_TYPES_INDEXES[weights + hand_type[2:3]]
+
+
+def _exact_equity(hand_type1, hand_type2, processes):
+    # equity needs NumPy, so it is imported only to generate matrix
+    from thpoker.equity import class_vs_class
+
+    return class_vs_class(hand_type1, hand_type2, processes=processes).equity
+
+
+class PreflopMatrix:
+    """
+    Equity of every hand type against every hand type (169 x 169 float32 values).
+    File is memory mapped, so several processes share one copy of it.
+    """
+
+    VERSION = 1
+    MAGIC = b'THPF'
+    HEADER = struct.Struct('<4sI')
+    VALUE = struct.Struct('<f')
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = self.HEADER.unpack_from(self._mmap)
+        if magic != self.MAGIC or version != self.VERSION:
+            self._mmap.close()
+            raise ValueError(f"'{path}' is not a preflop matrix file.")
+        if len(self._mmap) != self.HEADER.size + TYPES_COUNT * TYPES_COUNT * self.VALUE.size:
+            self._mmap.close()
+            raise ValueError(f"'{path}' preflop matrix file has wrong size.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getitem__(self, hand_types):
+        return self.equity(*hand_types)
+
+    def close(self):
+        self._mmap.close()
+
+    def equity(self, hand_type1, hand_type2):
+        """Equity of the 1st hand type against the 2nd one (nan if it was not computed)."""
+
+        offset = hand_type_index(hand_type1) * TYPES_COUNT + hand_type_index(hand_type2)
+        return self.VALUE.unpack_from(self._mmap, self.HEADER.size + offset * self.VALUE.size)[0]
+
+    @classmethod
+    def read_values(cls, path):
+        with cls(path) as matrix:
+            values = array('f')
+            values.frombytes(matrix._mmap[cls.HEADER.size:])
+        if values.itemsize != cls.VALUE.size:
+            raise ValueError("Platform float is not 4 bytes.")
+        if struct.pack('=f', 1.0) != cls.VALUE.pack(1.0):
+            values.byteswap()
+        return values
+
+    @classmethod
+    def generate(cls, path, hand_types=None, processes=None, equity_function=None):
+        """
+        Compute equities of hand types pairs and write them to file.
+        File is written after every hand type row and already computed values of existing file are kept,
+        so interrupted generation could be continued.
+        Equity function takes two hand types and processes count (exact equity by default).
+        """
+
+        equity_function = equity_function or _exact_equity
+        try:
+            values = cls.read_values(path)
+        except (OSError, ValueError):
+            values = array('f', [math.nan]) * (TYPES_COUNT * TYPES_COUNT)
+        indexes = sorted(hand_type_index(t) for t in (hand_types or HAND_TYPES))
+        for i, index1 in enumerate(indexes):
+            # the same hand types are even
+            values[index1 * TYPES_COUNT + index1] = 0.5
+            for index2 in indexes[i + 1:]:
+                if not math.isnan(values[index1 * TYPES_COUNT + index2]):
+                    continue
+                equity = equity_function(HAND_TYPES[index1], HAND_TYPES[index2], processes)
+                values[index1 * TYPES_COUNT + index2] = equity
+                values[index2 * TYPES_COUNT + index1] = 1 - equity
+            cls._write(path, values)
+
+    @classmethod
+    def _write(cls, path, values):
+        import tempfile
+
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        values = array('f', values)
+        if values.itemsize != cls.VALUE.size:
+            raise ValueError("Platform float is not 4 bytes.")
+        if struct.pack('=f', 1.0) != cls.VALUE.pack(1.0):
+            values.byteswap()
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.preflop-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION))
+                values.tofile(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate preflop equity matrix file.')
+    parser.add_argument('path')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--hand-types', nargs='*', default=None)
+    args = parser.parse_args()
+    PreflopMatrix.generate(args.path, hand_types=args.hand_types, processes=args.processes)
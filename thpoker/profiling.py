@@ -0,0 +1,175 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import contextlib
+import functools
+import time
+
+from thpoker.core import Combo
+
+
+# Timed stages of combo search: stage name and its method.
+STAGES = {
+    'combo': (Combo, '__init__'),
+    'parse': (Combo, '_parse'),
+    'sort': (Combo, '_sort'),
+    'repeats': (Combo.Repeats, 'find'),
+    'sequence': (Combo.Sequence, 'find'),
+    'lookup': (Combo, '_find_with_lookup_table'),
+    'ratio': (Combo.Ratio, 'check'),
+}
+# Counted branches of combo search: counter name and its method.
+COMBO_BRANCHES = (
+    '_find_with_four_weigh_repeats', '_find_with_three_two_weigh_repeats', '_find_with_five_or_more_suit_repeats',
+    '_find_with_three_or_less_weigh_repeats',
+    '_get_flush_with_five_or_more_in_a_row', '_get_flush_with_four_or_less_in_a_row',
+    '_get_combo_with_five_or_more_in_a_row', '_get_combo_with_four_or_less_in_a_row',
+    '_get_three_weigh_repeats', '_get_triple_two_weigh_repeats', '_get_double_two_weigh_repeats',
+    '_get_two_weigh_repeats', '_get_no_weigh_repeats',
+    # lookup table search branches
+    '_pick_hc', '_pick_op', '_pick_tp', '_pick_tk', '_pick_st', '_pick_fl', '_pick_fh', '_pick_fk', '_pick_sf',
+)
+WEIGHT_REPEATS_BRANCHES = (
+    '_get_4', '_get_3', '_get_3_with_2_rep_and_2_with_0_rep', '_get_3_with_1_rep_and_2_with_2_rep',
+    '_get_3_with_1_rep_and_2_with_1_rep', '_get_3_with_1_rep_and_2_with_0_rep',
+    '_get_2', '_get_2_with_3_rep', '_get_2_with_2_rep', '_get_2_with_1_rep', '_get_1',
+)
+BRANCHES = {
+    **{name: (Combo, name) for name in COMBO_BRANCHES},
+    **{f'weight_repeats.{name}': (Combo.Repeats.WeightRepeats, name) for name in WEIGHT_REPEATS_BRANCHES},
+}
+
+_profiler = None
+_originals = {}
+
+
+class Profiler:
+    """
+    Combo search counters and cumulative timers.
+    Counters are 'branch.<method name>' (combo search branches) and 'type.<combo short name>'.
+    Timers are stages of combo search (calls count and seconds).
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, name, seconds):
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+
+    def reset(self):
+        self.counters = {}
+        self.timers = {}
+
+    def snapshot(self):
+        """Copy of counters and timers (to be exported as metrics)."""
+        return {
+            'counters': dict(self.counters),
+            'timers': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in self.timers.items()},
+        }
+
+
+def _timed(function, profiler, name):
+    counter = time.perf_counter
+
+    @functools.wraps(function)
+    def wrap(*args, **kwargs):
+        started = counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.add_time(name, counter() - started)
+    return wrap
+
+
+def _counted(function, profiler, name):
+    @functools.wraps(function)
+    def wrap(*args, **kwargs):
+        profiler.count(name)
+        return function(*args, **kwargs)
+    return wrap
+
+
+def _typed(function, profiler):
+    @functools.wraps(function)
+    def wrap(self, *args, **kwargs):
+        function(self, *args, **kwargs)
+        profiler.count(f'type.{self.short_name}')
+    return wrap
+
+
+def _replace(cls, name, make_wrap):
+    method = cls.__dict__[name]
+    # method could be already wrapped, so only the first one is kept
+    _originals.setdefault((cls, name), method)
+    if isinstance(method, staticmethod):
+        setattr(cls, name, staticmethod(make_wrap(method.__func__)))
+    else:
+        setattr(cls, name, make_wrap(method))
+
+
+def enable(profiler=None):
+    """
+    Start combo search profiling.
+    Profiled methods are wrapped until disable() call, so disabled profiling costs nothing.
+    """
+
+    global _profiler
+    disable()
+    _profiler = profiler = profiler or Profiler()
+    for branch, (cls, name) in BRANCHES.items():
+        _replace(cls, name, lambda f, branch=branch: _counted(f, profiler, f'branch.{branch}'))
+    for stage, (cls, name) in STAGES.items():
+        _replace(cls, name, lambda f, stage=stage: _timed(f, profiler, stage))
+    _replace(Combo, '__init__', lambda f: _typed(f, profiler))
+    return profiler
+
+
+def disable():
+    """Stop profiling and return profiler which was used (or None)."""
+
+    global _profiler
+    for (cls, name), original in _originals.items():
+        setattr(cls, name, original)
+    _originals.clear()
+    profiler, _profiler = _profiler, None
+    return profiler
+
+
+def get_profiler():
+    return _profiler
+
+
+def snapshot():
+    """Snapshot of current profiler (empty if profiling is disabled)."""
+    return _profiler.snapshot() if _profiler else {'counters': {}, 'timers': {}}
+
+
+@contextlib.contextmanager
+def profile(profiler=None):
+    profiler = enable(profiler)
+    try:
+        yield profiler
+    finally:
+        disable()
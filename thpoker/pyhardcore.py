@@ -0,0 +1,98 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+from thpoker.lookup import (
+    RANKS_COUNT, SUITS_COUNT, TWO_PAIRS, FULL_HOUSE, STRAIGHT, STRAIGHT_FLUSH, FLUSH, HIGH_CARD, MISS, REAL,
+    get_table, unpack_key,
+)
+
+
+# HardCore cards indexes (hand cards are 1000 more than other cards)
+HCARDS_INDEXES = {}
+# Card code is 5 ** rank plus 4 bit counter of card suit (shifted by SUITS_SHIFT bits).
+# So cards codes sum has ranks repeats in base 5 (they are the same for cards of the same ranks)
+# and suit has five or more cards if sum of its counters and FLUSH_ADD has FLUSH_BITS bit.
+HCARDS_CODES = {}
+SUITS_SHIFT = 32
+RANKS_MASK = (1 << SUITS_SHIFT) - 1
+FLUSH_ADD = 0x3333 << SUITS_SHIFT
+FLUSH_BITS = 0x8888 << SUITS_SHIFT
+for _rank in range(RANKS_COUNT):
+    for _suit in range(SUITS_COUNT):
+        _hcard = (_rank + 2) * 10 + _suit + 1
+        HCARDS_INDEXES[_hcard] = HCARDS_INDEXES[_hcard + 1000] = _rank * SUITS_COUNT + _suit
+        HCARDS_CODES[_hcard] = HCARDS_CODES[_hcard + 1000] = 5 ** _rank + (1 << SUITS_SHIFT + 4 * _suit)
+
+_combos = {}
+# combos keys of ranks repeats codes (without flushes), they are filled on first use
+_ranks_keys = {}
+
+
+def _get_combo(key):
+    combo = _combos.get(key)
+    if combo is None:
+        combo_type, kickers = unpack_key(key)
+        combo = _combos[key] = [combo_type] + kickers
+    return combo[:]
+
+
+def _evaluate(cards):
+    code = sum(map(HCARDS_CODES.__getitem__, cards))
+    if (code + FLUSH_ADD) & FLUSH_BITS:
+        return get_table().evaluate([HCARDS_INDEXES[card] for card in cards])
+    ranks = code & RANKS_MASK
+    key = _ranks_keys.get(ranks)
+    if key is None:
+        key = _ranks_keys[ranks] = get_table().evaluate([HCARDS_INDEXES[card] for card in cards])
+    return key
+
+
+def _ratio_code(combo, cards):
+    """Ratio code of combo (the same as lookup ratio_code), only hand cards are checked."""
+
+    combo_type, top = combo[0], combo[1]
+    if combo_type == TWO_PAIRS or combo_type == FULL_HOUSE:
+        groups = combo[1:3]
+        return min(sum(1 for card in cards if card >= 1000 and (card - 1000) // 10 in groups), REAL)
+    if combo_type == FLUSH or combo_type == STRAIGHT_FLUSH:
+        suits = [card % 10 for card in cards]
+        flush_suit = max(set(suits), key=suits.count)
+        cards = [card for card in cards if card % 10 == flush_suit]
+    for card in cards:
+        if card < 1000:
+            continue
+        weight = (card - 1000) // 10
+        if combo_type == STRAIGHT or combo_type == STRAIGHT_FLUSH:
+            if top - 5 < weight <= top or (top == 5 and weight == 14):
+                return REAL
+        elif combo_type == HIGH_CARD or combo_type == FLUSH:
+            if weight in combo[1:]:
+                return REAL
+        elif weight == top:
+            return REAL
+    return MISS
+
+
+def find_combo(cards):
+    """Combo ([type, kickers...]) of HardCore cards (the same as cthpoker.findCombo)."""
+    return _get_combo(_evaluate(cards))
+
+
+def find_ratio_combo(cards):
+    """Combo and ratio code of HardCore table and hand cards (the same as cthpoker.findRatioCombo)."""
+
+    combo = _get_combo(_evaluate(cards))
+    return [combo, _ratio_code(combo, cards)]
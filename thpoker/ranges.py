@@ -0,0 +1,150 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import re
+from array import array
+
+from thpoker.exceptions import RangeNotationError
+from thpoker.lookup import RANK_SYMBOLS, SUITS_COUNT, card_index, cards_indexes, require_numpy
+
+
+# Range part like 'AKs', 'TT+', 'A2s-A5s' or 'AsKd'
+HAND_TYPE_PATTERN = re.compile(r'^([2-9TJQKA])([2-9TJQKA])([so]?)(\+?)$')
+HAND_TYPES_PATTERN = re.compile(r'^([2-9TJQKA])([2-9TJQKA])([so]?)-([2-9TJQKA])([2-9TJQKA])([so]?)$')
+HAND_PATTERN = re.compile(r'^([2-9TJQKA][cdhs])/?([2-9TJQKA][cdhs])$')
+
+
+def class_hands(hand_type):
+    """
+    All hands (pairs of cards indexes) of hand type.
+    Hand type looks like 'AA', 'AKs', 'AKo' or 'AK' (suited and offsuit).
+    """
+
+    high, low = sorted((RANK_SYMBOLS.index(w) for w in hand_type[:2]), reverse=True)
+    kind = hand_type[2:3]
+    hands = []
+    for suit1 in range(SUITS_COUNT):
+        for suit2 in range(SUITS_COUNT):
+            if high == low:
+                if suit1 >= suit2:
+                    continue
+            elif (kind == 's' and suit1 != suit2) or (kind == 'o' and suit1 == suit2):
+                continue
+            hands.append((high * SUITS_COUNT + suit1, low * SUITS_COUNT + suit2))
+    return hands
+
+
+def _get_hand_types(part):
+    """Hand types of one range part (like 'TT+', 'AQs+', '22-55' or 'A2s-A5s')."""
+
+    if (match := HAND_TYPE_PATTERN.match(part)):
+        weight1, weight2, kind, plus = match.groups()
+        high, low = sorted((RANK_SYMBOLS.index(weight1), RANK_SYMBOLS.index(weight2)), reverse=True)
+        if high == low:
+            if kind:
+                raise RangeNotationError(part)
+            lows = range(low, len(RANK_SYMBOLS)) if plus else [low]
+            return [RANK_SYMBOLS[w] * 2 for w in lows]
+        # the lowest card goes up to the highest one
+        lows = range(low, high) if plus else [low]
+        return [RANK_SYMBOLS[high] + RANK_SYMBOLS[w] + kind for w in lows]
+    if (match := HAND_TYPES_PATTERN.match(part)):
+        high1, low1, kind1, high2, low2, kind2 = match.groups()
+        high1, low1, high2, low2 = (RANK_SYMBOLS.index(w) for w in (high1, low1, high2, low2))
+        lows = range(min(low1, low2), max(low1, low2) + 1)
+        if kind1 != kind2:
+            raise RangeNotationError(part)
+        if high1 == low1 and high2 == low2 and not kind1:
+            return [RANK_SYMBOLS[w] * 2 for w in lows]
+        # only the lowest card is changed in hand types sequence
+        if high1 != high2 or low1 >= high1 or low2 >= high2:
+            raise RangeNotationError(part)
+        return [RANK_SYMBOLS[high1] + RANK_SYMBOLS[w] + kind1 for w in lows]
+    raise RangeNotationError(part)
+
+
+def _parse(notation):
+    hands = set()
+    for part in re.split(r'[,\s]+', notation.strip()) if notation else []:
+        if (match := HAND_PATTERN.match(part)):
+            card1, card2 = (card_index(sign) for sign in match.groups())
+            if card1 == card2:
+                raise RangeNotationError(part)
+            hands.add((max(card1, card2), min(card1, card2)))
+            continue
+        for hand_type in _get_hand_types(part):
+            hands.update((max(hand), min(hand)) for hand in class_hands(hand_type))
+    return hands
+
+
+class HandRange:
+    """
+    Hands range by notation like 'TT+, AQs+, KJo, 22-55, A2s-A5s, AsKd'.
+    Hands are pairs of cards indexes (higher card first) stored in one flat bytes array.
+    """
+
+    __slots__ = ('notation', 'cards')
+
+    def __init__(self, notation=''):
+        self.notation = notation
+        self.cards = array('B')
+        for hand in sorted(_parse(notation), reverse=True):
+            self.cards.extend(hand)
+
+    @classmethod
+    def from_hands(cls, hands, notation=''):
+        hand_range = cls()
+        hand_range.notation = notation
+        for hand in sorted({(max(hand), min(hand)) for hand in hands}, reverse=True):
+            hand_range.cards.extend(hand)
+        return hand_range
+
+    def __repr__(self):
+        return f"HandRange('{self.notation}')"
+
+    def __len__(self):
+        return len(self.cards) // 2
+
+    def __iter__(self):
+        cards = self.cards
+        return ((cards[i], cards[i + 1]) for i in range(0, len(cards), 2))
+
+    def __contains__(self, hand):
+        """Hand is cards string (like 'As/Kd' or 'AsKd') or pair of cards indexes."""
+
+        if isinstance(hand, str):
+            hand = cards_indexes(hand) if '/' in hand else [card_index(hand[:2]), card_index(hand[2:])]
+        return (max(hand), min(hand)) in set(self)
+
+    def __or__(self, other):
+        return HandRange.from_hands(list(self) + list(other), f'{self.notation}, {other.notation}')
+
+    @property
+    def hands(self):
+        return list(self)
+
+    def remove(self, dead):
+        """Range without hands which have dead cards (cards string or cards indexes)."""
+
+        dead = set(cards_indexes(dead) if isinstance(dead, str) or dead is None else dead)
+        return HandRange.from_hands(
+            (hand for hand in self if hand[0] not in dead and hand[1] not in dead), self.notation)
+
+    def to_array(self):
+        """N x 2 array of cards indexes. Needs NumPy."""
+
+        np = require_numpy('Range array')
+        return np.frombuffer(self.cards, dtype=np.uint8).reshape(-1, 2).astype(np.intp)
@@ -0,0 +1,107 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import os
+import struct
+
+from thpoker.core import COMBO_RECORD, HAND_CARD_FLAG, LOW_ACE_FLAG, Combo
+from thpoker.lookup import TYPE_SHIFT, require_numpy
+
+
+MAGIC = b'THPC'
+VERSION = 1
+HEADER = struct.Struct('<4sI')
+
+
+def _check_header(header, path):
+    if len(header) != HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION):
+        raise ValueError(f"'{path}' is not a combo records file.")
+
+
+def write_records(path, combos, append=False):
+    """
+    Write combos binary records (COMBO_RECORD.size bytes each) to file.
+    Records are added to the end of existing file if append is True.
+    Returns count of written records.
+    """
+
+    exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+    if exists:
+        with open(path, 'rb') as f:
+            _check_header(f.read(HEADER.size), path)
+    count = 0
+    with open(path, 'ab' if exists else 'wb') as f:
+        if not exists:
+            f.write(HEADER.pack(MAGIC, VERSION))
+        for combo in combos:
+            f.write(combo.to_record())
+            count += 1
+    return count
+
+
+def read_records(path):
+    """Combos of records file one by one."""
+
+    with open(path, 'rb') as f:
+        _check_header(f.read(HEADER.size), path)
+        while (record := f.read(COMBO_RECORD.size)):
+            if len(record) != COMBO_RECORD.size:
+                raise ValueError(f"'{path}' combo records file has partial record.")
+            yield Combo.from_record(record)
+
+
+def records_dtype():
+    """NumPy structured type of combo record."""
+
+    np = require_numpy('Combo records arrays')
+    return np.dtype([('key', '<u4'), ('cards', 'u1', (7,)), ('combo', 'u1', (5,)), ('ratio', 'u1')])
+
+
+def load_records(path, mmap=False):
+    """
+    Combos of records file as NumPy arrays (N is records count):
+    key (N, uint32 combo keys), type (N, combo types),
+    cards (N x 7, combo search cards indexes, -1 is no card), in_hand (N x 7, hand cards flags),
+    combo (N x 5, combo cards indexes, -1 is no card), low_ace (N x 5, flags of an ace in the lowest straight),
+    ratio (N, lookup ratio codes, -1 is not checked ratio).
+    Records are memory mapped instead of read if mmap is True.
+    """
+
+    np = require_numpy('Combo records arrays')
+    with open(path, 'rb') as f:
+        _check_header(f.read(HEADER.size), path)
+    size = os.path.getsize(path) - HEADER.size
+    if size % COMBO_RECORD.size:
+        raise ValueError(f"'{path}' combo records file has partial record.")
+    dtype = records_dtype()
+    if mmap:
+        records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size, shape=(size // COMBO_RECORD.size,))
+    else:
+        records = np.fromfile(path, dtype=dtype, offset=HEADER.size)
+
+    codes = records['cards']
+    cards = (codes & ~np.uint8(HAND_CARD_FLAG)).astype(np.int8) - 1
+    positions = records['combo']
+    combo = np.take_along_axis(cards, (positions & ~np.uint8(LOW_ACE_FLAG)).astype(np.intp) - 1, axis=1)
+    return {
+        'key': np.asarray(records['key']),
+        'type': (records['key'] >> TYPE_SHIFT).astype(np.uint8),
+        'cards': cards,
+        'in_hand': (codes & HAND_CARD_FLAG) != 0,
+        'combo': np.where(positions != 0, combo, np.int8(-1)),
+        'low_ace': (positions & LOW_ACE_FLAG) != 0,
+        'ratio': records['ratio'].astype(np.int8) - 1,
+    }
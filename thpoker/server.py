@@ -0,0 +1,465 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import asyncio
+import collections
+import itertools
+import json
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from thpoker.backends import get_backend
+from thpoker.lookup import cards_indexes
+from thpoker.showdown import rank_keys
+
+
+# Frame is payload length and payload.
+# Request payload is request id, operation and body, response payload is request id, status and body.
+FRAME = struct.Struct('>I')
+HEADER = struct.Struct('>IB')
+KEY = struct.Struct('>I')
+MAX_FRAME_SIZE = 1 << 20
+
+# evaluate body is cards indexes (1 ... 7 bytes), response body is combo key
+OP_EVALUATE = 1
+# showdown body is table cards count, table cards and 2 cards of every hand (FOLDED for folded hand),
+# response body is combo key of every hand (0 for folded hand)
+OP_SHOWDOWN = 2
+# stats body is empty, response body is JSON of server counters
+OP_STATS = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+FOLDED = 0xFF
+DECK_SIZE = 52
+MAX_CARDS = 7
+
+
+class RequestError(Exception):
+    """Request which server could not evaluate."""
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+class LatencyCounter:
+    """Requests count, errors, throughput and latency percentiles of the last requests."""
+
+    def __init__(self, size=10000):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.errors = 0
+        self.latencies = collections.deque(maxlen=size)
+
+    def add(self, seconds, error=False):
+        self.count += 1
+        self.errors += error
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+        elapsed = time.perf_counter() - self.started
+        return {
+            'requests': self.count,
+            'errors': self.errors,
+            'per_second': self.count / elapsed if elapsed else 0.0,
+            'p50_ms': _percentile(latencies, 0.5) * 1000,
+            'p99_ms': _percentile(latencies, 0.99) * 1000,
+        }
+
+
+def _check_cards(cards, count_range):
+    if len(cards) not in count_range or len(set(cards)) != len(cards) or max(cards, default=0) >= DECK_SIZE:
+        raise RequestError(f"Wrong cards {list(cards)}.")
+    return tuple(cards)
+
+
+def _get_indexes(cards):
+    return cards_indexes(cards) if isinstance(cards, str) else list(cards)
+
+
+def _evaluate_cards(backend, cards_list):
+    """Combo keys of cards lists, cards of the same count are evaluated by one batch if NumPy is installed."""
+
+    try:
+        import numpy as np
+    except ImportError:
+        return [backend.evaluate(cards) for cards in cards_list]
+    keys = [0] * len(cards_list)
+    groups = collections.defaultdict(list)
+    for i, cards in enumerate(cards_list):
+        groups[len(cards)].append(i)
+    for indexes in groups.values():
+        batch = np.array([cards_list[i] for i in indexes], dtype=np.intp)
+        for i, key in zip(indexes, backend.evaluate_batch(batch).tolist()):
+            keys[i] = key
+    return keys
+
+
+class EvaluationServer:
+    """
+    Asyncio evaluation service (TCP or Unix socket).
+    Cards of concurrent requests are collected into batches (up to max_batch_size cards lists
+    or max_delay seconds after the first one) which are evaluated by backend in a separate thread,
+    so event loop is not blocked by evaluation.
+    Every connection has up to max_in_flight requests in progress, then its reading waits for responses
+    to be sent, so client which does not read responses does not make server buffer them.
+
+    async with EvaluationServer() as server:
+        host, port = await server.start(port=0)
+        await server.serve_forever()
+    """
+
+    def __init__(self, backend=None, max_batch_size=1024, max_delay=0.0005, max_in_flight=1024):
+        self.backend = backend or get_backend()
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_in_flight = max_in_flight
+        self.counter = LatencyCounter()
+        self.batches = 0
+        self.evaluations = 0
+        self.max_batch = 0
+        self._server = None
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+        self._connections = {}
+        # one evaluation thread: the next batch is collected while the previous one is evaluated
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='thpoker-evaluation')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """Start listening TCP host and port (free port if it is 0) or Unix socket path, returns address."""
+
+        if path:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.address
+
+    @property
+    def address(self):
+        return self._server.sockets[0].getsockname() if self._server else None
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # open connections are not closed by server closing, so they are closed and their handlers are awaited
+            for writer in list(self._connections.values()):
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._tasks):
+            task.cancel()
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        """Requests counters and batches stats."""
+
+        stats = self.counter.snapshot()
+        stats.update({
+            'evaluations': self.evaluations,
+            'batches': self.batches,
+            'mean_batch': self.evaluations / self.batches if self.batches else 0.0,
+            'max_batch': self.max_batch,
+            'backend': self.backend.name,
+        })
+        return stats
+
+    async def evaluate(self, cards):
+        """Combo key of cards indexes (evaluated with cards of other concurrent requests)."""
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((cards, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._run(self._evaluate_batch(batch))
+
+    def _run(self, coroutine):
+        # tasks are kept until they are done, so they are not garbage collected
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _evaluate_batch(self, batch):
+        self.batches += 1
+        self.evaluations += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        loop = asyncio.get_running_loop()
+        try:
+            keys = await loop.run_in_executor(
+                self._executor, _evaluate_cards, self.backend, [cards for cards, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), key in zip(batch, keys):
+            if not future.done():
+                future.set_result(key)
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        # responses are written one by one, so every write is drained before the next one
+        write_lock = asyncio.Lock()
+        try:
+            while True:
+                await in_flight.acquire()
+                try:
+                    size = FRAME.unpack(await reader.readexactly(FRAME.size))[0]
+                    if not HEADER.size <= size <= MAX_FRAME_SIZE:
+                        break
+                    payload = await reader.readexactly(size)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                self._run(self._handle_request(payload, writer, write_lock, in_flight))
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _handle_request(self, payload, writer, write_lock, in_flight):
+        started = time.perf_counter()
+        request_id, op = HEADER.unpack_from(payload)
+        try:
+            try:
+                body = await self._get_response(op, payload[HEADER.size:])
+                status = STATUS_OK
+            except Exception as e:
+                # every request gets response, so client does not wait for it forever
+                body, status = str(e).encode(), STATUS_ERROR
+            self.counter.add(time.perf_counter() - started, status == STATUS_ERROR)
+            async with write_lock:
+                if writer.is_closing():
+                    return
+                writer.write(FRAME.pack(HEADER.size + len(body)) + HEADER.pack(request_id, status) + body)
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    writer.close()
+        finally:
+            in_flight.release()
+
+    async def _get_response(self, op, body):
+        if op == OP_EVALUATE:
+            return KEY.pack(await self.evaluate(_check_cards(body, range(1, MAX_CARDS + 1))))
+        if op == OP_SHOWDOWN:
+            return b''.join(KEY.pack(key) for key in await self._showdown(body))
+        if op == OP_STATS:
+            return json.dumps(self.stats()).encode()
+        raise RequestError(f"Unknown operation {op}.")
+
+    async def _showdown(self, body):
+        if not body or (len(body) - 1 - body[0]) % 2:
+            raise RequestError("Wrong showdown request.")
+        table = body[1:1 + body[0]]
+        hands = [body[i:i + 2] for i in range(1 + body[0], len(body), 2)]
+        live = [hand for hand in hands if hand != bytes((FOLDED, FOLDED))]
+        cards = [_check_cards(table + hand, range(2, MAX_CARDS + 1)) for hand in live]
+        if len(set(itertools.chain(table, *live))) != len(table) + 2 * len(live):
+            raise RequestError("Hands have the same cards.")
+        keys = iter(await asyncio.gather(*(self.evaluate(c) for c in cards)))
+        return [0 if hand == bytes((FOLDED, FOLDED)) else next(keys) for hand in hands]
+
+
+class _Connection:
+    """Client connection, requests are pipelined and responses are matched by request id."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.futures = {}
+        self.request_ids = itertools.count()
+        self.reader_task = asyncio.get_running_loop().create_task(self._read())
+
+    @property
+    def closed(self):
+        return self.reader_task.done()
+
+    async def request(self, op, body):
+        request_id = next(self.request_ids) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self.futures[request_id] = future
+        self.writer.write(FRAME.pack(HEADER.size + len(body)) + HEADER.pack(request_id, op) + body)
+        await self.writer.drain()
+        return await future
+
+    async def _read(self):
+        error = ConnectionError("Connection is closed.")
+        try:
+            while True:
+                size = FRAME.unpack(await self.reader.readexactly(FRAME.size))[0]
+                payload = await self.reader.readexactly(size)
+                request_id, status = HEADER.unpack_from(payload)
+                future = self.futures.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if status == STATUS_OK:
+                    future.set_result(payload[HEADER.size:])
+                else:
+                    future.set_exception(RequestError(payload[HEADER.size:].decode()))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            error = ConnectionError(f"Connection is closed: {e!r}")
+        finally:
+            for future in self.futures.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.futures.clear()
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.reader_task.cancel()
+
+
+class EvaluationClient:
+    """
+    Async client of evaluation server with pool of connections (opened on first use).
+    Requests are spread over connections and several requests go through one connection at once.
+
+    async with EvaluationClient(port=port) as client:
+        key = await client.evaluate('As/Kd/Qh/Jc/Ts')
+    """
+
+    def __init__(self, host='127.0.0.1', port=None, path=None, connections=4):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.counter = LatencyCounter()
+        self._connections = [None] * connections
+        self._next = itertools.cycle(range(connections))
+        self._lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _get_connection(self):
+        position = next(self._next)
+        connection = self._connections[position]
+        if connection is None or connection.closed:
+            self._lock = self._lock or asyncio.Lock()
+            async with self._lock:
+                connection = self._connections[position]
+                if connection is None or connection.closed:
+                    if self.path:
+                        streams = await asyncio.open_unix_connection(self.path)
+                    else:
+                        streams = await asyncio.open_connection(self.host, self.port)
+                    connection = self._connections[position] = _Connection(*streams)
+        return connection
+
+    async def _request(self, op, body):
+        started = time.perf_counter()
+        error = True
+        try:
+            connection = await self._get_connection()
+            response = await connection.request(op, body)
+            error = False
+            return response
+        finally:
+            self.counter.add(time.perf_counter() - started, error)
+
+    async def evaluate(self, cards):
+        """Combo key of cards (cards string or cards indexes)."""
+        return KEY.unpack(await self._request(OP_EVALUATE, bytes(_get_indexes(cards))))[0]
+
+    async def evaluate_many(self, cards_list):
+        """Combo keys of several cards (requests are sent concurrently and batched by server)."""
+        return await asyncio.gather(*(self.evaluate(cards) for cards in cards_list))
+
+    async def showdown(self, table, hands, contributions=None):
+        """Showdown result (see showdown.showdown), hands are evaluated by server."""
+
+        table = _get_indexes(table)
+        body = bytearray([len(table)] + table)
+        for hand in hands:
+            body.extend((FOLDED, FOLDED) if hand is None else _get_indexes(hand))
+        response = await self._request(OP_SHOWDOWN, bytes(body))
+        keys = [key or None for (key,) in KEY.iter_unpack(response)]
+        return rank_keys(keys, contributions)
+
+    async def server_stats(self):
+        return json.loads(await self._request(OP_STATS, b''))
+
+    def stats(self):
+        """Client requests counters."""
+        return self.counter.snapshot()
+
+    async def close(self):
+        for i, connection in enumerate(self._connections):
+            if connection is not None:
+                await connection.close()
+                self._connections[i] = None
+
+
+async def serve(host='127.0.0.1', port=8765, path=None, backend=None, max_batch_size=1024, max_delay=0.0005,
+                max_in_flight=1024):
+    """Run evaluation server until it is cancelled."""
+
+    async with EvaluationServer(backend, max_batch_size, max_delay, max_in_flight) as server:
+        await server.start(host, port, path)
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from thpoker.backends import create_backend
+
+    parser = argparse.ArgumentParser(description='Run evaluation server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help='Unix socket path (instead of TCP)')
+    parser.add_argument('--backend', default=None)
+    parser.add_argument('--max-batch-size', type=int, default=1024)
+    parser.add_argument('--max-delay', type=float, default=0.0005, help='seconds')
+    parser.add_argument('--max-in-flight', type=int, default=1024, help='requests in progress per connection')
+    args = parser.parse_args()
+    backend = create_backend(args.backend) if args.backend else None
+    try:
+        asyncio.run(serve(
+            args.host, args.port, args.unix, backend, args.max_batch_size, args.max_delay, args.max_in_flight))
+    except KeyboardInterrupt:
+        pass
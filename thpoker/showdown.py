@@ -0,0 +1,245 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+from thpoker.backends import get_backend
+from thpoker.lookup import cards_indexes, core_cards_indexes, require_numpy
+
+
+class Pot:
+    """Main or side pot: chips amount, players who could win it and its winners."""
+
+    def __init__(self, amount, players, winners):
+        self.amount = amount
+        self.players = players
+        self.winners = winners
+
+    def __repr__(self):
+        return f"Pot(amount={self.amount}, players={self.players}, winners={self.winners})"
+
+    def __eq__(self, other):
+        return (self.amount, self.players, self.winners) == (other.amount, other.players, other.winners)
+
+
+class ShowdownResult:
+    """
+    Showdown of players (players are hands positions).
+    keys - combo key of every player (None for folded one)
+    ranking - groups of even players from the strongest to the weakest
+    pots - main pot and side pots (if contributions are passed)
+    payouts - chips won by every player (if contributions are passed)
+    """
+
+    def __init__(self, keys, ranking, pots=None, payouts=None):
+        self.keys = keys
+        self.ranking = ranking
+        self.pots = pots
+        self.payouts = payouts
+
+    def __repr__(self):
+        return f"ShowdownResult(ranking={self.ranking}, payouts={self.payouts})"
+
+    @property
+    def winners(self):
+        return self.ranking[0] if self.ranking else []
+
+    @property
+    def ties(self):
+        """Groups of several even players."""
+        return [group for group in self.ranking if len(group) > 1]
+
+
+def _get_indexes(cards):
+    """Cards indexes of cards string, Core cards (Table, Hand) or cards indexes."""
+
+    if isinstance(cards, str):
+        return cards_indexes(cards)
+    if hasattr(cards, 'items'):
+        return core_cards_indexes(cards)
+    return list(cards)
+
+
+def _get_ranking(keys):
+    players = sorted((p for p, key in enumerate(keys) if key is not None), key=lambda p: -keys[p])
+    ranking = []
+    for player in players:
+        if ranking and keys[ranking[-1][0]] == keys[player]:
+            ranking[-1].append(player)
+        else:
+            ranking.append([player])
+    return ranking
+
+
+def _get_pots(keys, contributions):
+    """Pots are layers of contributions between every two contribution levels."""
+
+    pots = []
+    previous = 0
+    for level in sorted(set(contributions)):
+        amount = sum(min(c, level) - min(c, previous) for c in contributions)
+        players = [p for p, c in enumerate(contributions) if c >= level and keys[p] is not None]
+        if players:
+            best = max(keys[p] for p in players)
+            winners = [p for p in players if keys[p] == best]
+        else:
+            # nobody could win chips of folded players, so they are returned
+            winners = [p for p, c in enumerate(contributions) if c >= level]
+        if amount:
+            # players of the same pot layers share one pot
+            if pots and pots[-1].players == players and pots[-1].winners == winners:
+                pots[-1].amount += amount
+            else:
+                pots.append(Pot(amount, players, winners))
+        previous = level
+    return pots
+
+
+def _get_payouts(pots, players_count):
+    payouts = [0] * players_count
+    for pot in pots:
+        share, odd_chips = divmod(pot.amount, len(pot.winners))
+        for i, player in enumerate(pot.winners):
+            # odd chips go to the first winners
+            payouts[player] += share + (i < odd_chips)
+    return payouts
+
+
+def showdown(table, hands, contributions=None, backend=None):
+    """
+    Evaluate every hand once and rank players.
+    Table and hands are cards strings (like 'As/Kd/Tc'), Core cards or cards indexes,
+    hand of folded player is None.
+    Contributions are integer chips put into pot by every player, pots and payouts are counted by them.
+    """
+
+    backend = backend or get_backend()
+    table = _get_indexes(table)
+    players = [p for p, hand in enumerate(hands) if hand is not None]
+    keys = [None] * len(hands)
+    for player, key in zip(players, backend.evaluate_hands(table, [_get_indexes(hands[p]) for p in players])):
+        keys[player] = key
+    return rank_keys(keys, contributions)
+
+
+def rank_keys(keys, contributions=None):
+    """Showdown result of already evaluated combo keys of players (None for folded player)."""
+
+    ranking = _get_ranking(keys)
+    if contributions is None:
+        return ShowdownResult(keys, ranking)
+    if len(contributions) != len(keys):
+        raise ValueError("Every player needs contribution.")
+    pots = _get_pots(keys, contributions)
+    return ShowdownResult(keys, ranking, pots, _get_payouts(pots, len(keys)))
+
+
+class BatchShowdownResult:
+    """
+    Showdowns of N tables (arrays are N x players).
+    keys - combo key of every player (0 for folded one)
+    winners - players who have the strongest combo of every table
+    payouts - chips won by every player (if contributions are passed)
+    """
+
+    def __init__(self, keys, winners, contributions=None, payouts=None):
+        self.keys = keys
+        self.winners = winners
+        self.contributions = contributions
+        self.payouts = payouts
+
+    def __repr__(self):
+        return f"BatchShowdownResult(tables={len(self.keys)}, players={self.keys.shape[1]})"
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, index):
+        """Showdown result of one table (the same as showdown one)."""
+
+        keys = [int(key) or None for key in self.keys[index]]
+        if self.payouts is None:
+            return rank_keys(keys)
+        pots = _get_pots(keys, self.contributions[index].tolist())
+        return ShowdownResult(keys, _get_ranking(keys), pots, self.payouts[index].tolist())
+
+
+def _get_batch_payouts(np, keys, contributions):
+    """Payouts of every contributions layer, the same as _get_pots and _get_payouts of every table."""
+
+    count, players = keys.shape
+    live = keys > 0
+    levels = np.sort(contributions, axis=1)
+    payouts = np.zeros((count, players), dtype=np.int64)
+    # pot is collected from the same layers while their players and winners are the same
+    pot = np.zeros(count, dtype=np.int64)
+    pot_players = np.zeros((count, players), dtype=bool)
+    pot_winners = np.zeros((count, players), dtype=bool)
+
+    def pay(rows):
+        winners = pot_winners[rows]
+        share, odd_chips = np.divmod(pot[rows], winners.sum(axis=1))
+        # odd chips go to the first winners
+        order = np.cumsum(winners, axis=1) - 1
+        payouts[rows] += winners * (share[:, None] + (order < odd_chips[:, None]))
+
+    previous = np.zeros(count, dtype=np.int64)
+    for layer in range(players):
+        level = levels[:, layer]
+        amount = (np.minimum(contributions, level[:, None]) - np.minimum(contributions, previous[:, None])).sum(1)
+        contributed = contributions >= level[:, None]
+        eligible = contributed & live
+        best = np.where(eligible, keys, 0).max(axis=1)
+        # nobody could win chips of folded players, so they are returned
+        winners = np.where(eligible.any(axis=1)[:, None], eligible & (keys == best[:, None]), contributed)
+        added = amount > 0
+        same = added & (pot > 0) & (pot_players == eligible).all(axis=1) & (pot_winners == winners).all(axis=1)
+        flushed = added & (pot > 0) & ~same
+        pay(flushed)
+        pot[flushed] = 0
+        pot[added] += amount[added]
+        pot_players[added] = eligible[added]
+        pot_winners[added] = winners[added]
+        previous = level
+    pay(pot > 0)
+    return payouts
+
+
+def showdown_batch(tables, hands, contributions=None, folded=None, backend=None):
+    """
+    Showdowns of N tables, every hand of every table is evaluated by one backend batch call. Needs NumPy.
+    Tables are N x k array of cards indexes, hands are N x players x 2 array of cards indexes,
+    folded is N x players bool array of folded players (their hands cards are not used).
+    Contributions are N x players integer array of chips put into pot by every player.
+    """
+
+    np = require_numpy('Batch showdown')
+    backend = backend or get_backend()
+    tables = np.asarray(tables, dtype=np.intp)
+    hands = np.asarray(hands, dtype=np.intp)
+    count, players = hands.shape[:2]
+    live = np.ones((count, players), dtype=bool) if folded is None else ~np.asarray(folded, dtype=bool)
+    tables_rows, players_columns = np.nonzero(live)
+    keys = np.zeros((count, players), dtype=np.uint32)
+    if len(tables_rows):
+        cards = np.hstack([tables[tables_rows], hands[tables_rows, players_columns]])
+        keys[tables_rows, players_columns] = backend.evaluate_batch(cards)
+    winners = live & (keys == keys.max(axis=1, keepdims=True))
+    if contributions is None:
+        return BatchShowdownResult(keys, winners)
+    contributions = np.asarray(contributions, dtype=np.int64)
+    if contributions.shape != (count, players):
+        raise ValueError("Every player needs contribution.")
+    payouts = _get_batch_payouts(np, keys.astype(np.int64), contributions)
+    return BatchShowdownResult(keys, winners, contributions, payouts)
@@ -0,0 +1,89 @@
+# Copyright 2018-2021 Yegor Bitensky
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+
+import multiprocessing
+import os
+
+from thpoker.backends import get_backend, set_backend
+from thpoker.lookup import LookupTable, get_cache_dir, set_table
+
+
+def _init_worker(table_path, backend, initializer, initargs):
+    """Attach memory mapped lookup table and set backend of worker process."""
+
+    set_table(LookupTable.map(table_path))
+    set_backend(backend)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class WorkerPool:
+    """
+    Processes pool which workers use one memory mapped lookup table.
+    Table file is built once by parent process, every worker maps it read-only,
+    so memory of tables does not grow with processes count.
+    Workers use the same backend as parent process (or backend by name).
+
+    with WorkerPool(8) as pool:
+        keys = pool.map(function, tasks)
+    """
+
+    def __init__(self, processes=None, backend=None, table_path=None, initializer=None, initargs=(), context=None):
+        self.processes = processes or os.cpu_count()
+        self.table_path = table_path or os.path.join(get_cache_dir(), LookupTable.FILE_NAME)
+        self.backend = backend or get_backend().name
+        # table file is written by parent, so workers do not build it concurrently
+        LookupTable.load(self.table_path)
+        if isinstance(context, str) or context is None:
+            context = multiprocessing.get_context(context)
+        self._pool = context.Pool(
+            self.processes, _init_worker, (self.table_path, self.backend, initializer, initargs))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def map(self, function, iterable, chunksize=None):
+        return self._pool.map(function, iterable, chunksize)
+
+    def imap(self, function, iterable, chunksize=1):
+        return self._pool.imap(function, iterable, chunksize)
+
+    def imap_unordered(self, function, iterable, chunksize=1):
+        return self._pool.imap_unordered(function, iterable, chunksize)
+
+    def starmap(self, function, iterable, chunksize=None):
+        return self._pool.starmap(function, iterable, chunksize)
+
+    def apply_async(self, function, args=(), kwargs=None, callback=None, error_callback=None):
+        return self._pool.apply_async(function, args, kwargs or {}, callback, error_callback)
+
+    def close(self):
+        """Wait for tasks and stop workers."""
+
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        """Stop workers without waiting for tasks."""
+
+        self._pool.terminate()
+        self._pool.join()